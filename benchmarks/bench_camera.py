@@ -0,0 +1,106 @@
+"""
+Per-frame cost of building the render camera in the viewer, Camera against ViewCamera.
+
+    python -m benchmarks.bench_camera --frames 2000
+
+Both variants start from the orbit camera like GaussianSplattingGUI.construct_camera,
+and the device is synchronized after each camera so the host to device copies are
+included. Camera allocates, clamps and masks a full (3, H, W) image and inverts the
+view matrix on the device, ViewCamera only uploads a 51 float buffer.
+
+The last line is the per-view cost of ViewCamera.from_trajectory, which builds the
+cameras of a whole trajectory of --frames orbit poses in one batch.
+"""
+
+import math
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+
+from engine.scene.cameras import Camera, ViewCamera
+from engine.utils.graphics_utils import focal2fov, fov2focal
+from engine.utils.trajectory_utils import make_trajectory
+from viewer.camera import OrbitCamera
+
+
+def build_camera(orbit, width, height, device):
+    pose = orbit.opt_pose
+    fovy = math.radians(orbit.fovy)
+    fovx = focal2fov(fov2focal(fovy, height), width)
+    return Camera(
+        colmap_id=0,
+        R=pose[:3, :3],
+        T=pose[:3, 3],
+        FoVx=fovx,
+        FoVy=fovy,
+        image=torch.zeros([3, height, width]),
+        gt_alpha_mask=None,
+        image_name=None,
+        uid=0,
+        data_device=device,
+        device=device,
+    )
+
+
+def build_view_camera(orbit, width, height, device):
+    pose = orbit.opt_pose
+    fovy = math.radians(orbit.fovy)
+    fovx = focal2fov(fov2focal(fovy, height), width)
+    return ViewCamera(
+        R=pose[:3, :3],
+        T=pose[:3, 3],
+        FoVx=fovx,
+        FoVy=fovy,
+        width=width,
+        height=height,
+        device=device,
+    )
+
+
+def time_per_frame(build, frames, width, height, device):
+    orbit = OrbitCamera(width, height, r=3.0)
+    sync = torch.cuda.synchronize if device == "cuda" else lambda: None
+    for _ in range(10):
+        build(orbit, width, height, device)
+    sync()
+    start = time.perf_counter()
+    for _ in range(frames):
+        orbit.orbit(1.0, 0.5)
+        build(orbit, width, height, device)
+        sync()
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Camera construction benchmark")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--device", default="cuda")
+    args = parser.parse_args()
+
+    timings = {
+        name: time_per_frame(build, args.frames, args.width, args.height, args.device)
+        for name, build in (("Camera", build_camera), ("ViewCamera", build_view_camera))
+    }
+    for name, seconds in timings.items():
+        print(f"{name:>10}: {seconds * 1e6:9.1f} us/frame")
+    print(f"speedup {timings['Camera'] / timings['ViewCamera']:.1f}x")
+
+    orbit = OrbitCamera(args.width, args.height, r=3.0)
+    poses = []
+    for _ in range(args.frames):
+        orbit.orbit(1.0, 0.5)
+        poses.append(orbit.opt_pose)
+    trajectory = make_trajectory(
+        np.stack(poses), args.width, args.height, math.radians(orbit.fovy)
+    )
+    ViewCamera.from_trajectory(trajectory[:10], device=args.device)
+    start = time.perf_counter()
+    ViewCamera.from_trajectory(trajectory, device=args.device)
+    if args.device == "cuda":
+        torch.cuda.synchronize()
+    seconds = (time.perf_counter() - start) / args.frames
+    print(f"{'trajectory':>10}: {seconds * 1e6:9.1f} us/frame")
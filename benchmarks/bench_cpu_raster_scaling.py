@@ -0,0 +1,64 @@
+"""
+Scaling of the cpu rasterizer's tile compositing from 1 to N cores.
+
+    python -m benchmarks.bench_cpu_raster_scaling --num_points 1000000
+
+torch's own intra-op threads are set to the same count, so each row is the frame
+time when the renderer may use that many cores in total.
+"""
+
+import os
+import time
+from argparse import ArgumentParser
+
+import torch
+
+from benchmarks.bench_frozen_render import make_camera, synthetic_arrays
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.scene.gaussian_model import GaussianModel
+
+
+def time_frames(model, cam, opt, bg, frames):
+    render(cam, model, opt, bg)
+    start = time.perf_counter()
+    for _ in range(frames):
+        render(cam, model, opt, bg)
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    opt = CONFIG()
+    parser = ArgumentParser(description="cpu rasterizer thread scaling benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=opt.width)
+    parser.add_argument("--height", type=int, default=opt.height)
+    parser.add_argument("--frames", type=int, default=3)
+    parser.add_argument("--max_threads", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    opt.rasterizer = "cpu"
+    bg = torch.zeros(3, dtype=torch.float32)
+    model = GaussianModel(opt.sh_degree, frozen=True, device="cpu")
+    model.create_from_arrays(synthetic_arrays(args.num_points))
+    cam = make_camera(args.width, args.height, device="cpu")
+
+    threads = [1]
+    while threads[-1] * 2 <= args.max_threads:
+        threads.append(threads[-1] * 2)
+    if threads[-1] != args.max_threads:
+        threads.append(args.max_threads)
+
+    baseline = None
+    for num_threads in threads:
+        torch.set_num_threads(num_threads)
+        opt.cpu_threads = num_threads
+        elapsed = time_frames(model, cam, opt, bg, args.frames)
+        # the rasterizer drops to one intra-op thread while blending only
+        assert torch.get_num_threads() == num_threads, torch.get_num_threads()
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f"{num_threads:3d} threads: {elapsed * 1000:9.1f} ms/frame, "
+            f"speedup {speedup:5.2f}x, efficiency {speedup / num_threads:6.1%}"
+        )
@@ -0,0 +1,78 @@
+"""
+Host time per frame spent getting rendered images into the viewer texture.
+
+    python -m benchmarks.bench_frame_delivery --num_points 1000000 --frames 300
+
+"copy" is the previous GaussianSplattingGUI.fetch_data path (permute, blocking
+.cpu(), a new numpy array every frame), the FrameBuffer rows use the pinned double
+buffers with the readback overlapping the next render. Every variant renders the
+same orbit, the delivery time is the frame time minus the render call alone.
+dearpygui's own texture upload is the same float32 buffer for all of them and is
+not included.
+"""
+
+import time
+from argparse import ArgumentParser
+
+import torch
+
+from benchmarks.bench_frozen_render import synthetic_arrays
+from benchmarks.bench_render_batch import orbit_cameras
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.scene.gaussian_model import GaussianModel
+from viewer.frame_buffer import FrameBuffer
+
+
+def render_only(cams, model, opt, bg, frames):
+    for cam in cams:
+        render(cam, model, opt, bg)["render"]
+    torch.cuda.synchronize()
+
+
+def host_copy(cams, model, opt, bg, frames):
+    for cam in cams:
+        img = render(cam, model, opt, bg)["render"].permute(1, 2, 0)
+        img.detach().cpu().numpy().reshape(-1)
+
+
+def frame_buffer(cams, model, opt, bg, frames):
+    for cam in cams:
+        frames.submit(render(cam, model, opt, bg)["render"])
+        frames.poll()
+    torch.cuda.synchronize()
+    frames.poll()
+
+
+if __name__ == "__main__":
+    opt = CONFIG()
+    parser = ArgumentParser(description="Viewer frame delivery benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=opt.width)
+    parser.add_argument("--height", type=int, default=opt.height)
+    args = parser.parse_args()
+
+    bg = torch.zeros(3, dtype=torch.float32, device="cuda")
+    cams = orbit_cameras(args.frames, args.width, args.height)
+    model = GaussianModel(opt.sh_degree, frozen=True)
+    model.create_from_arrays(synthetic_arrays(args.num_points))
+
+    variants = (
+        ("render only", render_only, None),
+        ("copy", host_copy, None),
+        ("FrameBuffer float32", frame_buffer, "float32"),
+        ("FrameBuffer uint8", frame_buffer, "uint8"),
+    )
+    timings = {}
+    for name, fn, fmt in variants:
+        frames = FrameBuffer(args.width, args.height, fmt) if fmt else None
+        fn(cams[:5], model, opt, bg, frames)
+        torch.cuda.synchronize()
+        start = time.perf_counter()
+        fn(cams, model, opt, bg, frames)
+        timings[name] = (time.perf_counter() - start) * 1000.0 / args.frames
+
+    base = timings["render only"]
+    for name, ms in timings.items():
+        print(f"{name:>20}: {ms:7.2f} ms/frame, delivery {ms - base:6.2f} ms")
@@ -0,0 +1,71 @@
+"""
+Bytes per frame and encoding time of the render server frame encodings.
+
+    python -m benchmarks.bench_frame_encoding --num_points 1000000 --frames 60
+
+Frames are rendered along an orbit and converted to uint8 like the server does, then
+encoded in order by one FrameEncoder per encoding (so "delta" sees consecutive
+frames) and decoded back. The encode and decode times are the latency an encoding
+adds on top of the render when the link is not the bottleneck; the float32 size of
+the previous network_gui frames is printed for reference.
+"""
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+
+from benchmarks.bench_frozen_render import synthetic_arrays
+from benchmarks.bench_render_batch import orbit_cameras
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.gaussian_renderer.frame_encoding import (
+    ENCODINGS,
+    FrameDecoder,
+    FrameEncoder,
+)
+from engine.gaussian_renderer.render_server import image_to_bytes
+from engine.scene.gaussian_model import GaussianModel
+
+if __name__ == "__main__":
+    opt = CONFIG()
+    parser = ArgumentParser(description="Frame encoding benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=opt.width)
+    parser.add_argument("--height", type=int, default=opt.height)
+    parser.add_argument("--jpeg_quality", type=int, default=90)
+    args = parser.parse_args()
+
+    bg = torch.zeros(3, dtype=torch.float32, device="cuda")
+    model = GaussianModel(opt.sh_degree, frozen=True)
+    model.create_from_arrays(synthetic_arrays(args.num_points))
+    frames = [
+        np.frombuffer(image_to_bytes(render(cam, model, opt, bg)["render"]), np.uint8)
+        .reshape(args.height, args.width, 3)
+        .copy()
+        for cam in orbit_cameras(args.frames, args.width, args.height)
+    ]
+
+    print(f"float32 frame: {args.width * args.height * 12 / 2**20:8.2f} MB")
+    for encoding in ENCODINGS:
+        encoder, decoder = FrameEncoder(), FrameDecoder()
+        sizes, encode_times, decode_times = [], [], []
+        for frame in frames:
+            start = time.perf_counter()
+            data = encoder.encode(frame, encoding, args.jpeg_quality)
+            encode_times.append(time.perf_counter() - start)
+            sizes.append(len(data))
+
+            start = time.perf_counter()
+            decoded = decoder.decode(data, args.width, args.height, encoding)
+            decode_times.append(time.perf_counter() - start)
+            if encoding != "jpeg":
+                assert np.array_equal(decoded, frame), encoding
+
+        print(
+            f"{encoding:>13} frame: {np.mean(sizes) / 2**20:8.2f} MB, "
+            f"encode {1000 * np.mean(encode_times):6.2f} ms, "
+            f"decode {1000 * np.mean(decode_times):6.2f} ms"
+        )
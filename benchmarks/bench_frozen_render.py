@@ -0,0 +1,95 @@
+"""
+Per-frame cost of render() for a trainable GaussianModel against a frozen one.
+
+    python -m benchmarks.bench_frozen_render --num_points 1000000
+
+At a tiny resolution the rasterizer itself is cheap, so the difference between the
+two timings is mostly the overhead the frozen model removes: re-activating scaling,
+rotation and opacity, concatenating the features and allocating the grad-enabled
+screen-space tensor every frame.
+"""
+
+import math
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.scene.cameras import Camera
+from engine.scene.gaussian_model import GaussianModel
+
+
+def synthetic_arrays(num_points, sh_degree=3, seed=0):
+    rng = np.random.default_rng(seed)
+    num_rest = (sh_degree + 1) ** 2 - 1
+    rotation = np.zeros((num_points, 4), dtype=np.float32)
+    rotation[:, 0] = 1.0
+    return {
+        "xyz": rng.uniform(-1, 1, (num_points, 3)).astype(np.float32),
+        "features_dc": rng.normal(0, 1, (num_points, 1, 3)).astype(np.float32),
+        "features_rest": rng.normal(0, 0.1, (num_points, num_rest, 3)).astype(
+            np.float32
+        ),
+        "opacity": np.zeros((num_points, 1), dtype=np.float32),
+        "scaling": np.full((num_points, 3), math.log(0.005), dtype=np.float32),
+        "rotation": rotation,
+    }
+
+
+def make_camera(width, height, device="cuda"):
+    pose = np.eye(4)
+    pose[2, 3] = 3.0
+    fov = math.radians(60)
+    return Camera(
+        colmap_id=0,
+        R=pose[:3, :3],
+        T=pose[:3, 3],
+        FoVx=fov,
+        FoVy=fov,
+        image=torch.zeros([3, height, width]),
+        gt_alpha_mask=None,
+        image_name=None,
+        uid=0,
+        data_device=device,
+        device=device,
+    )
+
+
+def time_frames(model, cam, opt, bg, frames):
+    for _ in range(5):
+        render(cam, model, opt, bg)
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(frames):
+        render(cam, model, opt, bg)
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="frozen model render benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    opt = CONFIG()
+    bg = torch.zeros(3, dtype=torch.float32, device="cuda")
+    arrays = synthetic_arrays(args.num_points)
+
+    models = {}
+    for frozen in (False, True):
+        models[frozen] = GaussianModel(opt.sh_degree, frozen=frozen)
+        models[frozen].create_from_arrays(arrays)
+
+    for width, height in ((16, 16), (opt.width, opt.height)):
+        cam = make_camera(width, height)
+        trainable = time_frames(models[False], cam, opt, bg, args.frames)
+        frozen = time_frames(models[True], cam, opt, bg, args.frames)
+        print(
+            f"{width}x{height}: trainable {trainable * 1000:.2f} ms, "
+            f"frozen {frozen * 1000:.2f} ms, "
+            f"saved {(trainable - frozen) * 1000:.2f} ms/frame"
+        )
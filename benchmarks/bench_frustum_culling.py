@@ -0,0 +1,160 @@
+"""
+Culling cost and rasterized-splat reduction of the spatial index on camera paths.
+
+    python -m benchmarks.bench_frustum_culling --num_points 10000000
+
+The synthetic scene is a room: splats on the six walls of a 20 m cube. The interior
+path turns on the spot in the middle of the room, the close-up path looks at a wall
+from half a meter. For every path the script reports the index build time, the
+culling time per frame, the fraction of splats handed to the rasterizer, the frame
+time with and without culling and how many visible splats culling lost (should be 0).
+"""
+
+import math
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.scene.cameras import Camera
+from engine.scene.gaussian_model import GaussianModel
+
+ROOM = 10.0
+
+
+def room_arrays(num_points, sh_degree=3, seed=0):
+    rng = np.random.default_rng(seed)
+    num_rest = (sh_degree + 1) ** 2 - 1
+    xyz = rng.uniform(-ROOM, ROOM, (num_points, 3))
+    # push one coordinate of every splat onto a wall
+    axis = rng.integers(0, 3, num_points)
+    xyz[np.arange(num_points), axis] = rng.choice([-ROOM, ROOM], num_points)
+    rotation = np.zeros((num_points, 4), dtype=np.float32)
+    rotation[:, 0] = 1.0
+    return {
+        "xyz": xyz.astype(np.float32),
+        "features_dc": rng.normal(0, 1, (num_points, 1, 3)).astype(np.float32),
+        "features_rest": np.zeros((num_points, num_rest, 3), dtype=np.float32),
+        "opacity": np.zeros((num_points, 1), dtype=np.float32),
+        "scaling": np.full((num_points, 3), math.log(0.01), dtype=np.float32),
+        "rotation": rotation,
+    }
+
+
+def look_at(eye, target, width, height, device, fovy=math.radians(60)):
+    """Camera at eye looking at target, x right, y down, z forward (colmap)."""
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    right = np.cross([0.0, -1.0, 0.0], forward)
+    right /= np.linalg.norm(right)
+    down = np.cross(forward, right)
+    R = np.stack((right, down, forward), axis=1)
+    return Camera(
+        colmap_id=0,
+        R=R,
+        T=-R.T @ eye,
+        FoVx=2 * math.atan(math.tan(fovy * 0.5) * width / height),
+        FoVy=fovy,
+        image=torch.zeros([3, height, width]),
+        gt_alpha_mask=None,
+        image_name=None,
+        uid=0,
+        data_device=device,
+        device=device,
+    )
+
+
+def camera_paths(frames, width, height, device):
+    angles = np.linspace(0, 2 * math.pi, frames, endpoint=False)
+    interior = [
+        look_at([0, 0, 0], [math.sin(a), 0.2, math.cos(a)], width, height, device)
+        for a in angles
+    ]
+    closeup = [
+        look_at(
+            [math.sin(a), 0.5 * math.cos(a), ROOM - 0.5],
+            [math.sin(a), 0.5 * math.cos(a), ROOM],
+            width,
+            height,
+            device,
+        )
+        for a in angles
+    ]
+    return {"interior": interior, "close-up": closeup}
+
+
+def synchronize(device):
+    if device == "cuda":
+        torch.cuda.synchronize()
+
+
+def run_path(model, cams, opt, bg, device):
+    cull_time = 0.0
+    candidates = 0
+    frame_time = {False: 0.0, True: 0.0}
+    lost = 0
+    for cam in cams:
+        synchronize(device)
+        start = time.perf_counter()
+        index = model.spatial_index().cull(cam.full_proj_transform)
+        synchronize(device)
+        cull_time += time.perf_counter() - start
+        candidates += index.shape[0]
+
+        visible = {}
+        for culling in (False, True):
+            opt.frustum_culling = culling
+            synchronize(device)
+            start = time.perf_counter()
+            visible[culling] = render(cam, model, opt, bg)["visibility_filter"]
+            synchronize(device)
+            frame_time[culling] += time.perf_counter() - start
+        lost += int((visible[False] & ~visible[True]).sum())
+
+    frames = len(cams)
+    return (
+        cull_time / frames,
+        candidates / (frames * model.get_xyz.shape[0]),
+        frame_time[False] / frames,
+        frame_time[True] / frames,
+        lost,
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="spatial index culling benchmark")
+    parser.add_argument("--num_points", type=int, default=10_000_000)
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--rasterizer", choices=["cuda", "cpu"], default="cuda")
+    args = parser.parse_args()
+
+    device = "cpu" if args.rasterizer == "cpu" else "cuda"
+    opt = CONFIG()
+    opt.rasterizer = args.rasterizer
+    bg = torch.zeros(3, dtype=torch.float32, device=device)
+    model = GaussianModel(opt.sh_degree, frozen=True, device=device)
+    model.create_from_arrays(room_arrays(args.num_points))
+
+    synchronize(device)
+    start = time.perf_counter()
+    index = model.spatial_index()
+    synchronize(device)
+    print(
+        f"built index over {args.num_points} splats, {index.num_leaves} leaves, "
+        f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+
+    paths = camera_paths(args.frames, args.width, args.height, device)
+    for name, cams in paths.items():
+        cull, fraction, full, culled, lost = run_path(model, cams, opt, bg, device)
+        print(
+            f"{name:9s}: cull {cull * 1000:6.2f} ms, rasterized {fraction:6.1%}, "
+            f"frame {full * 1000:7.2f} -> {culled * 1000:7.2f} ms, "
+            f"lost visible splats {lost}"
+        )
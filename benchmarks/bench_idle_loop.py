@@ -0,0 +1,71 @@
+"""
+CPU time and renders of an idle viewer loop, always rendering against RenderScheduler.
+
+    python -m benchmarks.bench_idle_loop --num_points 1000000 --seconds 5
+
+The loop is GaussianSplattingGUI.render without dearpygui: the camera is invalidated
+once at start and then left alone. "always" is the previous behaviour of rendering
+every iteration, the scheduler variants reuse the last frame and, with --idle_fps,
+sleep away the rest of each idle tick. GPU busy time is reported as the summed time
+of the renders, each synchronized.
+"""
+
+import time
+from argparse import ArgumentParser
+
+import torch
+
+from benchmarks.bench_frozen_render import synthetic_arrays
+from benchmarks.bench_render_batch import orbit_cameras
+from configs import CONFIG
+from engine.gaussian_renderer import render
+from engine.scene.gaussian_model import GaussianModel
+from viewer.scheduler import RenderScheduler
+
+
+def idle_loop(seconds, cam, model, opt, bg, scheduler=None):
+    renders = 0
+    render_seconds = 0.0
+    cpu_start = time.process_time()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        if scheduler is None or scheduler.should_render():
+            start = time.perf_counter()
+            render(cam, model, opt, bg)
+            torch.cuda.synchronize()
+            render_seconds += time.perf_counter() - start
+            renders += 1
+            if scheduler is not None:
+                scheduler.rendered()
+        if scheduler is not None:
+            scheduler.throttle()
+    return renders, time.process_time() - cpu_start, render_seconds
+
+
+if __name__ == "__main__":
+    opt = CONFIG()
+    parser = ArgumentParser(description="Idle viewer loop benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--idle_fps", type=int, default=opt.idle_fps)
+    args = parser.parse_args()
+
+    bg = torch.zeros(3, dtype=torch.float32, device="cuda")
+    cam = orbit_cameras(1, opt.width, opt.height)[0]
+    model = GaussianModel(opt.sh_degree, frozen=True)
+    model.create_from_arrays(synthetic_arrays(args.num_points))
+
+    variants = (
+        ("always", None),
+        ("scheduler", RenderScheduler()),
+        (f"scheduler, idle {args.idle_fps} fps", RenderScheduler(args.idle_fps)),
+    )
+    for name, scheduler in variants:
+        if scheduler is not None:
+            scheduler.invalidate("camera")
+        renders, cpu, gpu = idle_loop(args.seconds, cam, model, opt, bg, scheduler)
+        print(
+            f"{name:>24}: {renders:6d} renders, "
+            f"CPU {100 * cpu / args.seconds:5.1f}%, "
+            f"GPU busy {100 * gpu / args.seconds:5.1f}%"
+        )
@@ -0,0 +1,113 @@
+"""
+Compare the original per-column PLY loader with the vectorized float32 one.
+
+    python -m benchmarks.bench_load_ply --num_points 1000000
+
+Both loaders stop at CPU tensors so the comparison runs without a GPU. Every variant
+runs in its own process so the reported peak RSS is not polluted by the others.
+"""
+
+import os
+import tempfile
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+from plyfile import PlyData
+
+from benchmarks.common import run_isolated, write_synthetic_ply
+from engine.utils.ply_utils import gaussian_arrays, read_vertices
+
+
+def legacy_load(path):
+    plydata = PlyData.read(path)
+
+    xyz = np.stack(
+        (
+            np.asarray(plydata.elements[0]["x"]),
+            np.asarray(plydata.elements[0]["y"]),
+            np.asarray(plydata.elements[0]["z"]),
+        ),
+        axis=1,
+    )
+    opacities = np.asarray(plydata.elements[0]["opacity"])[..., np.newaxis]
+
+    features_dc = np.zeros((xyz.shape[0], 3, 1))
+    features_dc[:, 0, 0] = np.asarray(plydata.elements[0]["f_dc_0"])
+    features_dc[:, 1, 0] = np.asarray(plydata.elements[0]["f_dc_1"])
+    features_dc[:, 2, 0] = np.asarray(plydata.elements[0]["f_dc_2"])
+
+    extra_f_names = [
+        p.name for p in plydata.elements[0].properties if p.name.startswith("f_rest_")
+    ]
+    extra_f_names = sorted(extra_f_names, key=lambda x: int(x.split("_")[-1]))
+    max_sh_degree = int(((len(extra_f_names) + 3) / 3) ** 0.5) - 1
+    features_extra = np.zeros((xyz.shape[0], len(extra_f_names)))
+    for idx, attr_name in enumerate(extra_f_names):
+        features_extra[:, idx] = np.asarray(plydata.elements[0][attr_name])
+    features_extra = features_extra.reshape(
+        (features_extra.shape[0], 3, (max_sh_degree + 1) ** 2 - 1)
+    )
+
+    scale_names = [
+        p.name for p in plydata.elements[0].properties if p.name.startswith("scale_")
+    ]
+    scale_names = sorted(scale_names, key=lambda x: int(x.split("_")[-1]))
+    scales = np.zeros((xyz.shape[0], len(scale_names)))
+    for idx, attr_name in enumerate(scale_names):
+        scales[:, idx] = np.asarray(plydata.elements[0][attr_name])
+
+    rot_names = [
+        p.name for p in plydata.elements[0].properties if p.name.startswith("rot")
+    ]
+    rot_names = sorted(rot_names, key=lambda x: int(x.split("_")[-1]))
+    rots = np.zeros((xyz.shape[0], len(rot_names)))
+    for idx, attr_name in enumerate(rot_names):
+        rots[:, idx] = np.asarray(plydata.elements[0][attr_name])
+
+    return {
+        "xyz": torch.tensor(xyz, dtype=torch.float),
+        "features_dc": torch.tensor(features_dc, dtype=torch.float)
+        .transpose(1, 2)
+        .contiguous(),
+        "features_rest": torch.tensor(features_extra, dtype=torch.float)
+        .transpose(1, 2)
+        .contiguous(),
+        "opacity": torch.tensor(opacities, dtype=torch.float),
+        "scaling": torch.tensor(scales, dtype=torch.float),
+        "rotation": torch.tensor(rots, dtype=torch.float),
+    }
+
+
+def vectorized_load(path):
+    arrays = gaussian_arrays(read_vertices(path))
+    return {k: torch.from_numpy(v).contiguous() for k, v in arrays.items()}
+
+
+def noop(path):
+    return None
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="load_ply benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--sh_degree", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = write_synthetic_ply(
+            os.path.join(tmp_dir, "synthetic.ply"), args.num_points, args.sh_degree
+        )
+        print(f"{args.num_points} splats, {os.path.getsize(path) / 2**20:.1f} MB")
+
+        expected = legacy_load(path)
+        actual = vectorized_load(path)
+        for key in expected:
+            assert torch.equal(expected[key], actual[key]), key
+        del expected, actual
+        print("tensors identical")
+
+        _, baseline = run_isolated(noop, path)
+        for name, fn in (("legacy", legacy_load), ("vectorized", vectorized_load)):
+            seconds, peak = run_isolated(fn, path)
+            print(f"{name:>10}: {seconds:.3f} s, peak RSS +{peak - baseline:.1f} MB")
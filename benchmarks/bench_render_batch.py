@@ -0,0 +1,89 @@
+"""
+Views per second of render_batch against the per-view loop in debug.py.
+
+    python -m benchmarks.bench_render_batch --num_points 1000000 --views 200
+
+Both variants end with every image in host memory as (H, W, 3) float32, the loop
+with a blocking .cpu() per view, render_batch with the copies of view k overlapping
+the rendering of view k + 1. Cameras are built up front so only rendering and
+transfers are timed.
+"""
+
+import math
+import time
+from argparse import ArgumentParser
+
+import torch
+
+from benchmarks.bench_frozen_render import synthetic_arrays
+from configs import CONFIG
+from engine.gaussian_renderer import render, render_batch
+from engine.scene.cameras import ViewCamera
+from engine.scene.gaussian_model import GaussianModel
+from engine.utils.graphics_utils import focal2fov, fov2focal
+from viewer.camera import OrbitCamera
+
+
+def orbit_cameras(num_views, width, height):
+    orbit = OrbitCamera(width, height, r=3.0)
+    fovy = math.radians(orbit.fovy)
+    fovx = focal2fov(fov2focal(fovy, height), width)
+    cams = []
+    for _ in range(num_views):
+        orbit.orbit(36000.0 / num_views, 0)
+        pose = orbit.opt_pose
+        cams.append(
+            ViewCamera(
+                R=pose[:3, :3],
+                T=pose[:3, 3],
+                FoVx=fovx,
+                FoVy=fovy,
+                width=width,
+                height=height,
+            )
+        )
+    return cams
+
+
+def per_view_loop(cams, model, opt, bg):
+    for cam in cams:
+        outputs = render(cam, model, opt, bg)
+        outputs["render"].permute(1, 2, 0).detach().cpu().numpy()
+
+
+def batched(cams, model, opt, bg):
+    for outputs in render_batch(cams, model, opt, bg, channels_last=True):
+        outputs["render"].numpy()
+
+
+if __name__ == "__main__":
+    opt = CONFIG()
+    parser = ArgumentParser(description="render_batch throughput benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--views", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    bg = torch.zeros(3, dtype=torch.float32, device="cuda")
+    cams = orbit_cameras(args.views, args.width, args.height)
+
+    for frozen in (True, False):
+        model = GaussianModel(opt.sh_degree, frozen=frozen)
+        model.create_from_arrays(synthetic_arrays(args.num_points))
+
+        rates = {}
+        for name, fn in (("loop", per_view_loop), ("render_batch", batched)):
+            fn(cams[:5], model, opt, bg)
+            torch.cuda.synchronize()
+            start = time.perf_counter()
+            fn(cams, model, opt, bg)
+            torch.cuda.synchronize()
+            rates[name] = args.views / (time.perf_counter() - start)
+
+        print(
+            f"{'frozen' if frozen else 'trainable'} model: "
+            f"loop {rates['loop']:.1f} views/s, "
+            f"render_batch {rates['render_batch']:.1f} views/s "
+            f"({rates['render_batch'] / rates['loop']:.2f}x)"
+        )
@@ -0,0 +1,80 @@
+"""
+Compare the tuple-per-splat PLY writers with the vectorized ones.
+
+    python -m benchmarks.bench_save_ply --sizes 100000 1000000 5000000
+
+For every size the GaussianModel.save_ply layout and the storePly point cloud layout
+are written both ways and the resulting files are checked to be byte-identical.
+"""
+
+import filecmp
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+from benchmarks.common import synthetic_attributes
+from engine.utils.ply_utils import structured_from_columns, write_vertices
+
+POINT_CLOUD_DTYPE = [
+    ("x", "f4"),
+    ("y", "f4"),
+    ("z", "f4"),
+    ("nx", "f4"),
+    ("ny", "f4"),
+    ("nz", "f4"),
+    ("red", "u1"),
+    ("green", "u1"),
+    ("blue", "u1"),
+]
+
+
+def legacy_write(path, attributes, dtype):
+    elements = np.empty(attributes.shape[0], dtype=dtype)
+    elements[:] = list(map(tuple, attributes))
+    PlyData([PlyElement.describe(elements, "vertex")]).write(path)
+
+
+def vectorized_write(path, attributes, dtype):
+    write_vertices(path, structured_from_columns(attributes, dtype))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="save_ply / storePly benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000]
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = os.path.join(tmp_dir, "legacy.ply")
+        vectorized_path = os.path.join(tmp_dir, "vectorized.ply")
+
+        for num_points in args.sizes:
+            names, gaussians = synthetic_attributes(num_points)
+            xyz = rng.standard_normal((num_points, 3))
+            rgb = rng.random((num_points, 3)) * 255
+            point_cloud = np.concatenate((xyz, np.zeros_like(xyz), rgb), axis=1)
+
+            cases = (
+                ("save_ply", gaussians, [(name, "f4") for name in names]),
+                ("storePly", point_cloud, POINT_CLOUD_DTYPE),
+            )
+            for label, attributes, dtype in cases:
+                legacy = timed(legacy_write, legacy_path, attributes, dtype)
+                vectorized = timed(vectorized_write, vectorized_path, attributes, dtype)
+                assert filecmp.cmp(legacy_path, vectorized_path, shallow=False), label
+                print(
+                    f"{label:>9} {num_points:>9}: legacy {legacy:.3f} s, "
+                    f"vectorized {vectorized:.3f} s ({legacy / vectorized:.1f}x)"
+                )
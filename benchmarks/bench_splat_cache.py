@@ -0,0 +1,72 @@
+"""
+Load-time comparison of PLY (plyfile and memmap readers) against the native splat cache.
+
+    python -m benchmarks.bench_splat_cache --num_points 1000000
+
+Each loader ends with contiguous float32 arrays in the GaussianModel layout, which is
+what create_from_arrays hands to the device, so every variant touches all of the data.
+"""
+
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+from benchmarks.common import write_synthetic_ply
+from engine.utils.cache_utils import read_splat_cache, write_splat_cache
+from engine.utils.ply_utils import gaussian_arrays, read_vertices
+
+
+def materialize(arrays):
+    return {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+
+
+def load_plyfile(path):
+    return materialize(gaussian_arrays(read_vertices(path, mmap=False)))
+
+
+def load_ply_memmap(path):
+    return materialize(gaussian_arrays(read_vertices(path)))
+
+
+def load_cache(path):
+    return materialize(read_splat_cache(path))
+
+
+def load_cache_fromfile(path):
+    return materialize(read_splat_cache(path, mmap=False))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="splat cache load benchmark")
+    parser.add_argument("--num_points", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ply_path = write_synthetic_ply(
+            os.path.join(tmp_dir, "synthetic.ply"), args.num_points
+        )
+        cache_path = os.path.join(tmp_dir, "synthetic.gsc")
+        write_splat_cache(cache_path, gaussian_arrays(read_vertices(ply_path)))
+
+        reference = load_plyfile(ply_path)
+        for key, value in load_cache(cache_path).items():
+            assert np.array_equal(reference[key], value), key
+
+        cases = (
+            ("ply (plyfile)", load_plyfile, ply_path),
+            ("ply (memmap)", load_ply_memmap, ply_path),
+            ("cache (memmap)", load_cache, cache_path),
+            ("cache (fromfile)", load_cache_fromfile, cache_path),
+        )
+        # Files are warm in the page cache after the first repeat, report the best run
+        for name, fn, path in cases:
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                fn(path)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:>16}: {min(timings) * 1000:.1f} ms")
@@ -0,0 +1,49 @@
+import multiprocessing
+import resource
+import sys
+import time
+
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+
+def gaussian_attribute_names(sh_degree=3):
+    l = ["x", "y", "z", "nx", "ny", "nz"]
+    l += ["f_dc_{}".format(i) for i in range(3)]
+    l += ["f_rest_{}".format(i) for i in range(3 * (sh_degree + 1) ** 2 - 3)]
+    l.append("opacity")
+    l += ["scale_{}".format(i) for i in range(3)]
+    l += ["rot_{}".format(i) for i in range(4)]
+    return l
+
+
+def synthetic_attributes(num_points, sh_degree=3, seed=0):
+    rng = np.random.default_rng(seed)
+    names = gaussian_attribute_names(sh_degree)
+    attributes = rng.standard_normal((num_points, len(names)), dtype=np.float32)
+    attributes[:, 3:6] = 0.0
+    return names, attributes
+
+
+def write_synthetic_ply(path, num_points, sh_degree=3, seed=0):
+    names, attributes = synthetic_attributes(num_points, sh_degree, seed)
+    elements = attributes.view([(name, "f4") for name in names])[:, 0]
+    PlyData([PlyElement.describe(elements, "vertex")]).write(path)
+    return path
+
+
+def peak_rss_mb():
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _timed(fn, args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start, peak_rss_mb()
+
+
+def run_isolated(fn, *args):
+    """Run fn(*args) in a fresh process and return (seconds, peak RSS in MB)."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_timed, (fn, args))
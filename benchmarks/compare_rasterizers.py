@@ -0,0 +1,196 @@
+"""
+Checks the cpu reference rasterizer against golden images from the CUDA rasterizer.
+
+    # on a CUDA machine, (re)generate the golden set
+    python -m benchmarks.compare_rasterizers --update
+    # anywhere, compare the cpu rasterizer against it
+    python -m benchmarks.compare_rasterizers
+
+The seeded scenes are generated from fixed seeds, so only the rendered images and
+radii are stored, once a CUDA machine has written them. The tiny scene is checked in
+as golden/tiny_scene.json together with its images, rendered by golden_reference.py
+without a GPU, so there is always something to compare against. The image sizes are
+not a multiple of the 16x16 tile on purpose.
+Exits with status 1 when a view is out of tolerance.
+"""
+
+import math
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+
+from benchmarks.golden_reference import GOLDEN_DIR, golden_path, load_scene
+from configs import CONFIG
+from engine.gaussian_renderer import render, render_device
+from engine.scene.cameras import Camera
+from engine.scene.gaussian_model import GaussianModel
+from viewer.camera import OrbitCamera
+
+# checked in with its golden images, see golden_reference.py
+TINY = "tiny"
+WIDTH = 120
+HEIGHT = 90
+NUM_VIEWS = 3
+
+
+def scene_arrays(num_points, scale, opacity, sh_degree, seed):
+    rng = np.random.default_rng(seed)
+    num_rest = (sh_degree + 1) ** 2 - 1
+    rotation = rng.normal(0, 1, (num_points, 4)).astype(np.float32)
+    return {
+        "xyz": rng.uniform(-0.6, 0.6, (num_points, 3)).astype(np.float32),
+        "features_dc": rng.normal(0, 1, (num_points, 1, 3)).astype(np.float32),
+        "features_rest": rng.normal(0, 0.2, (num_points, num_rest, 3)).astype(
+            np.float32
+        ),
+        "opacity": np.full((num_points, 1), opacity, dtype=np.float32),
+        "scaling": (math.log(scale) + rng.normal(0, 0.5, (num_points, 3))).astype(
+            np.float32
+        ),
+        "rotation": rotation,
+    }
+
+
+# name -> (scene arguments, pipeline overrides)
+SCENES = {
+    # many small splats, mostly a few tiles each
+    "small": (
+        dict(num_points=4000, scale=0.01, opacity=0.0, sh_degree=3, seed=0),
+        {},
+    ),
+    # a few large, opaque splats, exercises early termination
+    "opaque": (
+        dict(num_points=200, scale=0.08, opacity=4.0, sh_degree=3, seed=1),
+        {},
+    ),
+    # python side covariance and SH evaluation
+    "python": (
+        dict(num_points=2000, scale=0.02, opacity=1.0, sh_degree=3, seed=2),
+        {"compute_cov3D_python": True, "convert_SHs_python": True},
+    ),
+}
+
+
+def make_camera(R, T, fovx, fovy, width, height, device):
+    return Camera(
+        colmap_id=0,
+        R=R,
+        T=T,
+        FoVx=fovx,
+        FoVy=fovy,
+        image=torch.zeros([3, height, width]),
+        gt_alpha_mask=None,
+        image_name=None,
+        uid=0,
+        data_device=device,
+        device=device,
+    )
+
+
+def view_cameras(device):
+    orbit = OrbitCamera(WIDTH, HEIGHT, r=2.0)
+    fovy = math.radians(orbit.fovy)
+    fovx = 2 * math.atan(math.tan(fovy * 0.5) * WIDTH / HEIGHT)
+    for _ in range(NUM_VIEWS):
+        orbit.orbit(36000.0 / NUM_VIEWS, 1000.0 / NUM_VIEWS)
+        pose = orbit.opt_pose
+        yield make_camera(pose[:3, :3], pose[:3, 3], fovx, fovy, WIDTH, HEIGHT, device)
+
+
+def tiny_scene(device):
+    """(sh_degree, arrays, background, cameras) of the checked in tiny scene."""
+    scene = load_scene()
+    arrays = {
+        name: np.asarray(values, dtype=np.float32)
+        for name, values in scene["gaussians"].items()
+    }
+    cameras = [
+        make_camera(
+            np.asarray(cam["R"]),
+            np.asarray(cam["T"]),
+            cam["fovx"],
+            cam["fovy"],
+            scene["width"],
+            scene["height"],
+            device,
+        )
+        for cam in scene["cameras"]
+    ]
+    return scene["sh_degree"], arrays, scene["background"], cameras
+
+
+def render_scene(name, rasterizer):
+    pipe = CONFIG()
+    pipe.rasterizer = rasterizer
+    device = render_device(pipe)
+    if name == TINY:
+        sh_degree, arrays, bg_color, cameras = tiny_scene(device)
+    else:
+        scene, overrides = SCENES[name]
+        for key, value in overrides.items():
+            setattr(pipe, key, value)
+        sh_degree = scene["sh_degree"]
+        arrays = scene_arrays(**scene)
+        bg_color = [0.1, 0.2, 0.3]
+        cameras = view_cameras(device)
+
+    model = GaussianModel(sh_degree, frozen=True, device=device)
+    model.create_from_arrays(arrays)
+    background = torch.tensor(bg_color, dtype=torch.float32, device=device)
+
+    for cam in cameras:
+        out = render(cam, model, pipe, background)
+        yield out["render"].cpu().numpy(), out["radii"].cpu().numpy()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="cpu rasterizer golden image comparison")
+    parser.add_argument(
+        "--update", action="store_true", help="render the golden set with CUDA"
+    )
+    parser.add_argument("--min_psnr", type=float, default=50.0)
+    parser.add_argument("--max_error", type=float, default=1e-2)
+    parser.add_argument(
+        "--max_radii_mismatch", type=float, default=1e-3, help="fraction of splats"
+    )
+    args = parser.parse_args()
+
+    names = [TINY, *SCENES]
+    if args.update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        for name in names:
+            for view, (image, radii) in enumerate(render_scene(name, "cuda")):
+                np.savez_compressed(golden_path(name, view), image=image, radii=radii)
+                print(f"wrote {golden_path(name, view)}")
+        sys.exit(0)
+
+    failed = False
+    for name in names:
+        if not os.path.exists(golden_path(name, 0)):
+            print(f"skip {name}: no golden images, run --update on a CUDA machine")
+            continue
+        start = time.perf_counter()
+        views = list(render_scene(name, "cpu"))
+        elapsed = (time.perf_counter() - start) / len(views)
+        for view, (image, radii) in enumerate(views):
+            golden = np.load(golden_path(name, view))
+            error = np.abs(image - golden["image"])
+            mse = float(np.mean(error**2))
+            psnr = 10 * math.log10(1.0 / mse) if mse > 0 else math.inf
+            mismatch = float(np.mean(radii != golden["radii"]))
+            ok = (
+                psnr >= args.min_psnr
+                and error.max() <= args.max_error
+                and mismatch <= args.max_radii_mismatch
+            )
+            failed |= not ok
+            print(
+                f"{'ok  ' if ok else 'FAIL'} {name}/{view}: psnr {psnr:.1f} dB, "
+                f"max error {error.max():.2e}, radii mismatch {mismatch:.2%}, "
+                f"{elapsed:.2f} s/view"
+            )
+    sys.exit(1 if failed else 0)
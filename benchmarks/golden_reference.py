@@ -0,0 +1,322 @@
+"""
+Scalar reference renderer for the tiny golden scene of compare_rasterizers.
+
+    python -m benchmarks.golden_reference
+
+renders benchmarks/golden/tiny_scene.json and writes its golden images. It follows
+forward.cu pixel by pixel in plain python (no torch, numpy or GPU needed), so the
+golden set can be rebuilt anywhere and checks the vectorized cpu rasterizer against
+an independent implementation. `compare_rasterizers --update` on a CUDA machine
+replaces these images with the ones of the CUDA rasterizer.
+
+Inputs are rounded to float32 like the tensors of the rasterizers. The quantities
+whose rounding could flip an integer result (radii, tile rectangles) are checked to
+be well away from the next integer, so float32 and float64 agree on them.
+"""
+
+import json
+import math
+import os
+import struct
+import zipfile
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+TINY_SCENE = os.path.join(GOLDEN_DIR, "tiny_scene.json")
+
+# cuda_rasterizer/config.h and auxiliary.h
+BLOCK_X = 16
+BLOCK_Y = 16
+NEAR_PLANE = 0.2
+MAX_ALPHA = 0.99
+MIN_ALPHA = 1.0 / 255.0
+MIN_TRANSMITTANCE = 0.0001
+ZNEAR = 0.01
+ZFAR = 100.0
+# smallest distance to an integer of values rounded to int (in pixels or tiles)
+MIN_MARGIN = 1e-3
+
+SH_C0 = 0.28209479177387814
+SH_C1 = 0.4886025119029199
+SH_C2 = (
+    1.0925484305920792,
+    -1.0925484305920792,
+    0.31539156525252005,
+    -1.0925484305920792,
+    0.5462742152960396,
+)
+SH_C3 = (
+    -0.5900435899266435,
+    2.890611442640554,
+    -0.4570457994644658,
+    0.3731763325901154,
+    -0.4570457994644658,
+    1.445305721320277,
+    -0.5900435899266435,
+)
+
+
+def f32(x):
+    return struct.unpack("<f", struct.pack("<f", x))[0]
+
+
+def matmul(a, b):
+    return [[sum(x * y for x, y in zip(row, col)) for col in zip(*b)] for row in a]
+
+
+def transpose(a):
+    return [list(row) for row in zip(*a)]
+
+
+def apply(matrix, vector):
+    return [sum(m * v for m, v in zip(row, vector)) for row in matrix]
+
+
+def normalize(v):
+    norm = math.sqrt(sum(x * x for x in v))
+    return [x / norm for x in v]
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def rotation_matrix(q):
+    r, x, y, z = normalize(q)
+    return [
+        [1 - 2 * (y * y + z * z), 2 * (x * y - r * z), 2 * (x * z + r * y)],
+        [2 * (x * y + r * z), 1 - 2 * (x * x + z * z), 2 * (y * z - r * x)],
+        [2 * (x * z - r * y), 2 * (y * z + r * x), 1 - 2 * (x * x + y * y)],
+    ]
+
+
+def eval_sh(sh, d):
+    """sh: (coeffs, 3) of degree 0 to 3, d: unit direction. Returns rgb."""
+    x, y, z = d
+    xx, yy, zz = x * x, y * y, z * z
+    xy, yz, xz = x * y, y * z, x * z
+    basis = [SH_C0]
+    if len(sh) > 1:
+        basis += [-SH_C1 * y, SH_C1 * z, -SH_C1 * x]
+    if len(sh) > 4:
+        basis += [
+            SH_C2[0] * xy,
+            SH_C2[1] * yz,
+            SH_C2[2] * (2.0 * zz - xx - yy),
+            SH_C2[3] * xz,
+            SH_C2[4] * (xx - yy),
+        ]
+    if len(sh) > 9:
+        basis += [
+            SH_C3[0] * y * (3 * xx - yy),
+            SH_C3[1] * xy * z,
+            SH_C3[2] * y * (4 * zz - xx - yy),
+            SH_C3[3] * z * (2 * zz - 3 * xx - 3 * yy),
+            SH_C3[4] * x * (4 * zz - xx - yy),
+            SH_C3[5] * z * (xx - yy),
+            SH_C3[6] * x * (xx - 3 * yy),
+        ]
+    return [
+        max(sum(b * coeff[c] for b, coeff in zip(basis, sh)) + 0.5, 0.0)
+        for c in range(3)
+    ]
+
+
+def check_margin(value, what):
+    if abs(value - round(value)) < MIN_MARGIN:
+        raise ValueError(f"{what} = {value} is too close to an integer")
+
+
+def camera_matrices(camera):
+    """(world to view 3x4, projection 4x4, camera center), column-vector form."""
+    R = [[f32(v) for v in row] for row in camera["R"]]
+    T = [f32(v) for v in camera["T"]]
+    world_view = [row + [t] for row, t in zip(transpose(R), T)]
+    tan_x = math.tan(camera["fovx"] / 2)
+    tan_y = math.tan(camera["fovy"] / 2)
+    projection = [
+        [1.0 / tan_x, 0.0, 0.0, 0.0],
+        [0.0, 1.0 / tan_y, 0.0, 0.0],
+        [0.0, 0.0, ZFAR / (ZFAR - ZNEAR), -(ZFAR * ZNEAR) / (ZFAR - ZNEAR)],
+        [0.0, 0.0, 1.0, 0.0],
+    ]
+    # R is orthonormal, the center is -R t
+    center = [-sum(R[i][k] * T[k] for k in range(3)) for i in range(3)]
+    return world_view, projection, center
+
+
+def project(g, width, height, camera, world_view, projection):
+    """Screen-space splat of a gaussian as in preprocessCUDA, None when culled."""
+    grid_x = (width + BLOCK_X - 1) // BLOCK_X
+    grid_y = (height + BLOCK_Y - 1) // BLOCK_Y
+    p_view = apply(world_view, g["xyz"] + [1.0])
+    if p_view[2] <= NEAR_PLANE:
+        return None
+    p_hom = apply(projection, p_view + [1.0])
+    w = p_hom[3] + 0.0000001
+    p_proj = [p_hom[0] / w, p_hom[1] / w]
+
+    sx, sy, sz = g["scale"]
+    M = matmul(rotation_matrix(g["rotation"]), [[sx, 0, 0], [0, sy, 0], [0, 0, sz]])
+    cov3D = matmul(M, transpose(M))
+
+    tan_x = math.tan(camera["fovx"] / 2)
+    tan_y = math.tan(camera["fovy"] / 2)
+    focal_x = width / (2.0 * tan_x)
+    focal_y = height / (2.0 * tan_y)
+    tz = p_view[2]
+    tx = min(max(p_view[0] / tz, -1.3 * tan_x), 1.3 * tan_x) * tz
+    ty = min(max(p_view[1] / tz, -1.3 * tan_y), 1.3 * tan_y) * tz
+    J = [
+        [focal_x / tz, 0.0, -(focal_x * tx) / (tz * tz)],
+        [0.0, focal_y / tz, -(focal_y * ty) / (tz * tz)],
+    ]
+    W = [row[:3] for row in world_view]
+    T = matmul(J, W)
+    cov = matmul(matmul(T, cov3D), transpose(T))
+    a, b, c = cov[0][0] + 0.3, cov[0][1], cov[1][1] + 0.3
+
+    det = a * c - b * b
+    if det == 0.0:
+        return None
+    conic = (c / det, -b / det, a / det)
+    mid = 0.5 * (a + c)
+    lambda1 = mid + math.sqrt(max(0.1, mid * mid - det))
+    extent = 3.0 * math.sqrt(lambda1)
+    check_margin(extent, "radius")
+    radius = math.ceil(extent)
+
+    mean = (
+        ((p_proj[0] + 1.0) * width - 1.0) * 0.5,
+        ((p_proj[1] + 1.0) * height - 1.0) * 0.5,
+    )
+    rect = []
+    for center, block, grid in ((mean[0], BLOCK_X, grid_x), (mean[1], BLOCK_Y, grid_y)):
+        bounds = []
+        for value in ((center - radius) / block, (center + radius + block - 1) / block):
+            if 0 < value < grid:
+                check_margin(value, "tile rectangle")
+            bounds.append(min(max(math.floor(value), 0), grid))
+        rect.append(bounds)
+    (x_min, x_max), (y_min, y_max) = rect
+    if (x_max - x_min) * (y_max - y_min) == 0:
+        return None
+    return {
+        "mean": mean,
+        "depth": tz,
+        "conic": conic,
+        "radius": radius,
+        "rect": (x_min, y_min, x_max, y_max),
+    }
+
+
+def render_view(scene, camera):
+    """Returns the (3, H, W) image as nested lists and the radius of every gaussian."""
+    width = scene["width"]
+    height = scene["height"]
+    bg = scene["background"]
+    world_view, projection, center = camera_matrices(camera)
+
+    gaussians = load_gaussians(scene)
+    splats = []
+    radii = []
+    for g in gaussians:
+        splat = project(g, width, height, camera, world_view, projection)
+        radii.append(0 if splat is None else splat["radius"])
+        if splat is None:
+            continue
+        direction = normalize([p - c for p, c in zip(g["xyz"], center)])
+        splat["color"] = eval_sh(g["sh"], direction)
+        splat["opacity"] = g["opacity"]
+        splats.append(splat)
+    # stable, like the sort by depth of the rasterizers
+    splats.sort(key=lambda s: s["depth"])
+
+    image = [[[0.0] * width for _ in range(height)] for _ in range(3)]
+    for y in range(height):
+        for x in range(width):
+            tile = (x // BLOCK_X, y // BLOCK_Y)
+            C = [0.0, 0.0, 0.0]
+            T = 1.0
+            for s in splats:
+                x_min, y_min, x_max, y_max = s["rect"]
+                if not (x_min <= tile[0] < x_max and y_min <= tile[1] < y_max):
+                    continue
+                dx = s["mean"][0] - x
+                dy = s["mean"][1] - y
+                con = s["conic"]
+                power = -0.5 * (con[0] * dx * dx + con[2] * dy * dy) - con[1] * dx * dy
+                if power > 0.0:
+                    continue
+                alpha = min(MAX_ALPHA, s["opacity"] * math.exp(power))
+                if alpha < MIN_ALPHA:
+                    continue
+                test_T = T * (1 - alpha)
+                if test_T < MIN_TRANSMITTANCE:
+                    break
+                for ch in range(3):
+                    C[ch] += s["color"][ch] * alpha * T
+                T = test_T
+            for ch in range(3):
+                image[ch][y][x] = C[ch] + T * bg[ch]
+    return image, radii
+
+
+def load_scene(path=TINY_SCENE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_gaussians(scene):
+    """Activated attributes of the raw model arrays of the scene, float32 rounded."""
+    arrays = scene["gaussians"]
+    gaussians = []
+    for i in range(len(arrays["xyz"])):
+        sh = [[f32(v) for v in coeff] for coeff in arrays["features_dc"][i]]
+        sh += [[f32(v) for v in coeff] for coeff in arrays["features_rest"][i]]
+        gaussians.append(
+            {
+                "xyz": [f32(v) for v in arrays["xyz"][i]],
+                "sh": sh,
+                "opacity": sigmoid(f32(arrays["opacity"][i][0])),
+                "scale": [math.exp(f32(v)) for v in arrays["scaling"][i]],
+                "rotation": [f32(v) for v in arrays["rotation"][i]],
+            }
+        )
+    return gaussians
+
+
+STRUCT_CODES = {"<f4": "f", "<i4": "i"}
+
+
+def npy_bytes(values, shape, descr):
+    """A .npy file of flat `values`, written without numpy."""
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {shape}, }}"
+    # magic, version and header length take 10 bytes, numpy pads to 64
+    header += " " * (63 - (10 + len(header)) % 64) + "\n"
+    fmt = f"<{len(values)}{STRUCT_CODES[descr]}"
+    return (
+        b"\x93NUMPY\x01\x00"
+        + struct.pack("<H", len(header))
+        + header.encode("latin1")
+        + struct.pack(fmt, *values)
+    )
+
+
+def write_golden(path, image, radii):
+    channels, height, width = len(image), len(image[0]), len(image[0][0])
+    pixels = [v for channel in image for row in channel for v in row]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("image.npy", npy_bytes(pixels, (channels, height, width), "<f4"))
+        z.writestr("radii.npy", npy_bytes(radii, (len(radii),), "<i4"))
+
+
+def golden_path(name, view):
+    return os.path.join(GOLDEN_DIR, f"{name}_{view}.npz")
+
+
+if __name__ == "__main__":
+    scene = load_scene()
+    for view, camera in enumerate(scene["cameras"]):
+        image, radii = render_view(scene, camera)
+        write_golden(golden_path("tiny", view), image, radii)
+        print(f"wrote {golden_path('tiny', view)}")
@@ -0,0 +1,39 @@
+import os
+import time
+from argparse import ArgumentParser
+
+from engine.utils.cache_utils import source_stamp
+from engine.utils.lod_utils import build_lod, lod_is_fresh, lod_path_for, write_lod
+from engine.utils.ply_utils import gaussian_arrays, read_vertices
+
+parser = ArgumentParser(description="Build level-of-detail hierarchies of ply files")
+parser.add_argument("ply_files", nargs="+")
+parser.add_argument(
+    "--output", "-o", type=str, default=None, help="output path (single input only)"
+)
+parser.add_argument("--branching", type=int, default=8, help="children per node")
+parser.add_argument("--force", action="store_true", help="rebuild up-to-date files")
+args = parser.parse_args()
+
+if args.output is not None and len(args.ply_files) != 1:
+    parser.error("--output can only be used with a single input file")
+
+for ply_file in args.ply_files:
+    lod_file = args.output or lod_path_for(ply_file)
+    if not args.force and lod_is_fresh(lod_file, ply_file):
+        print(f"{lod_file} is up to date")
+        continue
+
+    start = time.perf_counter()
+    lod = build_lod(
+        gaussian_arrays(read_vertices(ply_file)),
+        branching=args.branching,
+        progress=lambda level, nodes: print(f"  level {level}: {nodes} nodes"),
+    )
+    write_lod(lod_file, lod, *source_stamp(ply_file))
+    print(
+        f"{ply_file} -> {lod_file} ({int(lod['num_leaves'])} splats, "
+        f"{lod['parent'].shape[0]} nodes, "
+        f"{os.path.getsize(lod_file) / 2**20:.1f} MB) "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
@@ -0,0 +1,111 @@
+import math
+import os
+import time
+from argparse import ArgumentParser
+
+from engine.utils.compression_utils import (
+    COMPRESSED_SUFFIX,
+    encode_gaussians,
+    write_compressed,
+)
+from engine.utils.ply_utils import gaussian_arrays, read_vertices
+
+
+def evaluate_psnr(ply_path, compressed_path, num_views, width, height):
+    # Rendering needs torch and a rasterizer, encoding above does not
+    import torch
+    from configs import CONFIG
+    from engine.gaussian_renderer import render, render_device
+    from engine.scene.cameras import Camera
+    from engine.scene.gaussian_model import GaussianModel
+    from engine.utils.graphics_utils import focal2fov, fov2focal
+    from engine.utils.image_utils import psnr
+    from viewer.camera import OrbitCamera
+
+    opt = CONFIG()
+    device = render_device(opt)
+    reference = GaussianModel(opt.sh_degree, device=device)
+    reference.load_ply(ply_path)
+    compressed = GaussianModel(opt.sh_degree, device=device)
+    compressed.load_compressed(compressed_path)
+    background = torch.zeros(3, dtype=torch.float32, device=device)
+
+    orbit = OrbitCamera(width, height, r=opt.radius)
+    fovy = math.radians(orbit.fovy)
+    fovx = focal2fov(fov2focal(fovy, height), width)
+
+    scores = []
+    with torch.no_grad():
+        for _ in range(num_views):
+            # a full turn around the up axis, orbit() takes 1/100 degree steps
+            orbit.orbit(36000.0 / num_views, 0)
+            pose = orbit.opt_pose
+            cam = Camera(
+                colmap_id=0,
+                R=pose[:3, :3],
+                T=pose[:3, 3],
+                FoVx=fovx,
+                FoVy=fovy,
+                image=torch.zeros([3, height, width]),
+                gt_alpha_mask=None,
+                image_name=None,
+                uid=0,
+                data_device=device,
+                device=device,
+            )
+            gt = render(cam, reference, opt, background)["render"]
+            img = render(cam, compressed, opt, background)["render"]
+            scores.append(psnr(img.clamp(0, 1)[None], gt.clamp(0, 1)[None]).item())
+    return sum(scores) / len(scores)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compress a gaussian ply file")
+    parser.add_argument("ply_file")
+    parser.add_argument("--output", "-o", type=str, default=None)
+    parser.add_argument(
+        "--position_precision", choices=["fp32", "fp16", "uint8"], default="fp16"
+    )
+    parser.add_argument(
+        "--attribute_precision", choices=["fp32", "fp16", "uint8"], default="uint8"
+    )
+    parser.add_argument("--codebook_size", type=int, default=4096)
+    parser.add_argument("--kmeans_iterations", type=int, default=10)
+    parser.add_argument(
+        "--eval_views", type=int, default=0, help="report PSNR over N orbit views"
+    )
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=800)
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.ply_file)[0] + COMPRESSED_SUFFIX
+    precision = {
+        "xyz": args.position_precision,
+        "opacity": args.attribute_precision,
+        "scaling": args.attribute_precision,
+        "rotation": args.attribute_precision,
+    }
+
+    start = time.perf_counter()
+    arrays = gaussian_arrays(read_vertices(args.ply_file))
+    data = encode_gaussians(
+        arrays,
+        precision=precision,
+        codebook_size=args.codebook_size,
+        kmeans_iterations=args.kmeans_iterations,
+    )
+    write_compressed(output, data)
+    elapsed = time.perf_counter() - start
+
+    src_size = os.path.getsize(args.ply_file)
+    dst_size = os.path.getsize(output)
+    print(
+        f"{args.ply_file} -> {output}: {src_size / 2**20:.1f} MB -> "
+        f"{dst_size / 2**20:.1f} MB ({src_size / dst_size:.1f}x) in {elapsed:.1f} s"
+    )
+
+    if args.eval_views > 0:
+        score = evaluate_psnr(
+            args.ply_file, output, args.eval_views, args.width, args.height
+        )
+        print(f"PSNR against the uncompressed model: {score:.2f} dB")
@@ -15,9 +15,39 @@ class CONFIG:
 
     convert_SHs_python = False
     compute_cov3D_python = False
+    # "cuda" or "cpu" (reference rasterizer, no CUDA extension or GPU needed)
+    rasterizer = "cuda"
+    # tile compositing threads of the cpu rasterizer, 0 for all cores
+    cpu_threads = 0
+    # only rasterize gaussians whose spatial index leaves touch the view frustum
+    frustum_culling = False
+    # LOD models: draw the coarsest nodes at most this many pixels wide, 0 for leaves
+    lod_threshold = 2.0
+    # skip splats below this opacity / projected size in pixels, draw every n-th
+    min_opacity = 0.0
+    min_splat_size = 0.0
+    subsample = 1
 
     white_background = False
 
+    # viewer texture readback, "float32" or "uint8" (quantized on the device, a
+    # quarter of the bytes, expanded to float on the host for dearpygui)
+    frame_format = "float32"
+    # viewer loop rate while nothing changes, e.g. 30 to save power when idle,
+    # 0 (default) runs it unthrottled as before
+    idle_fps = 0
+    # dynamic resolution: frame rate kept while dragging and the smallest scale used
+    interactive_fps = 30
+    min_resolution_scale = 0.25
+    # lower resolution, SH degree and splat cutoffs while dragging to hold target_fps
+    adaptive_quality = False
+    target_fps = 30
+
+    # write a native splat cache next to opened ply files and reuse it on reopen
+    ply_cache = True
+    # splats copied to the device per step while loading
+    load_chunk_size = 262144
+
     # ckpt TODO: load from gui window.
 
     ply_path = "/home/swh/Downloads/weapons/weapons/hammer_model.ply"
@@ -0,0 +1,37 @@
+import os
+from argparse import ArgumentParser
+
+from engine.utils.cache_utils import (
+    cache_is_fresh,
+    cache_path_for,
+    source_stamp,
+    write_splat_cache,
+)
+from engine.utils.ply_utils import gaussian_arrays, read_vertices
+
+parser = ArgumentParser(
+    description="Convert gaussian ply files to the native splat cache"
+)
+parser.add_argument("ply_files", nargs="+")
+parser.add_argument(
+    "--output", "-o", type=str, default=None, help="output path (single input only)"
+)
+parser.add_argument("--force", action="store_true", help="rewrite up-to-date caches")
+args = parser.parse_args()
+
+if args.output is not None and len(args.ply_files) != 1:
+    parser.error("--output can only be used with a single input file")
+
+for ply_file in args.ply_files:
+    cache_file = args.output or cache_path_for(ply_file)
+    if not args.force and cache_is_fresh(cache_file, ply_file):
+        print(f"{cache_file} is up to date")
+        continue
+
+    stamp = source_stamp(ply_file)
+    arrays = gaussian_arrays(read_vertices(ply_file))
+    write_splat_cache(cache_file, arrays, *stamp)
+    print(
+        f"{ply_file} -> {cache_file} ({arrays['xyz'].shape[0]} splats, "
+        f"{os.path.getsize(cache_file) / 2**20:.1f} MB)"
+    )
@@ -0,0 +1,33 @@
+import math
+import os
+from argparse import ArgumentParser
+
+from engine.utils.trajectory_utils import (
+    TRAJECTORY_SUFFIX,
+    make_trajectory,
+    read_pose_dir,
+    write_trajectory,
+)
+
+parser = ArgumentParser(
+    description="Convert directories of per-pose .npy files to trajectory files"
+)
+parser.add_argument("pose_dirs", nargs="+")
+parser.add_argument(
+    "--output", "-o", type=str, default=None, help="output path (single input only)"
+)
+parser.add_argument("--width", type=int, default=1920)
+parser.add_argument("--height", type=int, default=1080)
+parser.add_argument("--fovy", type=float, default=60.0, help="vertical fov, degrees")
+args = parser.parse_args()
+
+if args.output is not None and len(args.pose_dirs) != 1:
+    parser.error("--output can only be used with a single input directory")
+
+for pose_dir in args.pose_dirs:
+    trajectory_file = args.output or os.path.normpath(pose_dir) + TRAJECTORY_SUFFIX
+    trajectory = make_trajectory(
+        read_pose_dir(pose_dir), args.width, args.height, math.radians(args.fovy)
+    )
+    write_trajectory(trajectory_file, trajectory)
+    print(f"{pose_dir} -> {trajectory_file} ({len(trajectory)} views)")
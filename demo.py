@@ -3,10 +3,11 @@ from viewer.window import GaussianSplattingGUI
 
 
 from engine.scene.gaussian_model import GaussianModel
+from engine.gaussian_renderer import render_device
 
 
 opt = CONFIG()
-gs_model = GaussianModel(opt.sh_degree)
+gs_model = GaussianModel(opt.sh_degree, device=render_device(opt))
 gui = GaussianSplattingGUI(opt, gs_model)
 
 gui.render()
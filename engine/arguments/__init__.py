@@ -65,6 +65,13 @@ class PipelineParams(ParamGroup):
     def __init__(self, parser):
         self.convert_SHs_python = False
         self.compute_cov3D_python = False
+        self.rasterizer = "cuda"
+        self.cpu_threads = 0
+        self.frustum_culling = False
+        self.lod_threshold = 0.0
+        self.min_opacity = 0.0
+        self.min_splat_size = 0.0
+        self.subsample = 1
         self.debug = False
         super().__init__(parser, "Pipeline Parameters")
 
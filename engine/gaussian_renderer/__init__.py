@@ -11,13 +11,34 @@
 
 import torch
 import math
-from diff_gaussian_rasterization import (
-    GaussianRasterizationSettings,
-    GaussianRasterizer,
-)
+from engine.gaussian_renderer import cpu_rasterizer
 from engine.scene.gaussian_model import GaussianModel
 from engine.utils.sh_utils import eval_sh
 
+try:
+    import diff_gaussian_rasterization
+except ImportError:
+    # Only the cpu rasterizer is available without the CUDA extension
+    diff_gaussian_rasterization = None
+
+
+def get_rasterizer(name="cuda"):
+    """Return the module providing GaussianRasterizationSettings/GaussianRasterizer."""
+    if name == "cpu":
+        return cpu_rasterizer
+    if name != "cuda":
+        raise ValueError(f"Unknown rasterizer '{name}', expected 'cuda' or 'cpu'")
+    if diff_gaussian_rasterization is None:
+        raise ImportError(
+            "diff_gaussian_rasterization is not installed, use the cpu rasterizer"
+        )
+    return diff_gaussian_rasterization
+
+
+def render_device(pipe):
+    """Device of the models, cameras and backgrounds rendered with `pipe`."""
+    return "cpu" if getattr(pipe, "rasterizer", "cuda") == "cpu" else "cuda"
+
 
 def render(
     viewpoint_camera,
@@ -30,26 +51,137 @@ def render(
     """
     Render the scene.
 
-    Background tensor (bg_color) must be on GPU!
+    Background tensor (bg_color) must be on the model's device!
+    pipe.rasterizer selects the backend, "cuda" (default) or "cpu".
+    Frozen models are rendered under torch.inference_mode.
+    """
+    with torch.inference_mode(pc.frozen):
+        return _render(
+            viewpoint_camera, pc, pipe, bg_color, scaling_modifier, override_color
+        )
+
+
+@torch.inference_mode()
+def render_batch(
+    cameras,
+    pc: GaussianModel,
+    pipe,
+    bg_color: torch.Tensor,
+    scaling_modifier=1.0,
+    channels_last=False,
+):
+    """
+    Render an iterable of cameras, yielding the outputs of every view in order with
+    "render" already on the host ((3, H, W), or (H, W, 3) with channels_last).
+
+    Runs under torch.inference_mode (only while the generator executes), so
+    activations, covariances and the features concatenation are evaluated once and
+    reused by every view. On CUDA the image of view k is copied to pinned memory on a
+    side stream while view k + 1 renders. The two host buffers alternate: a yielded
+    image is overwritten two views later, copy it to keep it.
     """
+    if not pc.get_xyz.is_cuda:
+        for camera in cameras:
+            outputs = _render(camera, pc, pipe, bg_color, scaling_modifier)
+            if channels_last:
+                outputs["render"] = outputs["render"].permute(1, 2, 0)
+            yield outputs
+        return
+
+    copy_stream = torch.cuda.Stream()
+    buffers = [None, None]
+    pending = None
+    for k, camera in enumerate(cameras):
+        outputs = _render(camera, pc, pipe, bg_color, scaling_modifier)
+        image = outputs["render"]
+        if channels_last:
+            image = image.permute(1, 2, 0).contiguous()
 
-    # Create zero tensor. We will use it to make pytorch return gradients of the 2D (screen-space) means
-    screenspace_points = (
-        torch.zeros_like(
-            pc.get_xyz, dtype=pc.get_xyz.dtype, requires_grad=True, device="cuda"
+        host = buffers[k % 2]
+        if host is None or host.shape != image.shape:
+            host = torch.empty(image.shape, dtype=image.dtype, pin_memory=True)
+            buffers[k % 2] = host
+
+        # the copy waits for this view only, the next one renders meanwhile
+        copy_stream.wait_stream(torch.cuda.current_stream())
+        copied = torch.cuda.Event()
+        with torch.cuda.stream(copy_stream):
+            host.copy_(image, non_blocking=True)
+            copied.record()
+        image.record_stream(copy_stream)
+        outputs["render"] = host
+
+        if pending is not None:
+            pending[1].synchronize()
+            yield pending[0]
+        pending = (outputs, copied)
+
+    if pending is not None:
+        pending[1].synchronize()
+        yield pending[0]
+
+
+def quality_mask(pc, viewpoint_camera, pipe, scaling_modifier=1.0):
+    """
+    Gaussians kept by pipe.min_opacity, pipe.min_splat_size (pixels of the 3 sigma
+    radius) and pipe.subsample (every n-th gaussian), None when all of them are.
+    """
+    keep = None
+    min_opacity = getattr(pipe, "min_opacity", 0.0)
+    if min_opacity > 0:
+        keep = pc.get_opacity[:, 0] >= min_opacity
+
+    min_splat_size = getattr(pipe, "min_splat_size", 0.0)
+    if min_splat_size > 0:
+        focal = viewpoint_camera.image_height / (
+            2.0 * math.tan(viewpoint_camera.FoVy * 0.5)
         )
-        + 0
-    )
-    try:
-        screenspace_points.retain_grad()
-    except:
-        pass
+        distance = (pc.get_xyz - viewpoint_camera.camera_center).norm(dim=1)
+        radius = 3.0 * scaling_modifier * pc.get_scaling.max(dim=1).values
+        large = focal * radius >= min_splat_size * distance
+        keep = large if keep is None else keep & large
+
+    subsample = getattr(pipe, "subsample", 1)
+    if subsample > 1:
+        strided = torch.zeros(
+            pc.get_xyz.shape[0], dtype=torch.bool, device=pc.get_xyz.device
+        )
+        strided[::subsample] = True
+        keep = strided if keep is None else keep & strided
+    return keep
+
+
+def _render(
+    viewpoint_camera,
+    pc: GaussianModel,
+    pipe,
+    bg_color: torch.Tensor,
+    scaling_modifier=1.0,
+    override_color=None,
+):
+    if pc.frozen:
+        # Nothing is backpropagated, reuse the model's constant zero tensor
+        screenspace_points = pc._screenspace_points
+    elif not torch.is_grad_enabled():
+        screenspace_points = torch.zeros_like(pc.get_xyz)
+    else:
+        # Create zero tensor. We will use it to make pytorch return gradients of the 2D (screen-space) means
+        screenspace_points = (
+            torch.zeros_like(pc.get_xyz, dtype=pc.get_xyz.dtype, requires_grad=True)
+            + 0
+        )
+        try:
+            screenspace_points.retain_grad()
+        except:
+            pass
 
     # Set up rasterization configuration
     tanfovx = math.tan(viewpoint_camera.FoVx * 0.5)
     tanfovy = math.tan(viewpoint_camera.FoVy * 0.5)
 
-    raster_settings = GaussianRasterizationSettings(
+    rasterizer_name = getattr(pipe, "rasterizer", "cuda")
+    backend = get_rasterizer(rasterizer_name)
+    raster_settings = backend.GaussianRasterizationSettings(
         image_height=int(viewpoint_camera.image_height),
         image_width=int(viewpoint_camera.image_width),
         tanfovx=tanfovx,
@@ -64,11 +196,40 @@ def render(
         debug=pipe.debug,
     )
 
-    rasterizer = GaussianRasterizer(raster_settings=raster_settings)
+    if rasterizer_name == "cpu":
+        rasterizer = backend.GaussianRasterizer(
+            raster_settings=raster_settings,
+            num_threads=getattr(pipe, "cpu_threads", 0) or None,
+        )
+    else:
+        rasterizer = backend.GaussianRasterizer(raster_settings=raster_settings)
 
-    means3D = pc.get_xyz
-    means2D = screenspace_points
-    opacity = pc.get_opacity
+    # Only the gaussians in leaves of the spatial index that touch the frustum
+    index = None
+    if getattr(pipe, "frustum_culling", False):
+        index = pc.spatial_index().cull(viewpoint_camera.full_proj_transform)
+    # and, for LOD models, only the nodes of the cut for this view
+    keep = None
+    if pc.lod is not None:
+        keep = pc.lod.cut_mask(
+            pc.get_xyz, viewpoint_camera, getattr(pipe, "lod_threshold", 0.0)
+        )
+    # and the quality cutoffs of the viewer
+    cutoff = quality_mask(pc, viewpoint_camera, pipe, scaling_modifier)
+    if cutoff is not None:
+        keep = cutoff if keep is None else keep & cutoff
+    if keep is not None:
+        if index is None:
+            index = torch.nonzero(keep).squeeze(1)
+        else:
+            index = index[keep[index]]
+
+    def select(tensor):
+        return tensor if index is None else tensor[index]
+
+    means3D = select(pc.get_xyz)
+    means2D = select(screenspace_points)
+    opacity = select(pc.get_opacity)
 
     # If precomputed 3d covariance is provided, use it. If not, then it will be computed from
     # scaling / rotation by the rasterizer.
@@ -76,10 +237,10 @@ def render(
     rotations = None
     cov3D_precomp = None
     if pipe.compute_cov3D_python:
-        cov3D_precomp = pc.get_covariance(scaling_modifier)
+        cov3D_precomp = select(pc.get_covariance(scaling_modifier))
     else:
-        scales = pc.get_scaling
-        rotations = pc.get_rotation
+        scales = select(pc.get_scaling)
+        rotations = select(pc.get_rotation)
 
     # If precomputed colors are provided, use them. Otherwise, if it is desired to precompute colors
     # from SHs in Python, do it. If not, then SH -> RGB conversion will be done by rasterizer.
@@ -87,19 +248,20 @@ def render(
     colors_precomp = None
     if override_color is None:
         if pipe.convert_SHs_python:
-            shs_view = pc.get_features.transpose(1, 2).view(
+            features = select(pc.get_features)
+            shs_view = features.transpose(1, 2).view(
                 -1, 3, (pc.max_sh_degree + 1) ** 2
             )
-            dir_pp = pc.get_xyz - viewpoint_camera.camera_center.repeat(
-                pc.get_features.shape[0], 1
+            dir_pp = means3D - viewpoint_camera.camera_center.repeat(
+                features.shape[0], 1
             )
             dir_pp_normalized = dir_pp / dir_pp.norm(dim=1, keepdim=True)
             sh2rgb = eval_sh(pc.active_sh_degree, shs_view, dir_pp_normalized)
             colors_precomp = torch.clamp_min(sh2rgb + 0.5, 0.0)
         else:
-            shs = pc.get_features
+            shs = select(pc.get_features)
     else:
-        colors_precomp = override_color
+        colors_precomp = select(override_color)
 
     # Rasterize visible Gaussians to image, obtain their radii (on screen).
     rendered_image, radii = rasterizer(
@@ -113,6 +275,11 @@ def render(
         cov3D_precomp=cov3D_precomp,
     )
 
+    if index is not None:
+        culled_radii = radii
+        radii = culled_radii.new_zeros(pc.get_xyz.shape[0])
+        radii[index] = culled_radii
+
     # Those Gaussians that were frustum culled or had a radius of 0 were not visible.
     # They will be excluded from value updates used in the splitting criteria.
     return {
@@ -0,0 +1,477 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Reference implementation of the forward pass in
+# submodules/diff-gaussian-rasterization/cuda_rasterizer, written with vectorized
+# torch ops so it runs wherever torch does. It follows the CUDA kernels step by step
+# (projection, 2D covariance, tile binning, depth sort, front-to-back blending) so
+# both backends produce the same images and radii up to float rounding.
+# It is forward only: nothing is backpropagated to the inputs.
+
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import torch
+from torch import nn
+
+from engine.utils.general_utils import build_scaling_rotation
+from engine.utils.sh_utils import eval_sh
+
+# cuda_rasterizer/config.h and auxiliary.h
+BLOCK_X = 16
+BLOCK_Y = 16
+NEAR_PLANE = 0.2
+MAX_ALPHA = 0.99
+MIN_ALPHA = 1.0 / 255.0
+MIN_TRANSMITTANCE = 0.0001
+
+# Gaussians blended per step within a tile, bounds the (gaussians x pixels) buffers
+BLEND_CHUNK = 512
+# Tiles per side of the super-tiles handed to the worker threads
+SUPER_TILE = 4
+
+# thread count -> pool, kept alive across frames
+_executors = {}
+_executors_lock = threading.Lock()
+# renders inside single_threaded_ops, and the thread count they replaced
+_single_threaded_users = 0
+_saved_num_threads = None
+
+
+class GaussianRasterizationSettings(NamedTuple):
+    image_height: int
+    image_width: int
+    tanfovx: float
+    tanfovy: float
+    bg: torch.Tensor
+    scale_modifier: float
+    viewmatrix: torch.Tensor
+    projmatrix: torch.Tensor
+    sh_degree: int
+    campos: torch.Tensor
+    prefiltered: bool
+    debug: bool
+
+
+class Projection(NamedTuple):
+    # indices of the gaussians that survived culling, everything below is per survivor
+    index: torch.Tensor
+    means2D: torch.Tensor
+    depths: torch.Tensor
+    conics: torch.Tensor
+    radii: torch.Tensor
+    rect_min: torch.Tensor
+    rect_max: torch.Tensor
+
+
+def ndc2pix(v, size):
+    return ((v + 1.0) * size - 1.0) * 0.5
+
+
+def transform_points(points, matrix):
+    """Row-vector transform, as done with the transposed matrices the cameras store."""
+    return points @ matrix[:3] + matrix[3]
+
+
+def in_frustum(means3D, viewmatrix):
+    return transform_points(means3D, viewmatrix[:, :3])[:, 2] > NEAR_PLANE
+
+
+def cov3D_from_precomp(cov3D_precomp):
+    xx, xy, xz, yy, yz, zz = cov3D_precomp.unbind(1)
+    return torch.stack(
+        (
+            torch.stack((xx, xy, xz), dim=1),
+            torch.stack((xy, yy, yz), dim=1),
+            torch.stack((xz, yz, zz), dim=1),
+        ),
+        dim=1,
+    )
+
+
+def compute_cov3D(scales, rotations, scale_modifier):
+    L = build_scaling_rotation(scale_modifier * scales, rotations)
+    return L @ L.transpose(1, 2)
+
+
+def compute_cov2D(p_view, cov3D, focal_x, focal_y, tanfovx, tanfovy, viewmatrix):
+    """EWA splatting, returns the (a, b, c) entries of the dilated 2D covariance."""
+    limx = 1.3 * tanfovx
+    limy = 1.3 * tanfovy
+    tz = p_view[:, 2]
+    tx = (p_view[:, 0] / tz).clamp(-limx, limx) * tz
+    ty = (p_view[:, 1] / tz).clamp(-limy, limy) * tz
+
+    J = p_view.new_zeros((p_view.shape[0], 2, 3))
+    J[:, 0, 0] = focal_x / tz
+    J[:, 0, 2] = -(focal_x * tx) / (tz * tz)
+    J[:, 1, 1] = focal_y / tz
+    J[:, 1, 2] = -(focal_y * ty) / (tz * tz)
+
+    # world to camera rotation in column-vector form
+    T = J @ viewmatrix[:3, :3].T
+    cov = T @ cov3D @ T.transpose(1, 2)
+
+    # low-pass filter, every gaussian is at least one pixel wide
+    return cov[:, 0, 0] + 0.3, cov[:, 0, 1], cov[:, 1, 1] + 0.3
+
+
+def preprocess(means3D, scales, rotations, cov3D_precomp, raster_settings):
+    """Cull and project the gaussians, see preprocessCUDA in forward.cu."""
+    width = raster_settings.image_width
+    height = raster_settings.image_height
+    grid_x = (width + BLOCK_X - 1) // BLOCK_X
+    grid_y = (height + BLOCK_Y - 1) // BLOCK_Y
+    viewmatrix = raster_settings.viewmatrix.to(means3D)
+    projmatrix = raster_settings.projmatrix.to(means3D)
+
+    index = torch.nonzero(in_frustum(means3D, viewmatrix)).squeeze(1)
+    means3D = means3D[index]
+    p_view = transform_points(means3D, viewmatrix[:, :3])
+    p_hom = transform_points(means3D, projmatrix)
+    p_proj = p_hom[:, :3] / (p_hom[:, 3:] + 0.0000001)
+
+    if cov3D_precomp is not None:
+        cov3D = cov3D_from_precomp(cov3D_precomp[index])
+    else:
+        cov3D = compute_cov3D(
+            scales[index], rotations[index], raster_settings.scale_modifier
+        )
+
+    focal_x = width / (2.0 * raster_settings.tanfovx)
+    focal_y = height / (2.0 * raster_settings.tanfovy)
+    a, b, c = compute_cov2D(
+        p_view,
+        cov3D,
+        focal_x,
+        focal_y,
+        raster_settings.tanfovx,
+        raster_settings.tanfovy,
+        viewmatrix,
+    )
+
+    det = a * c - b * b
+    nonsingular = det != 0.0
+    det = torch.where(nonsingular, det, torch.ones_like(det))
+    conics = torch.stack((c / det, -b / det, a / det), dim=1)
+
+    # extent in screen space, 3 sigma along the major eigenvalue
+    mid = 0.5 * (a + c)
+    lambda1 = mid + torch.sqrt((mid * mid - det).clamp_min(0.1))
+    radii = torch.ceil(3.0 * torch.sqrt(lambda1))
+
+    means2D = torch.stack(
+        (ndc2pix(p_proj[:, 0], width), ndc2pix(p_proj[:, 1], height)), dim=1
+    )
+    block = means2D.new_tensor([BLOCK_X, BLOCK_Y])
+    grid = means2D.new_tensor([grid_x, grid_y])
+    rect_min = torch.floor((means2D - radii[:, None]) / block)
+    rect_min = torch.minimum(rect_min.clamp_min(0), grid).long()
+    rect_max = torch.floor((means2D + radii[:, None] + block - 1) / block)
+    rect_max = torch.minimum(rect_max.clamp_min(0), grid).long()
+
+    touched = (rect_max - rect_min).prod(dim=1) > 0
+    visible = nonsingular & touched
+    return Projection(
+        index=index[visible],
+        means2D=means2D[visible],
+        depths=p_view[visible, 2],
+        conics=conics[visible],
+        radii=radii[visible].int(),
+        rect_min=rect_min[visible],
+        rect_max=rect_max[visible],
+    )
+
+
+def bin_gaussians(projection, grid_x, grid_y):
+    """
+    Duplicate every gaussian once per tile it overlaps and sort the copies by tile,
+    then depth. Returns (gaussian per copy, [start, end) of each tile in that list).
+    """
+    order = torch.sort(projection.depths, stable=True).indices
+    rect_min = projection.rect_min[order]
+    tiles = projection.rect_max[order] - rect_min
+    counts = tiles[:, 0] * tiles[:, 1]
+
+    gaussians = torch.repeat_interleave(order, counts)
+    first = torch.repeat_interleave(torch.cumsum(counts, 0) - counts, counts)
+    rank = torch.repeat_interleave(
+        torch.arange(len(order), device=order.device), counts
+    )
+    local = torch.arange(len(gaussians), device=order.device) - first
+    tile_x = rect_min[rank, 0] + local % tiles[rank, 0]
+    tile_y = rect_min[rank, 1] + local // tiles[rank, 0]
+
+    # copies are already in depth order, a stable sort keeps it within each tile
+    tile_ids, perm = torch.sort(tile_y * grid_x + tile_x, stable=True)
+    counts = torch.bincount(tile_ids, minlength=grid_x * grid_y)
+    ends = torch.cumsum(counts, 0)
+    starts = ends - counts
+    return gaussians[perm], starts, ends
+
+
+def blend_tile(ids, x0, y0, x1, y1, means2D, conics, opacities, colors, bg):
+    """Front-to-back alpha blending of one tile, see renderCUDA in forward.cu."""
+    ys, xs = torch.meshgrid(
+        torch.arange(y0, y1, dtype=means2D.dtype, device=means2D.device),
+        torch.arange(x0, x1, dtype=means2D.dtype, device=means2D.device),
+        indexing="ij",
+    )
+    num_pixels = ys.numel()
+    xs = xs.reshape(-1)
+    ys = ys.reshape(-1)
+
+    C = means2D.new_zeros((num_pixels, 3))
+    T = means2D.new_ones(num_pixels)
+    done = torch.zeros(num_pixels, dtype=torch.bool, device=means2D.device)
+
+    for start in range(0, len(ids), BLEND_CHUNK):
+        chunk = ids[start : start + BLEND_CHUNK]
+        xy = means2D[chunk]
+        con = conics[chunk]
+        dx = xy[:, 0:1] - xs
+        dy = xy[:, 1:2] - ys
+        power = (
+            -0.5 * (con[:, 0:1] * dx * dx + con[:, 2:3] * dy * dy)
+            - con[:, 1:2] * dx * dy
+        )
+        alpha = (opacities[chunk] * torch.exp(power)).clamp_max(MAX_ALPHA)
+        skip = (power > 0.0) | (alpha < MIN_ALPHA) | done
+        alpha = torch.where(skip, torch.zeros_like(alpha), alpha)
+
+        # a pixel is done at the first gaussian that would push T below the
+        # threshold, that gaussian and everything behind it are left out
+        T_path = torch.cumprod(torch.cat((T[None], 1.0 - alpha)), dim=0)
+        keep = T_path[1:] >= MIN_TRANSMITTANCE
+        alpha = torch.where(keep, alpha, torch.zeros_like(alpha))
+        T_path = torch.cumprod(torch.cat((T[None], 1.0 - alpha)), dim=0)
+
+        C += (alpha * T_path[:-1]).T @ colors[chunk]
+        T = T_path[-1]
+        done |= ~keep.all(dim=0)
+        if bool(done.all()):
+            break
+
+    image = C + T[:, None] * bg
+    return image.T.reshape(3, y1 - y0, x1 - x0)
+
+
+def rasterize_gaussians(
+    means3D,
+    means2D,
+    shs,
+    colors_precomp,
+    opacities,
+    scales,
+    rotations,
+    cov3D_precomp,
+    raster_settings,
+    num_threads=None,
+):
+    """num_threads: tile compositing threads, None for all cores, 1 to stay serial."""
+    width = raster_settings.image_width
+    height = raster_settings.image_height
+    grid_x = (width + BLOCK_X - 1) // BLOCK_X
+    grid_y = (height + BLOCK_Y - 1) // BLOCK_Y
+    bg = raster_settings.bg.to(means3D)
+
+    with torch.no_grad():
+        projection = preprocess(
+            means3D, scales, rotations, cov3D_precomp, raster_settings
+        )
+        radii = torch.zeros(
+            means3D.shape[0], dtype=torch.int32, device=means3D.device
+        )
+        radii[projection.index] = projection.radii
+
+        if colors_precomp is not None:
+            colors = colors_precomp[projection.index]
+        else:
+            sh_degree = raster_settings.sh_degree
+            coeffs = (sh_degree + 1) ** 2
+            dirs = means3D[projection.index] - raster_settings.campos.to(means3D)
+            dirs = dirs / dirs.norm(dim=1, keepdim=True)
+            sh = shs[projection.index, :coeffs].transpose(1, 2)
+            colors = torch.clamp_min(eval_sh(sh_degree, sh, dirs) + 0.5, 0.0)
+        opacities = opacities[projection.index]
+
+        gaussians, starts, ends = bin_gaussians(projection, grid_x, grid_y)
+        image = bg[:, None, None].repeat(1, height, width)
+        blend = TileBlender(
+            image,
+            gaussians,
+            starts.tolist(),
+            ends.tolist(),
+            projection,
+            opacities,
+            colors,
+            bg,
+            torch.is_inference_mode_enabled(),
+        )
+        tiles = torch.nonzero(ends > starts).squeeze(1).tolist()
+        if num_threads == 1:
+            blend(tiles)
+        else:
+            # workers write straight into disjoint regions of image
+            with single_threaded_ops():
+                tasks = super_tiles(tiles, grid_x)
+                list(get_executor(num_threads).map(blend, tasks))
+    return image, radii
+
+
+def get_executor(num_threads=None):
+    num_threads = num_threads or os.cpu_count()
+    # renders may start from several threads, e.g. the render server's executor
+    with _executors_lock:
+        if num_threads not in _executors:
+            _executors[num_threads] = ThreadPoolExecutor(
+                num_threads,
+                thread_name_prefix="cpu_rasterizer",
+            )
+        return _executors[num_threads]
+
+
+@contextmanager
+def single_threaded_ops():
+    """
+    Limits torch to one intra-op thread while tiles are blended: the pool
+    already runs one task per core, intra-op threads on top of that would only
+    oversubscribe the cpu. The setting is process wide, so overlapping renders
+    share one override and the caller's value comes back after the last one.
+    """
+    global _saved_num_threads, _single_threaded_users
+    with _executors_lock:
+        if _single_threaded_users == 0:
+            _saved_num_threads = torch.get_num_threads()
+            torch.set_num_threads(1)
+        _single_threaded_users += 1
+    try:
+        yield
+    finally:
+        with _executors_lock:
+            _single_threaded_users -= 1
+            if _single_threaded_users == 0:
+                torch.set_num_threads(_saved_num_threads)
+
+
+def super_tiles(tiles, grid_x):
+    """Group tile ids into SUPER_TILE x SUPER_TILE blocks, one task each."""
+    groups = {}
+    for tile in tiles:
+        key = (tile // grid_x // SUPER_TILE, tile % grid_x // SUPER_TILE)
+        groups.setdefault(key, []).append(tile)
+    return list(groups.values())
+
+
+class TileBlender:
+    """
+    Blends lists of tiles into image. The projected arrays are shared by all worker
+    threads (torch releases the GIL inside its kernels), nothing is copied or pickled.
+    """
+
+    def __init__(
+        self,
+        image,
+        gaussians,
+        starts,
+        ends,
+        projection,
+        opacities,
+        colors,
+        bg,
+        inference_mode,
+    ):
+        self.image = image
+        self.gaussians = gaussians
+        self.starts = starts
+        self.ends = ends
+        self.projection = projection
+        self.opacities = opacities
+        self.colors = colors
+        self.bg = bg
+        # grad and inference mode are thread local, workers follow the caller
+        self.inference_mode = inference_mode
+
+    def __call__(self, tiles):
+        _, height, width = self.image.shape
+        grid_x = (width + BLOCK_X - 1) // BLOCK_X
+        with torch.inference_mode(self.inference_mode), torch.no_grad():
+            for tile in tiles:
+                x0 = (tile % grid_x) * BLOCK_X
+                y0 = (tile // grid_x) * BLOCK_Y
+                x1 = min(x0 + BLOCK_X, width)
+                y1 = min(y0 + BLOCK_Y, height)
+                self.image[:, y0:y1, x0:x1] = blend_tile(
+                    self.gaussians[self.starts[tile] : self.ends[tile]],
+                    x0,
+                    y0,
+                    x1,
+                    y1,
+                    self.projection.means2D,
+                    self.projection.conics,
+                    self.opacities,
+                    self.colors,
+                    self.bg,
+                )
+
+
+class GaussianRasterizer(nn.Module):
+    """Drop-in for diff_gaussian_rasterization.GaussianRasterizer."""
+
+    def __init__(self, raster_settings, num_threads=None):
+        super().__init__()
+        self.raster_settings = raster_settings
+        self.num_threads = num_threads
+
+    def markVisible(self, positions):
+        with torch.no_grad():
+            return in_frustum(positions, self.raster_settings.viewmatrix.to(positions))
+
+    def forward(
+        self,
+        means3D,
+        means2D,
+        opacities,
+        shs=None,
+        colors_precomp=None,
+        scales=None,
+        rotations=None,
+        cov3D_precomp=None,
+    ):
+        if (shs is None and colors_precomp is None) or (
+            shs is not None and colors_precomp is not None
+        ):
+            raise Exception(
+                "Please provide excatly one of either SHs or precomputed colors!"
+            )
+
+        if ((scales is None or rotations is None) and cov3D_precomp is None) or (
+            (scales is not None or rotations is not None) and cov3D_precomp is not None
+        ):
+            raise Exception(
+                "Please provide exactly one of either scale/rotation pair or precomputed 3D covariance!"
+            )
+
+        return rasterize_gaussians(
+            means3D,
+            means2D,
+            shs,
+            colors_precomp,
+            opacities,
+            scales,
+            rotations,
+            cov3D_precomp,
+            self.raster_settings,
+            self.num_threads,
+        )
@@ -0,0 +1,89 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Encodings of the (H, W, 3) uint8 RGB frames sent by the render server.
+#
+#   raw    the pixels as they are, what network_gui clients expect
+#   png    lossless, cv2.imencode
+#   jpeg   lossy at a quality from 0 to 100
+#   delta  one flag byte then zlib of the pixels, XORed with the client's previous
+#          frame when the flag is DELTA_FRAME (a static view compresses to ~nothing)
+
+import zlib
+
+import cv2
+import numpy as np
+
+ENCODINGS = ("raw", "png", "jpeg", "delta")
+DEFAULT_JPEG_QUALITY = 90
+# zlib level of delta frames, higher levels cost more time than they save bandwidth
+DELTA_LEVEL = 1
+KEY_FRAME = 0
+DELTA_FRAME = 1
+
+
+def check_encoding(encoding):
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown frame encoding '{encoding}', expected {ENCODINGS}")
+    return encoding
+
+
+class FrameEncoder:
+    """Encodes the frames of one client, keeps its previous frame for "delta"."""
+
+    def __init__(self):
+        self.previous = None
+
+    def encode(self, frame, encoding="raw", quality=DEFAULT_JPEG_QUALITY):
+        check_encoding(encoding)
+        if encoding == "raw":
+            return memoryview(np.ascontiguousarray(frame)).cast("B")
+        if encoding == "delta":
+            return self._encode_delta(frame)
+
+        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        if encoding == "png":
+            ok, data = cv2.imencode(".png", bgr, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        else:
+            ok, data = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError(f"cv2 could not encode a {frame.shape} frame")
+        return data.tobytes()
+
+    def _encode_delta(self, frame):
+        previous, self.previous = self.previous, frame
+        if previous is None or previous.shape != frame.shape:
+            flag, data = KEY_FRAME, frame
+        else:
+            flag, data = DELTA_FRAME, np.bitwise_xor(frame, previous)
+        return bytes((flag,)) + zlib.compress(memoryview(data).cast("B"), DELTA_LEVEL)
+
+
+class FrameDecoder:
+    """Client side of FrameEncoder, returns (H, W, 3) uint8 RGB frames."""
+
+    def __init__(self):
+        self.previous = None
+
+    def decode(self, data, width, height, encoding="raw"):
+        check_encoding(encoding)
+        if encoding == "raw":
+            return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+        if encoding == "delta":
+            pixels = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8)
+            frame = pixels.reshape(height, width, 3)
+            if data[0] == DELTA_FRAME:
+                frame = np.bitwise_xor(frame, self.previous)
+            self.previous = frame
+            return frame
+
+        bgr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
@@ -13,7 +13,7 @@ import torch
 import traceback
 import socket
 import json
-from scene.cameras import MiniCam
+from engine.gaussian_renderer.render_server import parse_camera_message
 
 host = "127.0.0.1"
 port = 6009
@@ -40,11 +40,21 @@ def try_connect():
     except Exception as inst:
         pass
             
-def read():
+def recv_exact(length):
+    # recv returns whatever has arrived, up to length bytes
     global conn
-    messageLength = conn.recv(4)
+    data = bytearray()
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed by the viewer")
+        data += chunk
+    return bytes(data)
+
+def read():
+    messageLength = recv_exact(4)
     messageLength = int.from_bytes(messageLength, 'little')
-    message = conn.recv(messageLength)
+    message = recv_exact(messageLength)
     return json.loads(message.decode("utf-8"))
 
 def send(message_bytes, verify):
@@ -57,30 +67,21 @@ def send(message_bytes, verify):
 def receive():
     message = read()
 
-    width = message["resolution_x"]
-    height = message["resolution_y"]
-
-    if width != 0 and height != 0:
+    request = parse_camera_message(message)
+    if request is not None:
         try:
-            do_training = bool(message["train"])
-            fovy = message["fov_y"]
-            fovx = message["fov_x"]
-            znear = message["z_near"]
-            zfar = message["z_far"]
-            do_shs_python = bool(message["shs_python"])
-            do_rot_scale_python = bool(message["rot_scale_python"])
-            keep_alive = bool(message["keep_alive"])
-            scaling_modifier = message["scaling_modifier"]
-            world_view_transform = torch.reshape(torch.tensor(message["view_matrix"]), (4, 4)).cuda()
-            world_view_transform[:,1] = -world_view_transform[:,1]
-            world_view_transform[:,2] = -world_view_transform[:,2]
-            full_proj_transform = torch.reshape(torch.tensor(message["view_projection_matrix"]), (4, 4)).cuda()
-            full_proj_transform[:,1] = -full_proj_transform[:,1]
-            custom_cam = MiniCam(width, height, fovy, fovx, znear, zfar, world_view_transform, full_proj_transform)
+            custom_cam = request.camera("cuda")
         except Exception as e:
             print("")
             traceback.print_exc()
             raise e
-        return custom_cam, do_training, do_shs_python, do_rot_scale_python, keep_alive, scaling_modifier
+        return (
+            custom_cam,
+            request.train,
+            request.shs_python,
+            request.rot_scale_python,
+            request.keep_alive,
+            request.scaling_modifier,
+        )
     else:
-        return None, None, None, None, None, None
\ No newline at end of file
+        return None, None, None, None, None, None
@@ -0,0 +1,440 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# asyncio server for the network_gui protocol of the SIBR remote viewer.
+#
+# A client sends cameras as a 4 byte little-endian length followed by that many bytes
+# of JSON. For every message the server answers with the rendered image as raw
+# (H, W, 3) uint8 bytes (nothing when the requested resolution is 0), then a 4 byte
+# length and the ascii `verify` string. Any number of clients can be connected, the
+# renders run on a dedicated executor so the event loop keeps serving the others.
+#
+# A message may also ask for "encoding" "png", "jpeg" (with "jpeg_quality") or
+# "delta" (see frame_encoding.py), the image is then preceded by its 4 byte length.
+# Frames are encoded on a worker pool while the next frame of the client renders.
+#
+# Viewers like SIBR wait for each frame before sending the next camera. Clients that
+# stream cameras instead can be served latest-wins (coalesce=True): a camera still
+# queued when a newer one arrives is dropped without a reply, so such clients should
+# keep the resolution fixed and take every frame as the answer to their newest camera.
+
+import asyncio
+import json
+import struct
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import torch
+
+from engine.gaussian_renderer import render
+from engine.gaussian_renderer.frame_encoding import (
+    DEFAULT_JPEG_QUALITY,
+    FrameEncoder,
+    check_encoding,
+)
+from engine.scene.cameras import MiniCam
+
+HEADER = struct.Struct("<I")
+# camera messages are a few hundred bytes, anything past this is a broken stream
+MAX_MESSAGE_SIZE = 1 << 20
+# threads encoding frames of all clients, png/jpeg/zlib release the GIL
+ENCODE_WORKERS = 2
+
+
+class CameraRequest(NamedTuple):
+    width: int
+    height: int
+    fovx: float
+    fovy: float
+    znear: float
+    zfar: float
+    view_matrix: tuple
+    view_projection_matrix: tuple
+    train: bool
+    shs_python: bool
+    rot_scale_python: bool
+    keep_alive: bool
+    scaling_modifier: float
+
+    def camera(self, device="cuda"):
+        """The MiniCam of this request, with the viewer's y and z axes flipped."""
+        world_view_transform = torch.tensor(self.view_matrix).reshape(4, 4).to(device)
+        world_view_transform[:, 1] = -world_view_transform[:, 1]
+        world_view_transform[:, 2] = -world_view_transform[:, 2]
+        full_proj_transform = (
+            torch.tensor(self.view_projection_matrix).reshape(4, 4).to(device)
+        )
+        full_proj_transform[:, 1] = -full_proj_transform[:, 1]
+        return MiniCam(
+            self.width,
+            self.height,
+            self.fovy,
+            self.fovx,
+            self.znear,
+            self.zfar,
+            world_view_transform,
+            full_proj_transform,
+        )
+
+
+class QueuedCamera(NamedTuple):
+    # None when the message asked for no image
+    request: CameraRequest
+    encoding: str
+    quality: int
+    # time.perf_counter() when the message was read
+    received: float
+
+
+def parse_camera_message(message):
+    """CameraRequest of a decoded JSON message, None when no image is requested."""
+    width = message["resolution_x"]
+    height = message["resolution_y"]
+    if width == 0 or height == 0:
+        return None
+    return CameraRequest(
+        width=int(width),
+        height=int(height),
+        fovx=message["fov_x"],
+        fovy=message["fov_y"],
+        znear=message["z_near"],
+        zfar=message["z_far"],
+        view_matrix=tuple(message["view_matrix"]),
+        view_projection_matrix=tuple(message["view_projection_matrix"]),
+        train=bool(message["train"]),
+        shs_python=bool(message["shs_python"]),
+        rot_scale_python=bool(message["rot_scale_python"]),
+        keep_alive=bool(message["keep_alive"]),
+        scaling_modifier=message["scaling_modifier"],
+    )
+
+
+def encode_message(payload):
+    data = json.dumps(payload).encode("utf-8")
+    return HEADER.pack(len(data)) + data
+
+
+async def read_message(reader, max_size=MAX_MESSAGE_SIZE):
+    """Next length-prefixed JSON message, raises IncompleteReadError at EOF."""
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if length > max_size:
+        raise ValueError(f"message of {length} bytes exceeds {max_size}")
+    return json.loads((await reader.readexactly(length)).decode("utf-8"))
+
+
+def image_to_bytes(image):
+    """(3, H, W) image in [0, 1] to the raw (H, W, 3) uint8 bytes of the protocol."""
+    image = (image.clamp(0.0, 1.0) * 255).byte().permute(1, 2, 0).contiguous()
+    return memoryview(image.cpu().numpy()).cast("B")
+
+
+def make_render_fn(pc, pipe, bg_color):
+    """render_fn rendering requests of a GaussianModel on its own device."""
+
+    def render_fn(request):
+        camera = request.camera(pc.get_xyz.device)
+        outputs = render(camera, pc, pipe, bg_color, request.scaling_modifier)
+        return image_to_bytes(outputs["render"])
+
+    return render_fn
+
+
+class ClientStats:
+    """Counters and recent end-to-end latencies (message read to reply sent)."""
+
+    def __init__(self, window=1024):
+        self.received = 0
+        self.served = 0
+        self.dropped = 0
+        # replies whose render was shared with a request of another client
+        self.shared = 0
+        self.bytes_sent = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=window)
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {p: 0.0 for p in percentiles}
+        last = len(ordered) - 1
+        return {p: ordered[round(p / 100 * last)] for p in percentiles}
+
+    def as_dict(self):
+        return {
+            "received": self.received,
+            "served": self.served,
+            "dropped": self.dropped,
+            "shared": self.shared,
+            "bytes_sent": self.bytes_sent,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": {
+                f"p{p}": 1000 * seconds
+                for p, seconds in self.latency_percentiles().items()
+            },
+        }
+
+
+class RenderServer:
+    """
+    Serves render_fn(CameraRequest) -> image bytes to any number of clients.
+
+    render_fn runs on `executor`, by default a single dedicated thread: renders of a
+    GPU are serialized anyway, and a stub or cpu render_fn keeps the server testable
+    with a loopback client. Reading, parsing and writing stay on the event loop.
+
+    Every client has a reader task queueing its cameras and a sender answering them
+    in order. With coalesce=True only the newest queued camera is kept. Requests equal
+    to one already being rendered (same pose, resolution and settings, from any
+    client) wait for that render instead of starting another one.
+    """
+
+    def __init__(
+        self,
+        render_fn,
+        host="127.0.0.1",
+        port=6009,
+        verify="",
+        executor=None,
+        encode_executor=None,
+        coalesce=False,
+        max_message_size=MAX_MESSAGE_SIZE,
+    ):
+        self.render_fn = render_fn
+        self.host = host
+        self.port = port
+        self.verify = verify.encode("ascii")
+        self.coalesce = coalesce
+        self.max_message_size = max_message_size
+
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        self.executor = executor
+        self._own_encode_executor = encode_executor is None
+        if encode_executor is None:
+            encode_executor = ThreadPoolExecutor(
+                max_workers=ENCODE_WORKERS, thread_name_prefix="encode"
+            )
+        self.encode_executor = encode_executor
+        self._server = None
+        # handler task -> writer of every connected client
+        self._clients = {}
+        # "host:port" of every connected client -> ClientStats
+        self.client_stats = {}
+        # CameraRequest -> future of its render in flight
+        self._in_flight = {}
+
+    @property
+    def address(self):
+        """(host, port) actually bound, port 0 picks a free one."""
+        return self._server.sockets[0].getsockname()[:2]
+
+    def stats(self):
+        return {peer: stats.as_dict() for peer, stats in self.client_stats.items()}
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # closing the transports ends the handlers at their next read
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+        if self._own_encode_executor:
+            self.encode_executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        peer = "{}:{}".format(*writer.get_extra_info("peername")[:2])
+        stats = ClientStats()
+        self.client_stats[peer] = stats
+
+        pending = deque()
+        queued = asyncio.Event()
+        # one rendered frame waits for encoding while the next one renders
+        rendered = asyncio.Queue(maxsize=1)
+        stages = [
+            asyncio.create_task(self._render_frames(pending, queued, rendered, stats)),
+            asyncio.create_task(self._send_frames(writer, rendered, stats)),
+        ]
+        try:
+            while True:
+                message = await read_message(reader, self.max_message_size)
+                received = time.perf_counter()
+                stats.received += 1
+                camera = QueuedCamera(
+                    parse_camera_message(message),
+                    check_encoding(message.get("encoding", "raw")),
+                    int(message.get("jpeg_quality", DEFAULT_JPEG_QUALITY)),
+                    received,
+                )
+                if self.coalesce and pending:
+                    stats.dropped += len(pending)
+                    pending.clear()
+                pending.append(camera)
+                stats.queue_depth = len(pending)
+                stats.max_queue_depth = max(stats.max_queue_depth, len(pending))
+                queued.set()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            # a bad message drops this client only
+            traceback.print_exc()
+        finally:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            del self._clients[task]
+            del self.client_stats[peer]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _render_frames(self, pending, queued, rendered, stats):
+        try:
+            while True:
+                if not pending:
+                    queued.clear()
+                    await queued.wait()
+                    continue
+                camera = pending.popleft()
+                stats.queue_depth = len(pending)
+
+                image = None
+                if camera.request is not None:
+                    image = await self._render_shared(camera.request, stats)
+                await rendered.put((camera, image))
+        except Exception:
+            # a failed render drops this client only, the sender stops on None
+            traceback.print_exc()
+            await rendered.put(None)
+
+    async def _send_frames(self, writer, rendered, stats):
+        loop = asyncio.get_running_loop()
+        encoder = FrameEncoder()
+        try:
+            while True:
+                item = await rendered.get()
+                if item is None:
+                    break
+                camera, image = item
+                if image is not None:
+                    request = camera.request
+                    frame = np.frombuffer(image, dtype=np.uint8).reshape(
+                        request.height, request.width, 3
+                    )
+                    data = await loop.run_in_executor(
+                        self.encode_executor,
+                        encoder.encode,
+                        frame,
+                        camera.encoding,
+                        camera.quality,
+                    )
+                    # raw frames have the size of the image, as network_gui sent them
+                    if camera.encoding != "raw":
+                        writer.write(HEADER.pack(len(data)))
+                    writer.write(data)
+                    stats.bytes_sent += len(data)
+                writer.write(HEADER.pack(len(self.verify)) + self.verify)
+                await writer.drain()
+                stats.served += 1
+                stats.latencies.append(time.perf_counter() - camera.received)
+        except ConnectionError:
+            pass
+        except Exception:
+            traceback.print_exc()
+        # the reader sees the close and ends the client
+        writer.close()
+
+    async def _render_shared(self, request, stats):
+        future = self._in_flight.get(request)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self.render_fn, request)
+            self._in_flight[request] = future
+
+            def done(future):
+                if self._in_flight.get(request) is future:
+                    del self._in_flight[request]
+
+            future.add_done_callback(done)
+        else:
+            stats.shared += 1
+        # a client leaving must not cancel a render others are waiting for
+        return await asyncio.shield(future)
+
+
+class RenderClient:
+    """Minimal asyncio client of the protocol, for tests and benchmarks."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=6009):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def render(self, message):
+        """Send a camera message, returns (image bytes or None, verify string)."""
+        await self.send(message)
+        return await self.receive(message)
+
+    async def send(self, message):
+        self.writer.write(encode_message(message))
+        await self.writer.drain()
+
+    async def receive(self, message):
+        """Read the reply to a camera message sent with the same resolution and
+        encoding, the image is returned as sent (see FrameDecoder)."""
+        image = None
+        if message["resolution_x"] and message["resolution_y"]:
+            if message.get("encoding", "raw") == "raw":
+                size = message["resolution_x"] * message["resolution_y"] * 3
+            else:
+                (size,) = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+            image = await self.reader.readexactly(size)
+        (length,) = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        verify = await self.reader.readexactly(length)
+        return image, verify.decode("ascii")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
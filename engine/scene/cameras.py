@@ -12,7 +12,13 @@
 import torch
 from torch import nn
 import numpy as np
-from engine.utils.graphics_utils import getWorld2View2, getProjectionMatrix
+from engine.utils.graphics_utils import (
+    getWorld2View2,
+    getWorld2ViewBatch,
+    getProjectionMatrix,
+    getProjectionMatrixBatch,
+    getProjectionMatrixCached,
+)
 
 
 class Camera(nn.Module):
@@ -30,6 +36,7 @@ class Camera(nn.Module):
         trans=np.array([0.0, 0.0, 0.0]),
         scale=1.0,
         data_device="cuda",
+        device="cuda",
     ):
         super(Camera, self).__init__()
 
@@ -68,14 +75,16 @@ class Camera(nn.Module):
         self.scale = scale
 
         self.world_view_transform = (
-            torch.tensor(getWorld2View2(R, T, trans, scale)).transpose(0, 1).cuda()
+            torch.tensor(getWorld2View2(R, T, trans, scale))
+            .transpose(0, 1)
+            .to(device)
         )
         self.projection_matrix = (
             getProjectionMatrix(
                 znear=self.znear, zfar=self.zfar, fovX=self.FoVx, fovY=self.FoVy
             )
             .transpose(0, 1)
-            .cuda()
+            .to(device)
         )
         self.full_proj_transform = (
             self.world_view_transform.unsqueeze(0).bmm(
@@ -85,6 +94,111 @@ class Camera(nn.Module):
         self.camera_center = self.world_view_transform.inverse()[3, :3]
 
 
+class ViewCamera:
+    """
+    Render-only camera with an explicit image size. Unlike Camera it holds no image,
+    the projection comes from a cache keyed on the fov and clip planes, and all
+    matrices plus the camera center are assembled on the host and moved to the device
+    in one copy.
+    """
+
+    def __init__(
+        self,
+        R,
+        T,
+        FoVx,
+        FoVy,
+        width,
+        height,
+        znear=0.01,
+        zfar=100.0,
+        trans=np.array([0.0, 0.0, 0.0]),
+        scale=1.0,
+        device="cuda",
+    ):
+        self.R = R
+        self.T = T
+        self.FoVx = FoVx
+        self.FoVy = FoVy
+        self.image_width = width
+        self.image_height = height
+        self.znear = znear
+        self.zfar = zfar
+        self.trans = trans
+        self.scale = scale
+
+        world_view, camera_center = getWorld2ViewBatch(R, T, trans, scale)
+        projection = getProjectionMatrixCached(znear, zfar, FoVx, FoVy)
+        packed = pack_view_matrices(world_view, projection, camera_center)
+        self._set_matrices(torch.from_numpy(packed).to(device))
+
+    def _set_matrices(self, packed):
+        self.world_view_transform = packed[:16].view(4, 4)
+        self.projection_matrix = packed[16:32].view(4, 4)
+        self.full_proj_transform = packed[32:48].view(4, 4)
+        self.camera_center = packed[48:]
+
+    @classmethod
+    def from_trajectory(cls, trajectory, znear=0.01, zfar=100.0, device="cuda"):
+        """
+        Cameras of every view of a trajectory (see trajectory_utils.py), with all
+        matrices built in one batched operation and moved to the device in one copy.
+        """
+        pose = np.asarray(trajectory["pose"])
+        fovx = np.asarray(trajectory["fovx"])
+        fovy = np.asarray(trajectory["fovy"])
+        R, T = pose[:, :3, :3], pose[:, :3, 3]
+        world_view, camera_center = getWorld2ViewBatch(R, T)
+        projection = getProjectionMatrixBatch(znear, zfar, fovx, fovy)
+        projection = np.swapaxes(projection, 1, 2)
+        packed = torch.from_numpy(
+            pack_view_matrices(world_view, projection, camera_center)
+        ).to(device)
+
+        cameras = []
+        for i in range(pose.shape[0]):
+            camera = cls.__new__(cls)
+            camera.R = R[i]
+            camera.T = T[i]
+            camera.FoVx = float(fovx[i])
+            camera.FoVy = float(fovy[i])
+            camera.image_width = int(trajectory["width"][i])
+            camera.image_height = int(trajectory["height"][i])
+            camera.znear = znear
+            camera.zfar = zfar
+            camera.trans = np.array([0.0, 0.0, 0.0])
+            camera.scale = 1.0
+            camera._set_matrices(packed[i])
+            cameras.append(camera)
+        return cameras
+
+
+def pack_view_matrices(world_view, projection, camera_center):
+    """
+    (..., 51) float32 rows of the transposed world_view, projection and full_proj
+    matrices followed by the camera center, as ViewCamera keeps them on the device.
+    world_view is (..., 4, 4) in getWorld2View2 layout, projection already transposed
+    and camera_center (..., 3).
+    """
+    world_view_transform = np.swapaxes(world_view, -1, -2)
+    batch = np.broadcast_shapes(world_view.shape[:-2], camera_center.shape[:-1])
+    packed = np.empty(batch + (3 * 16 + 3,), dtype=np.float32)
+    matrices = packed[..., :48].reshape(batch + (3, 4, 4))
+    matrices[..., 0, :, :] = world_view_transform
+    matrices[..., 1, :, :] = projection
+    np.matmul(world_view_transform, projection, out=matrices[..., 2, :, :])
+    packed[..., 48:] = camera_center
+    return packed
+
+
+def trajectory_cameras(trajectory, znear=0.01, zfar=100.0, device="cuda", chunk=1024):
+    """Yield the ViewCameras of a trajectory, built `chunk` views at a time."""
+    for start in range(0, len(trajectory), chunk):
+        yield from ViewCamera.from_trajectory(
+            trajectory[start : start + chunk], znear, zfar, device
+        )
+
+
 class MiniCam:
     def __init__(
         self,
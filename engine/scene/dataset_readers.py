@@ -26,7 +26,12 @@ from engine.utils.graphics_utils import getWorld2View2, focal2fov, fov2focal
 import numpy as np
 import json
 from pathlib import Path
-from plyfile import PlyData, PlyElement
+from engine.utils.ply_utils import (
+    field_block,
+    read_vertices,
+    structured_from_columns,
+    write_vertices,
+)
 from engine.utils.sh_utils import SH2RGB
 from engine.scene.gaussian_model import BasicPointCloud
 
@@ -128,12 +133,11 @@ def readColmapCameras(cam_extrinsics, cam_intrinsics, images_folder):
     return cam_infos
 
 
-def fetchPly(path):
-    plydata = PlyData.read(path)
-    vertices = plydata["vertex"]
-    positions = np.vstack([vertices["x"], vertices["y"], vertices["z"]]).T
-    colors = np.vstack([vertices["red"], vertices["green"], vertices["blue"]]).T / 255.0
-    normals = np.vstack([vertices["nx"], vertices["ny"], vertices["nz"]]).T
+def fetchPly(path, mmap=True):
+    vertices = read_vertices(path, mmap=mmap)
+    positions = field_block(vertices, ["x", "y", "z"])
+    colors = field_block(vertices, ["red", "green", "blue"], dtype=np.float64) / 255.0
+    normals = field_block(vertices, ["nx", "ny", "nz"])
     return BasicPointCloud(points=positions, colors=colors, normals=normals)
 
 
@@ -153,14 +157,10 @@ def storePly(path, xyz, rgb):
 
     normals = np.zeros_like(xyz)
 
-    elements = np.empty(xyz.shape[0], dtype=dtype)
     attributes = np.concatenate((xyz, normals, rgb), axis=1)
-    elements[:] = list(map(tuple, attributes))
+    elements = structured_from_columns(attributes, dtype)
 
-    # Create the PlyData object and write to file
-    vertex_element = PlyElement.describe(elements, "vertex")
-    ply_data = PlyData([vertex_element])
-    ply_data.write(path)
+    write_vertices(path, elements)
 
 
 def readColmapSceneInfo(path, images, eval, llffhold=8):
@@ -19,13 +19,52 @@ from engine.utils.general_utils import (
 from torch import nn
 import os
 from engine.utils.system_utils import mkdir_p
-from plyfile import PlyData, PlyElement
+from engine.utils.ply_utils import (
+    gaussian_arrays,
+    read_vertices,
+    structured_from_columns,
+    write_vertices,
+)
+from engine.utils.cache_utils import (
+    CACHE_SUFFIX,
+    LOAD_CHUNK_SIZE,
+    cache_is_fresh,
+    cache_path_for,
+    read_splat_cache,
+    source_stamp,
+    write_splat_cache,
+)
+from engine.utils.compression_utils import COMPRESSED_SUFFIX, read_compressed
+from engine.utils.lod_utils import LOD_SUFFIX, read_lod
+from engine.scene.lod import LodHierarchy
+from engine.scene.spatial_index import SpatialIndex
 from engine.utils.sh_utils import RGB2SH
-from simple_knn._C import distCUDA2
+try:
+    from simple_knn._C import distCUDA2
+except ImportError:
+    # only needed to initialize a model from a point cloud
+    distCUDA2 = None
 from engine.utils.graphics_utils import BasicPointCloud
 from engine.utils.general_utils import strip_symmetric, build_scaling_rotation
 
 
+def split_progress(progress):
+    """
+    Two progress callbacks reporting into the first and second half of `progress`,
+    so a load that writes the splat cache and then uploads fills one bar once.
+    """
+    if progress is None:
+        return None, None
+
+    def first(done, total):
+        progress(done, 2 * total)
+
+    def second(done, total):
+        progress(total + done, 2 * total)
+
+    return first, second
+
+
 class GaussianModel:
     def setup_functions(self):
         def build_covariance_from_scaling_rotation(scaling, scaling_modifier, rotation):
@@ -44,7 +83,16 @@ class GaussianModel:
 
         self.rotation_activation = torch.nn.functional.normalize
 
-    def __init__(self, sh_degree: int):
+    def __init__(self, sh_degree: int, frozen: bool = False, device="cuda"):
+        # A frozen model is read-only: it holds plain tensors instead of parameters
+        # and keeps its activated attributes, computed once at load time.
+        self.frozen = frozen
+        self.device = torch.device(device)
+        # Bumped whenever the attribute tensors are replaced, see _cached
+        self._version = 0
+        self._activation_cache = {}
+        # LodHierarchy over the loaded nodes, see load_lod
+        self.lod = None
         self.active_sh_degree = 0
         self.max_sh_degree = sh_degree
         self._xyz = torch.empty(0)
@@ -92,18 +140,46 @@ class GaussianModel:
             opt_dict,
             self.spatial_lr_scale,
         ) = model_args
+        self.bump_version()
         self.training_setup(training_args)
         self.xyz_gradient_accum = xyz_gradient_accum
         self.denom = denom
         self.optimizer.load_state_dict(opt_dict)
 
+    def bump_version(self):
+        self._version += 1
+        self._activation_cache.clear()
+
+    def _cached(self, key, sources, compute):
+        """
+        Memoize compute() until the model version changes or one of the source tensors
+        is modified in place (e.g. by an optimizer step, tracked by tensor._version).
+        Results that would carry autograd history are never reused, their graph is
+        freed by the first backward().
+        """
+        if torch.is_grad_enabled() and any(t.requires_grad for t in sources):
+            return compute()
+        state = (self._version, tuple(t._version for t in sources))
+        entry = self._activation_cache.get(key)
+        if entry is not None and entry[0] == state:
+            return entry[1]
+        value = compute()
+        self._activation_cache[key] = (state, value)
+        return value
+
     @property
     def get_scaling(self):
-        return self.scaling_activation(self._scaling)
+        return self._cached(
+            "scaling", (self._scaling,), lambda: self.scaling_activation(self._scaling)
+        )
 
     @property
     def get_rotation(self):
-        return self.rotation_activation(self._rotation)
+        return self._cached(
+            "rotation",
+            (self._rotation,),
+            lambda: self.rotation_activation(self._rotation),
+        )
 
     @property
     def get_xyz(self):
@@ -111,49 +187,77 @@ class GaussianModel:
 
     @property
     def get_features(self):
+        if self.frozen:
+            # features_dc and features_rest are views into this tensor
+            return self._features
         features_dc = self._features_dc
         features_rest = self._features_rest
-        return torch.cat((features_dc, features_rest), dim=1)
+        return self._cached(
+            "features",
+            (features_dc, features_rest),
+            lambda: torch.cat((features_dc, features_rest), dim=1),
+        )
 
     @property
     def get_opacity(self):
-        return self.opacity_activation(self._opacity)
+        return self._cached(
+            "opacity", (self._opacity,), lambda: self.opacity_activation(self._opacity)
+        )
 
     def get_covariance(self, scaling_modifier=1):
-        return self.covariance_activation(
-            self.get_scaling, scaling_modifier, self._rotation
+        return self._cached(
+            ("covariance", scaling_modifier),
+            (self._scaling, self._rotation),
+            lambda: self.covariance_activation(
+                self.get_scaling, scaling_modifier, self._rotation
+            ),
         )
 
+    def spatial_index(self):
+        """Culling structure over the current gaussians, rebuilt when they move."""
+        with torch.no_grad():
+            return self._cached(
+                "spatial_index",
+                (self._xyz, self._scaling),
+                lambda: SpatialIndex(self._xyz, self.get_scaling),
+            )
+
     def oneupSHdegree(self):
         if self.active_sh_degree < self.max_sh_degree:
             self.active_sh_degree += 1
 
     def create_from_pcd(self, pcd: BasicPointCloud, spatial_lr_scale: float):
         self.spatial_lr_scale = spatial_lr_scale
-        fused_point_cloud = torch.tensor(np.asarray(pcd.points)).float().cuda()
-        fused_color = RGB2SH(torch.tensor(np.asarray(pcd.colors)).float().cuda())
+        fused_point_cloud = torch.tensor(np.asarray(pcd.points)).float().to(self.device)
+        fused_color = RGB2SH(
+            torch.tensor(np.asarray(pcd.colors)).float().to(self.device)
+        )
         features = (
             torch.zeros((fused_color.shape[0], 3, (self.max_sh_degree + 1) ** 2))
             .float()
-            .cuda()
+            .to(self.device)
         )
         features[:, :3, 0] = fused_color
         features[:, 3:, 1:] = 0.0
 
         print("Number of points at initialisation : ", fused_point_cloud.shape[0])
 
+        if distCUDA2 is None:
+            raise ImportError("simple_knn is required to initialize from a point cloud")
         dist2 = torch.clamp_min(
-            distCUDA2(torch.from_numpy(np.asarray(pcd.points)).float().cuda()),
+            distCUDA2(torch.from_numpy(np.asarray(pcd.points)).float().cuda()).to(
+                self.device
+            ),
             0.0000001,
         )
         scales = torch.log(torch.sqrt(dist2))[..., None].repeat(1, 3)
-        rots = torch.zeros((fused_point_cloud.shape[0], 4), device="cuda")
+        rots = torch.zeros((fused_point_cloud.shape[0], 4), device=self.device)
         rots[:, 0] = 1
 
         opacities = inverse_sigmoid(
             0.1
             * torch.ones(
-                (fused_point_cloud.shape[0], 1), dtype=torch.float, device="cuda"
+                (fused_point_cloud.shape[0], 1), dtype=torch.float, device=self.device
             )
         )
 
@@ -167,12 +271,15 @@ class GaussianModel:
         self._scaling = nn.Parameter(scales.requires_grad_(True))
         self._rotation = nn.Parameter(rots.requires_grad_(True))
         self._opacity = nn.Parameter(opacities.requires_grad_(True))
-        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device="cuda")
+        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device=self.device)
+        self.bump_version()
 
     def training_setup(self, training_args):
         self.percent_dense = training_args.percent_dense
-        self.xyz_gradient_accum = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
+        self.xyz_gradient_accum = torch.zeros(
+            (self.get_xyz.shape[0], 1), device=self.device
+        )
+        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device=self.device)
 
         l = [
             {
@@ -266,13 +373,10 @@ class GaussianModel:
             (attribute, "f4") for attribute in self.construct_list_of_attributes()
         ]
 
-        elements = np.empty(xyz.shape[0], dtype=dtype_full)
         attributes = np.concatenate(
             (xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1
         )
-        elements[:] = list(map(tuple, attributes))
-        el = PlyElement.describe(elements, "vertex")
-        PlyData([el]).write(path)
+        write_vertices(path, structured_from_columns(attributes, dtype_full))
 
     def reset_opacity(self):
         opacities_new = inverse_sigmoid(
@@ -280,87 +384,144 @@ class GaussianModel:
         )
         optimizable_tensors = self.replace_tensor_to_optimizer(opacities_new, "opacity")
         self._opacity = optimizable_tensors["opacity"]
+        self.bump_version()
 
-    def load_ply(self, path):
-        plydata = PlyData.read(path)
-
-        xyz = np.stack(
-            (
-                np.asarray(plydata.elements[0]["x"]),
-                np.asarray(plydata.elements[0]["y"]),
-                np.asarray(plydata.elements[0]["z"]),
-            ),
-            axis=1,
+    def load_ply(
+        self,
+        path,
+        mmap=True,
+        use_cache=False,
+        chunk_size=LOAD_CHUNK_SIZE,
+        progress=None,
+    ):
+        if use_cache:
+            cache_path = cache_path_for(path)
+            if cache_is_fresh(cache_path, path):
+                self.load_cache(cache_path, chunk_size=chunk_size, progress=progress)
+                return
+
+        # stamped before reading, a file rewritten meanwhile then leaves a stale stamp
+        # and the cache is rebuilt on the next load instead of being trusted
+        stamp = source_stamp(path)
+        arrays = gaussian_arrays(read_vertices(path, mmap=mmap))
+        if progress is not None:
+            # the parse cannot be interrupted, give the caller a chance to abort
+            # before spending the cache write on it
+            progress(0, arrays["xyz"].shape[0])
+        if use_cache:
+            write_progress, progress = split_progress(progress)
+            try:
+                write_splat_cache(
+                    cache_path,
+                    arrays,
+                    *stamp,
+                    chunk_size=chunk_size,
+                    progress=write_progress,
+                )
+            except OSError as e:
+                print(f"[Warning] Could not write splat cache {cache_path}: {e}")
+        self.create_from_arrays(arrays, chunk_size=chunk_size, progress=progress)
+
+    def load_cache(self, path, mmap=True, chunk_size=LOAD_CHUNK_SIZE, progress=None):
+        arrays = read_splat_cache(path, mmap=mmap)
+        self.create_from_arrays(arrays, chunk_size=chunk_size, progress=progress)
+
+    def load_compressed(self, path, chunk_size=LOAD_CHUNK_SIZE, progress=None):
+        arrays = read_compressed(path)
+        self.create_from_arrays(arrays, chunk_size=chunk_size, progress=progress)
+
+    def load_lod(self, path, chunk_size=LOAD_CHUNK_SIZE, progress=None):
+        """Load every node of a LOD hierarchy, render() draws a cut through it."""
+        arrays = read_lod(path)
+        parent = arrays.pop("parent")
+        radius = arrays.pop("radius")
+        num_leaves = int(arrays.pop("num_leaves"))
+        self.create_from_arrays(arrays, chunk_size=chunk_size, progress=progress)
+        self.lod = LodHierarchy(
+            torch.from_numpy(parent).to(self.device),
+            torch.from_numpy(radius).to(self.device),
+            num_leaves,
         )
-        opacities = np.asarray(plydata.elements[0]["opacity"])[..., np.newaxis]
 
-        features_dc = np.zeros((xyz.shape[0], 3, 1))
-        features_dc[:, 0, 0] = np.asarray(plydata.elements[0]["f_dc_0"])
-        features_dc[:, 1, 0] = np.asarray(plydata.elements[0]["f_dc_1"])
-        features_dc[:, 2, 0] = np.asarray(plydata.elements[0]["f_dc_2"])
+    def load_file(
+        self, path, use_cache=False, chunk_size=LOAD_CHUNK_SIZE, progress=None
+    ):
+        """Load a ply, splat cache, compressed or LOD file, picked by its suffix."""
+        if path.endswith(LOD_SUFFIX):
+            self.load_lod(path, chunk_size=chunk_size, progress=progress)
+        elif path.endswith(CACHE_SUFFIX):
+            self.load_cache(path, chunk_size=chunk_size, progress=progress)
+        elif path.endswith(COMPRESSED_SUFFIX):
+            self.load_compressed(path, chunk_size=chunk_size, progress=progress)
+        else:
+            self.load_ply(
+                path, use_cache=use_cache, chunk_size=chunk_size, progress=progress
+            )
 
-        extra_f_names = [
-            p.name
-            for p in plydata.elements[0].properties
-            if p.name.startswith("f_rest_")
-        ]
-        extra_f_names = sorted(extra_f_names, key=lambda x: int(x.split("_")[-1]))
-        self.max_sh_degree = int(((len(extra_f_names) + 3) / 3) ** 0.5) - 1
-        assert len(extra_f_names) == 3 * (self.max_sh_degree + 1) ** 2 - 3
-        features_extra = np.zeros((xyz.shape[0], len(extra_f_names)))
-        for idx, attr_name in enumerate(extra_f_names):
-            features_extra[:, idx] = np.asarray(plydata.elements[0][attr_name])
-        # Reshape (P,F*SH_coeffs) to (P, F, SH_coeffs except DC)
-        features_extra = features_extra.reshape(
-            (features_extra.shape[0], 3, (self.max_sh_degree + 1) ** 2 - 1)
-        )
+    def create_from_arrays(self, arrays, chunk_size=LOAD_CHUNK_SIZE, progress=None):
+        """
+        Copy host arrays in the GaussianModel layout into freshly allocated device
+        tensors, `chunk_size` splats at a time.
+
+        The arrays are usually views into a file mapping, so the host memory used on
+        top of the final tensors is bounded by one chunk of one attribute.
+        progress(loaded, total) is called before allocating anything and after every
+        chunk, an exception raised by it aborts the load.
+        """
+        num_points = arrays["xyz"].shape[0]
+        if progress is not None:
+            progress(0, num_points)
+        self.lod = None
+        # frozen features are allocated below, never twice
+        separate = {"features_dc", "features_rest"} if self.frozen else set()
+        tensors = {
+            name: torch.empty(array.shape, dtype=torch.float, device=self.device)
+            for name, array in arrays.items()
+            if name not in separate
+        }
+        if self.frozen:
+            # dc and rest are loaded straight into views of the concatenated features
+            num_coeffs = 1 + arrays["features_rest"].shape[1]
+            features = torch.empty(
+                (num_points, num_coeffs, 3), dtype=torch.float, device=self.device
+            )
+            tensors["features_dc"] = features[:, :1]
+            tensors["features_rest"] = features[:, 1:]
 
-        scale_names = [
-            p.name
-            for p in plydata.elements[0].properties
-            if p.name.startswith("scale_")
-        ]
-        scale_names = sorted(scale_names, key=lambda x: int(x.split("_")[-1]))
-        scales = np.zeros((xyz.shape[0], len(scale_names)))
-        for idx, attr_name in enumerate(scale_names):
-            scales[:, idx] = np.asarray(plydata.elements[0][attr_name])
+        for start in range(0, num_points, chunk_size):
+            end = min(start + chunk_size, num_points)
+            for name, array in arrays.items():
+                tensors[name][start:end].copy_(torch.from_numpy(array[start:end]))
+            if progress is not None:
+                progress(end, num_points)
 
-        rot_names = [
-            p.name for p in plydata.elements[0].properties if p.name.startswith("rot")
-        ]
-        rot_names = sorted(rot_names, key=lambda x: int(x.split("_")[-1]))
-        rots = np.zeros((xyz.shape[0], len(rot_names)))
-        for idx, attr_name in enumerate(rot_names):
-            rots[:, idx] = np.asarray(plydata.elements[0][attr_name])
+        self.max_sh_degree = int((tensors["features_rest"].shape[1] + 1) ** 0.5) - 1
+        self.active_sh_degree = self.max_sh_degree
 
-        self._xyz = nn.Parameter(
-            torch.tensor(xyz, dtype=torch.float, device="cuda").requires_grad_(True)
-        )
-        self._features_dc = nn.Parameter(
-            torch.tensor(features_dc, dtype=torch.float, device="cuda")
-            .transpose(1, 2)
-            .contiguous()
-            .requires_grad_(True)
-        )
+        self.bump_version()
+        if self.frozen:
+            self._xyz = tensors["xyz"]
+            self._features = features
+            self._features_dc = tensors["features_dc"]
+            self._features_rest = tensors["features_rest"]
+            self._opacity = tensors["opacity"]
+            self._scaling = tensors["scaling"]
+            self._rotation = tensors["rotation"]
+            # stands in for the screen-space means whose gradient is never read
+            self._screenspace_points = torch.zeros_like(self._xyz)
+            # activate once, the cache is never invalidated afterwards
+            with torch.no_grad():
+                self.get_scaling, self.get_rotation, self.get_opacity
+            return
+
+        self._xyz = nn.Parameter(tensors["xyz"].requires_grad_(True))
+        self._features_dc = nn.Parameter(tensors["features_dc"].requires_grad_(True))
         self._features_rest = nn.Parameter(
-            torch.tensor(features_extra, dtype=torch.float, device="cuda")
-            .transpose(1, 2)
-            .contiguous()
-            .requires_grad_(True)
-        )
-        self._opacity = nn.Parameter(
-            torch.tensor(opacities, dtype=torch.float, device="cuda").requires_grad_(
-                True
-            )
-        )
-        self._scaling = nn.Parameter(
-            torch.tensor(scales, dtype=torch.float, device="cuda").requires_grad_(True)
-        )
-        self._rotation = nn.Parameter(
-            torch.tensor(rots, dtype=torch.float, device="cuda").requires_grad_(True)
+            tensors["features_rest"].requires_grad_(True)
         )
-
-        self.active_sh_degree = self.max_sh_degree
+        self._opacity = nn.Parameter(tensors["opacity"].requires_grad_(True))
+        self._scaling = nn.Parameter(tensors["scaling"].requires_grad_(True))
+        self._rotation = nn.Parameter(tensors["rotation"].requires_grad_(True))
 
     def replace_tensor_to_optimizer(self, tensor, name):
         optimizable_tensors = {}
@@ -414,6 +575,7 @@ class GaussianModel:
 
         self.denom = self.denom[valid_points_mask]
         self.max_radii2D = self.max_radii2D[valid_points_mask]
+        self.bump_version()
 
     def cat_tensors_to_optimizer(self, tensors_dict):
         optimizable_tensors = {}
@@ -475,14 +637,17 @@ class GaussianModel:
         self._scaling = optimizable_tensors["scaling"]
         self._rotation = optimizable_tensors["rotation"]
 
-        self.xyz_gradient_accum = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device="cuda")
+        self.xyz_gradient_accum = torch.zeros(
+            (self.get_xyz.shape[0], 1), device=self.device
+        )
+        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device=self.device)
+        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device=self.device)
+        self.bump_version()
 
     def densify_and_split(self, grads, grad_threshold, scene_extent, N=2):
         n_init_points = self.get_xyz.shape[0]
         # Extract points that satisfy the gradient condition
-        padded_grad = torch.zeros((n_init_points), device="cuda")
+        padded_grad = torch.zeros((n_init_points), device=self.device)
         padded_grad[: grads.shape[0]] = grads.squeeze()
         selected_pts_mask = torch.where(padded_grad >= grad_threshold, True, False)
         selected_pts_mask = torch.logical_and(
@@ -492,7 +657,7 @@ class GaussianModel:
         )
 
         stds = self.get_scaling[selected_pts_mask].repeat(N, 1)
-        means = torch.zeros((stds.size(0), 3), device="cuda")
+        means = torch.zeros((stds.size(0), 3), device=self.device)
         samples = torch.normal(mean=means, std=stds)
         rots = build_rotation(self._rotation[selected_pts_mask]).repeat(N, 1, 1)
         new_xyz = torch.bmm(rots, samples.unsqueeze(-1)).squeeze(-1) + self.get_xyz[
@@ -518,7 +683,9 @@ class GaussianModel:
         prune_filter = torch.cat(
             (
                 selected_pts_mask,
-                torch.zeros(N * selected_pts_mask.sum(), device="cuda", dtype=bool),
+                torch.zeros(
+                    N * selected_pts_mask.sum(), device=self.device, dtype=bool
+                ),
             )
         )
         self.prune_points(prune_filter)
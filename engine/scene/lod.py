@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+import math
+
+import torch
+
+
+class LodHierarchy:
+    """
+    Render-time side of engine/utils/lod_utils.py. The model holds every node of the
+    tree, leaves first; a cut selects the coarsest nodes whose bounding sphere
+    projects to at most `threshold` pixels, and leaves wherever nothing coarser fits.
+    """
+
+    def __init__(self, parent, radius, num_leaves):
+        self.parent = parent
+        self.radius = radius
+        self.num_leaves = num_leaves
+        self.is_leaf = torch.arange(parent.shape[0], device=parent.device) < num_leaves
+
+    def projected_size(self, xyz, camera):
+        """Upper bound of the on-screen radius in pixels of every node's subtree."""
+        focal = camera.image_height / (2.0 * math.tan(camera.FoVy * 0.5))
+        distance = (xyz - camera.camera_center).norm(dim=1)
+        # distance to the near side of the sphere, inf when the camera is inside it
+        gap = distance - self.radius
+        size = focal * self.radius / gap.clamp_min(1e-6)
+        return torch.where(gap > 0, size, torch.full_like(size, math.inf))
+
+    def cut_mask(self, xyz, camera, threshold):
+        if threshold <= 0:
+            return self.is_leaf
+        size = self.projected_size(xyz, camera)
+        # a node's size never drops below its children's, so exactly one node on
+        # every root to leaf path passes both tests
+        parent_size = torch.where(
+            self.parent >= 0,
+            size[self.parent.clamp_min(0)],
+            torch.full_like(size, math.inf),
+        )
+        return ((size <= threshold) | self.is_leaf) & (parent_size > threshold)
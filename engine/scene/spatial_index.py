@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+import torch
+from engine.utils.graphics_utils import spread_bits
+
+# Gaussians per leaf box, leaves are consecutive runs along the Morton curve
+LEAF_SIZE = 512
+# Each gaussian is bounded by a sphere of this many standard deviations along its
+# largest axis, the same extent the rasterizer uses for its screen-space radius
+BOUND_SIGMA = 3.0
+# The side planes are widened by this fraction of the clip-space w, so splats whose
+# footprint reaches into the image from just outside the frustum are kept
+GUARD_BAND = 0.1
+
+
+def morton_codes(xyz, bits=21):
+    """63 bit Morton codes of positions quantized within their bounding box."""
+    lo = xyz.min(dim=0).values
+    extent = (xyz.max(dim=0).values - lo).clamp_min(1e-12)
+    cells = ((xyz - lo) / extent * (2**bits - 1)).long().clamp(0, 2**bits - 1)
+    return (
+        spread_bits(cells[:, 0])
+        | (spread_bits(cells[:, 1]) << 1)
+        | (spread_bits(cells[:, 2]) << 2)
+    )
+
+
+def frustum_planes(full_proj_transform, guard_band=GUARD_BAND):
+    """
+    Left, right, bottom, top and near planes as (4,) rows, a point p is inside when
+    [p, 1] @ plane >= 0. The far plane is left out, the rasterizer does not clip there.
+    """
+    # full_proj_transform is stored transposed, clip = [p, 1] @ full_proj_transform
+    x, y, z, w = full_proj_transform.unbind(1)
+    w = (1.0 + guard_band) * w
+    return torch.stack((w + x, w - x, w + y, w - y, z))
+
+
+def boxes_in_frustum(box_min, box_max, planes):
+    """Conservative test, a box is rejected only if it is behind one of the planes."""
+    normals = planes[:, :3]
+    # the corner furthest along each plane normal
+    corners = torch.where(normals >= 0, box_max[:, None], box_min[:, None])
+    distances = (corners * normals).sum(dim=2) + planes[:, 3]
+    return (distances >= 0).all(dim=1)
+
+
+class SpatialIndex:
+    """
+    A flat bounding volume hierarchy over the gaussians of a model: they are ordered
+    along a Morton curve and cut into leaves of leaf_size, each with the axis-aligned
+    box of its members' bounding spheres. Spatially coherent leaves keep the boxes
+    tight, so culling tests a few thousand boxes instead of every gaussian.
+    """
+
+    def __init__(self, xyz, scaling, leaf_size=LEAF_SIZE):
+        self.num_points = xyz.shape[0]
+        self.leaf_size = leaf_size
+
+        if self.num_points == 0:
+            self.order = torch.empty(0, dtype=torch.long, device=xyz.device)
+            self.box_min = xyz.new_empty((0, 3))
+            self.box_max = xyz.new_empty((0, 3))
+            return
+
+        self.order = torch.argsort(morton_codes(xyz))
+        radius = BOUND_SIGMA * scaling.max(dim=1, keepdim=True).values
+        lo = (xyz - radius)[self.order]
+        hi = (xyz + radius)[self.order]
+
+        # pad the last leaf with copies of its last member
+        pad = -self.num_points % leaf_size
+        lo = torch.cat((lo, lo[-1:].expand(pad, 3)))
+        hi = torch.cat((hi, hi[-1:].expand(pad, 3)))
+        self.box_min = lo.view(-1, leaf_size, 3).min(dim=1).values
+        self.box_max = hi.view(-1, leaf_size, 3).max(dim=1).values
+
+    @property
+    def num_leaves(self):
+        return self.box_min.shape[0]
+
+    def cull(self, full_proj_transform):
+        """Indices of the gaussians in leaves that intersect the view frustum."""
+        planes = frustum_planes(full_proj_transform.to(self.box_min))
+        visible = boxes_in_frustum(self.box_min, self.box_max, planes)
+        mask = visible.repeat_interleave(self.leaf_size)[: self.num_points]
+        return self.order[mask]
@@ -0,0 +1,156 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Native on-disk layout of a GaussianModel:
+#
+#   [0, 64)     header (HEADER_DTYPE, zero padded)
+#   then        xyz, features_dc, features_rest, opacity, scaling, rotation
+#
+# Every block is little-endian float32 in exactly the shape GaussianModel keeps in
+# memory and starts on a CACHE_ALIGNMENT boundary, so loading is one memmap per block.
+
+import os
+import numpy as np
+
+CACHE_MAGIC = b"GSCACHE\0"
+CACHE_VERSION = 1
+CACHE_ALIGNMENT = 64
+CACHE_SUFFIX = ".gsc"
+
+# Splats copied per step when loading or writing a model, bounds the host memory
+# used on top of the result when the source is a file mapping
+LOAD_CHUNK_SIZE = 262144
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("sh_degree", "<u4"),
+        ("num_points", "<u8"),
+        ("source_size", "<u8"),
+        ("source_mtime_ns", "<i8"),
+    ]
+)
+
+
+def block_layout(num_points, sh_degree):
+    num_rest = (sh_degree + 1) ** 2 - 1
+    shapes = {
+        "xyz": (num_points, 3),
+        "features_dc": (num_points, 1, 3),
+        "features_rest": (num_points, num_rest, 3),
+        "opacity": (num_points, 1),
+        "scaling": (num_points, 3),
+        "rotation": (num_points, 4),
+    }
+
+    layout = {}
+    offset = CACHE_ALIGNMENT
+    for name, shape in shapes.items():
+        layout[name] = (offset, shape)
+        offset += 4 * int(np.prod(shape))
+        offset = (offset + CACHE_ALIGNMENT - 1) // CACHE_ALIGNMENT * CACHE_ALIGNMENT
+    return layout
+
+
+def cache_path_for(ply_path):
+    return os.path.splitext(ply_path)[0] + CACHE_SUFFIX
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def read_cache_header(path):
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if header.shape[0] != 1 or header[0]["magic"] != CACHE_MAGIC:
+        raise ValueError(f"{path} is not a splat cache file")
+    if header[0]["version"] != CACHE_VERSION:
+        raise ValueError(
+            f"{path}: unsupported splat cache version {header[0]['version']}"
+        )
+    return header[0]
+
+
+def cache_is_fresh(cache_path, source_path):
+    try:
+        header = read_cache_header(cache_path)
+    except (OSError, ValueError):
+        return False
+    size, mtime_ns = source_stamp(source_path)
+    return header["source_size"] == size and header["source_mtime_ns"] == mtime_ns
+
+
+def write_splat_cache(
+    path,
+    arrays,
+    source_size=0,
+    source_mtime_ns=0,
+    chunk_size=LOAD_CHUNK_SIZE,
+    progress=None,
+):
+    """progress(written, total) is called after every chunk, counting all blocks."""
+    num_points = arrays["xyz"].shape[0]
+    sh_degree = int((arrays["features_rest"].shape[1] + 1) ** 0.5) - 1
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = CACHE_MAGIC
+    header["version"] = CACHE_VERSION
+    header["sh_degree"] = sh_degree
+    header["num_points"] = num_points
+    header["source_size"] = source_size
+    header["source_mtime_ns"] = source_mtime_ns
+
+    # Write next to the target and rename, readers never see a half written cache
+    tmp_path = path + ".tmp"
+    layout = block_layout(num_points, sh_degree)
+    total = num_points * len(layout)
+    written = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            for name, (offset, shape) in layout.items():
+                f.write(b"\0" * (offset - f.tell()))
+                assert arrays[name].shape == shape, name
+                # chunked so a mapped source is never materialized as a whole
+                for start in range(0, shape[0], chunk_size):
+                    chunk = arrays[name][start : start + chunk_size]
+                    np.ascontiguousarray(chunk, dtype="<f4").tofile(f)
+                    written += chunk.shape[0]
+                    if progress is not None:
+                        progress(written, total)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # also when progress() aborts the write, a stale .tmp only wastes disk space
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_splat_cache(path, mmap=True):
+    header = read_cache_header(path)
+    layout = block_layout(int(header["num_points"]), int(header["sh_degree"]))
+
+    arrays = {}
+    for name, (offset, shape) in layout.items():
+        count = int(np.prod(shape))
+        if count == 0:
+            arrays[name] = np.zeros(shape, dtype=np.float32)
+        elif mmap:
+            arrays[name] = np.memmap(
+                path, dtype="<f4", mode="c", offset=offset, shape=shape
+            )
+        else:
+            arrays[name] = np.fromfile(
+                path, dtype="<f4", count=count, offset=offset
+            ).reshape(shape)
+    return arrays
@@ -0,0 +1,161 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Compressed GaussianModel storage. Positions, features_dc, opacity, scaling and
+# rotation are stored as fp16 or per-channel min/max uint8, features_rest is replaced
+# by a k-means codebook and one index per splat. Everything runs on the CPU.
+
+import numpy as np
+
+COMPRESSED_VERSION = 1
+COMPRESSED_SUFFIX = ".gsz"
+
+DEFAULT_PRECISION = {
+    "xyz": "fp16",
+    "features_dc": "fp16",
+    "opacity": "uint8",
+    "scaling": "uint8",
+    "rotation": "uint8",
+}
+
+
+def quantize(name, array, precision):
+    array = np.asarray(array, dtype=np.float32).reshape(array.shape[0], -1)
+    if precision == "fp32":
+        return {name: array}
+    if precision == "fp16":
+        return {name: array.astype(np.float16)}
+    if precision == "uint8":
+        lo = array.min(axis=0)
+        hi = array.max(axis=0)
+        step = np.maximum(hi - lo, 1e-12) / 255.0
+        q = np.rint((array - lo) / step).astype(np.uint8)
+        return {name: q, name + "_lo": lo, name + "_step": step}
+    raise ValueError(f"Unknown precision {precision} for {name}")
+
+
+def dequantize(data, name, shape):
+    q = data[name]
+    if q.dtype == np.uint8:
+        array = q * data[name + "_step"] + data[name + "_lo"]
+    else:
+        array = q
+    return array.astype(np.float32, copy=False).reshape(shape)
+
+
+def assign_clusters(data, centroids, chunk_size=16384):
+    labels = np.empty(data.shape[0], dtype=np.int64)
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    for start in range(0, data.shape[0], chunk_size):
+        chunk = data[start : start + chunk_size]
+        # |x - c|^2 without the |x|^2 term, which is constant per row
+        distances = centroid_norms[None, :] - 2.0 * (chunk @ centroids.T)
+        labels[start : start + chunk_size] = distances.argmin(axis=1)
+    return labels
+
+
+def kmeans(data, num_clusters, iterations=10, sample_size=262144, seed=0):
+    """
+    Lloyd's k-means fitted on a random subset of `data`, then used to label every row.
+    Returns (centroids, labels).
+    """
+    rng = np.random.default_rng(seed)
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    sample = data
+    if data.shape[0] > sample_size:
+        sample = data[rng.choice(data.shape[0], sample_size, replace=False)]
+
+    num_clusters = min(num_clusters, sample.shape[0])
+    centroids = sample[rng.choice(sample.shape[0], num_clusters, replace=False)]
+
+    for _ in range(iterations):
+        labels = assign_clusters(sample, centroids)
+        counts = np.bincount(labels, minlength=num_clusters)
+        sums = np.stack(
+            [
+                np.bincount(labels, weights=sample[:, d], minlength=num_clusters)
+                for d in range(sample.shape[1])
+            ],
+            axis=1,
+        )
+        empty = counts == 0
+        centroids = (sums / np.maximum(counts, 1)[:, None]).astype(np.float32)
+        # Restart empty clusters from random samples
+        centroids[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()))]
+
+    return centroids, assign_clusters(data, centroids)
+
+
+def encode_gaussians(
+    arrays, precision=None, codebook_size=4096, kmeans_iterations=10, seed=0
+):
+    precision = dict(DEFAULT_PRECISION, **(precision or {}))
+    num_points = arrays["xyz"].shape[0]
+    num_rest = arrays["features_rest"].shape[1]
+
+    data = {
+        "version": np.array(COMPRESSED_VERSION),
+        "num_points": np.array(num_points),
+        "num_rest": np.array(num_rest),
+    }
+    # Only the direction of a rotation matters to the renderer, unit quaternions make
+    # the uint8 range tight
+    rotation = np.asarray(arrays["rotation"], dtype=np.float32)
+    norms = np.linalg.norm(rotation, axis=1, keepdims=True)
+    arrays = dict(arrays, rotation=rotation / np.maximum(norms, 1e-12))
+
+    for name, p in precision.items():
+        data.update(quantize(name, arrays[name], p))
+
+    if num_rest > 0:
+        features_rest = np.asarray(arrays["features_rest"]).reshape(num_points, -1)
+        codebook, labels = kmeans(
+            features_rest, codebook_size, iterations=kmeans_iterations, seed=seed
+        )
+        index_dtype = np.uint16 if codebook.shape[0] <= 2**16 else np.uint32
+        data["features_rest_codebook"] = codebook
+        data["features_rest_index"] = labels.astype(index_dtype)
+    return data
+
+
+def decode_gaussians(data):
+    num_points = int(data["num_points"])
+    num_rest = int(data["num_rest"])
+
+    arrays = {
+        "xyz": dequantize(data, "xyz", (num_points, 3)),
+        "features_dc": dequantize(data, "features_dc", (num_points, 1, 3)),
+        "opacity": dequantize(data, "opacity", (num_points, 1)),
+        "scaling": dequantize(data, "scaling", (num_points, 3)),
+        "rotation": dequantize(data, "rotation", (num_points, 4)),
+    }
+    if num_rest > 0:
+        codebook = data["features_rest_codebook"]
+        index = data["features_rest_index"]
+        arrays["features_rest"] = codebook[index].reshape(num_points, num_rest, 3)
+    else:
+        arrays["features_rest"] = np.zeros((num_points, 0, 3), dtype=np.float32)
+    return arrays
+
+
+def write_compressed(path, data):
+    # a file object keeps numpy from appending .npz to the name
+    with open(path, "wb") as f:
+        np.savez(f, **data)
+
+
+def read_compressed(path):
+    with np.load(path) as data:
+        if int(data["version"]) != COMPRESSED_VERSION:
+            raise ValueError(
+                f"{path}: unsupported compressed splat version {int(data['version'])}"
+            )
+        return decode_gaussians(data)
@@ -12,6 +12,7 @@
 import torch
 import math
 import numpy as np
+from functools import lru_cache
 from typing import NamedTuple
 
 class BasicPointCloud(NamedTuple):
@@ -48,6 +49,20 @@ def getWorld2View2(R, t, translate=np.array([.0, .0, .0]), scale=1.0):
     Rt = np.linalg.inv(C2W)
     return np.float32(Rt)
 
+def getWorld2ViewBatch(R, t, translate=np.array([.0, .0, .0]), scale=1.0):
+    """getWorld2View2 for (..., 3, 3) rotations and (..., 3) translations at once,
+    returns the (..., 4, 4) matrices and the (..., 3) camera centers. The center of
+    [R^T | t] is -R t, so neither direction needs a 4x4 inverse."""
+    R = np.asarray(R, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    R_T = np.swapaxes(R, -1, -2)
+    cam_center = (-(R @ t[..., None])[..., 0] + translate) * scale
+    Rt = np.zeros(R.shape[:-2] + (4, 4))
+    Rt[..., :3, :3] = R_T
+    Rt[..., :3, 3] = -(R_T @ cam_center[..., None])[..., 0]
+    Rt[..., 3, 3] = 1.0
+    return np.float32(Rt), np.float32(cam_center)
+
 def getProjectionMatrix(znear, zfar, fovX, fovY):
     tanHalfFovY = math.tan((fovY / 2))
     tanHalfFovX = math.tan((fovX / 2))
@@ -70,8 +85,42 @@ def getProjectionMatrix(znear, zfar, fovX, fovY):
     P[2, 3] = -(zfar * znear) / (zfar - znear)
     return P
 
+def getProjectionMatrixBatch(znear, zfar, fovX, fovY):
+    """getProjectionMatrix for arrays of fovs, (..., 4, 4) float32 numpy."""
+    tanHalfFovX, tanHalfFovY = np.broadcast_arrays(
+        np.tan(np.asarray(fovX, dtype=np.float64) / 2),
+        np.tan(np.asarray(fovY, dtype=np.float64) / 2),
+    )
+    # symmetric frustum, 2 * znear / (right - left) is 1 / tanHalfFovX
+    P = np.zeros(tanHalfFovX.shape + (4, 4))
+    P[..., 0, 0] = 1.0 / tanHalfFovX
+    P[..., 1, 1] = 1.0 / tanHalfFovY
+    P[..., 3, 2] = 1.0
+    P[..., 2, 2] = zfar / (zfar - znear)
+    P[..., 2, 3] = -(zfar * znear) / (zfar - znear)
+    return np.float32(P)
+
+@lru_cache(maxsize=64)
+def getProjectionMatrixCached(znear, zfar, fovX, fovY):
+    """Transposed (row-vector) projection as a read-only float32 array, cached per
+    (znear, zfar, fovX, fovY) since the fov rarely changes between frames."""
+    P = np.ascontiguousarray(getProjectionMatrix(znear, zfar, fovX, fovY).numpy().T)
+    P.setflags(write=False)
+    return P
+
 def fov2focal(fov, pixels):
     return pixels / (2 * math.tan(fov / 2))
 
 def focal2fov(focal, pixels):
-    return 2*math.atan(pixels/(2*focal))
\ No newline at end of file
+    return 2*math.atan(pixels/(2*focal))
+
+def spread_bits(v):
+    """Insert two zero bits after each of the low 21 bits of v (int64, torch or numpy),
+    interleaving three of these gives a 63 bit Morton code."""
+    v = v & 0x1FFFFF
+    v = (v | (v << 32)) & 0x1F00000000FFFF
+    v = (v | (v << 16)) & 0x1F0000FF0000FF
+    v = (v | (v << 8)) & 0x100F00F00F00F00F
+    v = (v | (v << 4)) & 0x10C30C30C30C30C3
+    v = (v | (v << 2)) & 0x1249249249249249
+    return v
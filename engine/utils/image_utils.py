@@ -9,11 +9,89 @@
 # For inquiries contact  george.drettakis@inria.fr
 #
 
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import torch
 
+# cv2 only writes EXR when this is set before its first EXR write
+os.environ.setdefault("OPENCV_IO_ENABLE_OPENEXR", "1")
+import cv2
+
 def mse(img1, img2):
     return (((img1 - img2)) ** 2).view(img1.shape[0], -1).mean(1, keepdim=True)
 
 def psnr(img1, img2):
     mse = (((img1 - img2)) ** 2).view(img1.shape[0], -1).mean(1, keepdim=True)
     return 20 * torch.log10(1.0 / torch.sqrt(mse))
+
+class ImageWriter:
+    """
+    Writes (H, W, 3) float RGB images in [0, 1] on a thread pool, as 8 bit PNG (or
+    any format cv2 writes) or float EXR depending on the file extension.
+
+    At most max_pending images are queued, write() blocks beyond that so a fast
+    renderer cannot buffer an unbounded number of frames. Images are copied, the
+    caller may reuse its buffer right away. Errors of the workers are raised by the
+    next write() or by close().
+    """
+
+    def __init__(self, num_workers=4, max_pending=8):
+        self.executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="image_writer"
+        )
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.error = None
+
+        self.written = 0
+        self.bytes_written = 0
+        # time write() spent blocked on a full queue, the renderer's idle time
+        self.wait_seconds = 0.0
+
+    def write(self, path, image):
+        self.raise_error()
+        start = time.perf_counter()
+        self.slots.acquire()
+        self.wait_seconds += time.perf_counter() - start
+
+        future = self.executor.submit(self._write, path, np.array(image))
+        future.add_done_callback(self._done)
+
+    def _write(self, path, image):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.lower().endswith(".exr"):
+            image = image.astype(np.float32)
+        else:
+            image = (np.clip(image, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        if not cv2.imwrite(path, cv2.cvtColor(image, cv2.COLOR_RGB2BGR)):
+            raise OSError(f"cv2 could not write {path}")
+        return os.path.getsize(path)
+
+    def _done(self, future):
+        with self.lock:
+            if future.exception() is not None:
+                self.error = self.error or future.exception()
+            else:
+                self.written += 1
+                self.bytes_written += future.result()
+        self.slots.release()
+
+    def raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        """Wait for every queued image."""
+        self.executor.shutdown(wait=True)
+        self.raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,306 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Level-of-detail hierarchy of a GaussianModel, built offline on the CPU.
+#
+# The gaussians are sorted along a Morton curve and every run of `branching`
+# consecutive nodes is merged into one moment-matched parent, level by level, until a
+# single root is left. All nodes are stored in the GaussianModel layout, leaves first,
+# so any cut through the tree can be handed to the rasterizer as is. Every node also
+# has its parent index and the radius of a sphere enclosing its whole subtree, which
+# makes the projected size of a node never smaller than that of its children.
+
+import os
+
+import numpy as np
+
+from engine.utils.cache_utils import source_stamp
+from engine.utils.graphics_utils import spread_bits
+
+LOD_VERSION = 1
+LOD_SUFFIX = ".lod.npz"
+
+# Extent of a gaussian in standard deviations, as in the rasterizer
+BOUND_SIGMA = 3.0
+# Parents merged per step, bounds the temporary (groups, branching, 3, 3) arrays
+MERGE_CHUNK = 65536
+
+
+def lod_path_for(ply_path):
+    return os.path.splitext(ply_path)[0] + LOD_SUFFIX
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def inverse_sigmoid(x):
+    return np.log(x / (1.0 - x))
+
+
+def rotation_matrices(q):
+    """Unit quaternions (r, x, y, z) to rotation matrices, as build_rotation does."""
+    q = q / np.maximum(np.linalg.norm(q, axis=-1, keepdims=True), 1e-12)
+    r, x, y, z = np.moveaxis(q, -1, 0)
+    R = np.empty(q.shape[:-1] + (3, 3), dtype=q.dtype)
+    R[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    R[..., 0, 1] = 2 * (x * y - r * z)
+    R[..., 0, 2] = 2 * (x * z + r * y)
+    R[..., 1, 0] = 2 * (x * y + r * z)
+    R[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    R[..., 1, 2] = 2 * (y * z - r * x)
+    R[..., 2, 0] = 2 * (x * z - r * y)
+    R[..., 2, 1] = 2 * (y * z + r * x)
+    R[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+def quaternions(R):
+    """Rotation matrices to unit quaternions (r, x, y, z) with r >= 0."""
+    m00, m11, m22 = R[..., 0, 0], R[..., 1, 1], R[..., 2, 2]
+    q = np.stack(
+        (
+            np.sqrt(np.maximum(1 + m00 + m11 + m22, 0)),
+            np.copysign(
+                np.sqrt(np.maximum(1 + m00 - m11 - m22, 0)), R[..., 2, 1] - R[..., 1, 2]
+            ),
+            np.copysign(
+                np.sqrt(np.maximum(1 - m00 + m11 - m22, 0)), R[..., 0, 2] - R[..., 2, 0]
+            ),
+            np.copysign(
+                np.sqrt(np.maximum(1 - m00 - m11 + m22, 0)), R[..., 1, 0] - R[..., 0, 1]
+            ),
+        ),
+        axis=-1,
+    )
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def morton_order(xyz):
+    lo = xyz.min(axis=0)
+    extent = np.maximum(xyz.max(axis=0) - lo, 1e-12)
+    cells = ((xyz - lo) / extent * (2**21 - 1)).astype(np.int64)
+    codes = spread_bits(cells[:, 0])
+    codes |= spread_bits(cells[:, 1]) << 1
+    codes |= spread_bits(cells[:, 2]) << 2
+    return np.argsort(codes, kind="stable")
+
+
+def merge_groups(xyz, cov, opacity, features, radius, counts):
+    """
+    Moment matching of groups of gaussians, every input has a leading (groups,
+    branching) shape and `counts` members of each group are real, the rest padding.
+
+    Members are weighted by opacity times footprint area. The parent keeps the
+    weighted mean, covariance (spread of the members included) and features, and the
+    opacity that preserves the members' total opacity-weighted area.
+    """
+    branching = xyz.shape[1]
+    valid = np.arange(branching)[None, :] < counts[:, None]
+
+    eigenvalues = np.linalg.eigvalsh(cov)
+    # area of the footprint seen face on, product of the two largest axes
+    area = np.sqrt(np.maximum(eigenvalues[..., 1] * eigenvalues[..., 2], 0))
+    weight = np.where(valid, opacity * area + 1e-12, 0.0)
+    total = weight.sum(axis=1)
+
+    mean = (weight[..., None] * xyz).sum(axis=1) / total[:, None]
+    d = xyz - mean[:, None]
+    spread = cov + d[..., :, None] * d[..., None, :]
+    parent_cov = (weight[..., None, None] * spread).sum(axis=1) / total[:, None, None]
+    # features stay float32, they are most of the data
+    parent_features = (weight[..., None, None].astype(np.float32) * features).sum(
+        axis=1
+    ) / total[:, None, None].astype(np.float32)
+
+    parent_eigenvalues, parent_axes = np.linalg.eigh(parent_cov)
+    parent_eigenvalues = np.maximum(parent_eigenvalues, 1e-12)
+    # proper rotations only
+    parent_axes[..., :, 0] *= np.sign(np.linalg.det(parent_axes))[:, None]
+    parent_area = np.sqrt(parent_eigenvalues[:, 1] * parent_eigenvalues[:, 2])
+    covered = np.where(valid, opacity * area, 0.0).sum(axis=1)
+    parent_opacity = np.clip(covered / parent_area, 1e-6, 1 - 1e-6)
+
+    # the parent sphere encloses its own extent and every member's sphere
+    enclosing = np.where(valid, np.linalg.norm(d, axis=-1) + radius, 0.0).max(axis=1)
+    own = BOUND_SIGMA * np.sqrt(parent_eigenvalues[:, 2])
+    parent_radius = np.maximum(own, enclosing)
+
+    return (
+        mean,
+        parent_cov,
+        parent_eigenvalues,
+        parent_axes,
+        parent_opacity,
+        parent_features,
+        parent_radius,
+    )
+
+
+def build_lod(arrays, branching=8, progress=None):
+    """
+    Build the hierarchy from host arrays in the GaussianModel layout. Returns a dict
+    with the node arrays in the same layout plus "parent", "radius", "num_leaves".
+    progress(level, num_nodes) is called after every level.
+    """
+    num_points = arrays["xyz"].shape[0]
+    if num_points == 0:
+        raise ValueError("cannot build a LOD hierarchy of an empty model")
+    order = morton_order(np.asarray(arrays["xyz"]))
+    leaves = {
+        name: np.asarray(arrays[name], dtype=np.float32)[order]
+        for name in (
+            "xyz",
+            "features_dc",
+            "features_rest",
+            "opacity",
+            "scaling",
+            "rotation",
+        )
+    }
+
+    # level 0, the original gaussians in Morton order, in activated float64 form
+    xyz = leaves["xyz"].astype(np.float64)
+    scaling = np.exp(leaves["scaling"].astype(np.float64))
+    R = rotation_matrices(leaves["rotation"].astype(np.float64))
+    cov = (R * scaling[:, None, :] ** 2) @ np.swapaxes(R, 1, 2)
+    opacity = sigmoid(leaves["opacity"][:, 0].astype(np.float64))
+    features = np.concatenate((leaves["features_dc"], leaves["features_rest"]), axis=1)
+    radius = BOUND_SIGMA * scaling.max(axis=1)
+
+    # merged levels, bottom up
+    levels = []
+    radii = [radius]
+    parents = []
+    level_offset = 0
+    while xyz.shape[0] > 1:
+        num_nodes = xyz.shape[0]
+        num_groups = (num_nodes + branching - 1) // branching
+        parents.append(
+            level_offset + num_nodes + np.arange(num_nodes, dtype=np.int64) // branching
+        )
+        level_offset += num_nodes
+
+        merged = {
+            name: []
+            for name in (
+                "xyz",
+                "cov",
+                "scaling",
+                "rotation",
+                "opacity",
+                "features",
+                "radius",
+            )
+        }
+        for start in range(0, num_groups, MERGE_CHUNK):
+            end = min(start + MERGE_CHUNK, num_groups)
+            lo, hi = start * branching, min(end * branching, num_nodes)
+            pad = (end - start) * branching - (hi - lo)
+
+            def grouped(a):
+                a = a[lo:hi]
+                a = np.concatenate((a, np.repeat(a[-1:], pad, axis=0)))
+                return a.reshape((end - start, branching) + a.shape[1:])
+
+            counts = np.minimum(
+                branching, num_nodes - np.arange(start, end) * branching
+            )
+            (
+                mean,
+                parent_cov,
+                eigenvalues,
+                axes,
+                parent_opacity,
+                parent_features,
+                parent_radius,
+            ) = merge_groups(
+                grouped(xyz),
+                grouped(cov),
+                grouped(opacity),
+                grouped(features),
+                grouped(radius),
+                counts,
+            )
+            merged["xyz"].append(mean)
+            merged["cov"].append(parent_cov)
+            merged["scaling"].append(np.sqrt(eigenvalues))
+            merged["rotation"].append(quaternions(axes))
+            merged["opacity"].append(parent_opacity)
+            merged["features"].append(parent_features)
+            merged["radius"].append(parent_radius)
+
+        merged = {name: np.concatenate(parts) for name, parts in merged.items()}
+        xyz, cov = merged["xyz"], merged.pop("cov")
+        opacity, features, radius = (
+            merged["opacity"],
+            merged["features"],
+            merged["radius"],
+        )
+        levels.append(merged)
+        radii.append(radius)
+        if progress is not None:
+            progress(len(levels), xyz.shape[0])
+    parents.append(np.full(1, -1, dtype=np.int64))
+
+    def stacked(name, leaf_values, convert):
+        parts = [leaf_values] + [convert(level[name]) for level in levels]
+        return np.concatenate(parts).astype(np.float32)
+
+    leaf_features = np.concatenate(
+        (leaves["features_dc"], leaves["features_rest"]), axis=1
+    )
+    features = stacked("features", leaf_features, lambda f: f)
+    return {
+        "xyz": stacked("xyz", leaves["xyz"], lambda x: x),
+        "features_dc": np.ascontiguousarray(features[:, :1]),
+        "features_rest": np.ascontiguousarray(features[:, 1:]),
+        "opacity": stacked(
+            "opacity", leaves["opacity"], lambda o: inverse_sigmoid(o)[:, None]
+        ),
+        "scaling": stacked("scaling", leaves["scaling"], np.log),
+        "rotation": stacked("rotation", leaves["rotation"], lambda q: q),
+        "parent": np.concatenate(parents),
+        "radius": np.concatenate(radii).astype(np.float32),
+        "num_leaves": np.array(num_points),
+    }
+
+
+def write_lod(path, lod, source_size=0, source_mtime_ns=0):
+    # a file object keeps numpy from appending .npz to the name
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            version=np.array(LOD_VERSION),
+            source_size=np.array(source_size),
+            source_mtime_ns=np.array(source_mtime_ns),
+            **lod,
+        )
+
+
+def read_lod(path):
+    with np.load(path) as data:
+        if int(data["version"]) != LOD_VERSION:
+            raise ValueError(f"{path}: unsupported LOD version {int(data['version'])}")
+        return {
+            name: data[name]
+            for name in data.files
+            if name not in ("version", "source_size", "source_mtime_ns")
+        }
+
+
+def lod_is_fresh(lod_path, source_path):
+    try:
+        with np.load(lod_path) as data:
+            stamp = int(data["source_size"]), int(data["source_mtime_ns"])
+    except (OSError, ValueError, KeyError):
+        return False
+    return stamp == source_stamp(source_path)
@@ -0,0 +1,253 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+import os
+import numpy as np
+from typing import NamedTuple
+from numpy.lib import recfunctions
+from plyfile import PlyData, PlyElement
+
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+PLY_BYTE_ORDERS = {"binary_little_endian": "<", "binary_big_endian": ">"}
+
+
+class PlyElementHeader(NamedTuple):
+    name: str
+    count: int
+    # (name, numpy type) pairs, the type is None for list properties
+    properties: list
+
+
+class PlyHeader(NamedTuple):
+    format: str
+    elements: list
+    size: int
+
+
+class PlyInfo(NamedTuple):
+    path: str
+    format: str
+    file_size: int
+    num_points: int
+    attributes: list
+    # None when the vertex attributes do not describe a gaussian model
+    sh_degree: int
+    # float32 bytes GaussianModel needs for the splats, 0 if not a gaussian model
+    model_bytes: int
+    # (min xyz, max xyz) over a strided sample, None if not requested or not mappable
+    bbox: tuple
+
+
+def sorted_property_names(names, prefix):
+    names = [n for n in names if n.startswith(prefix)]
+    return sorted(names, key=lambda x: int(x.split("_")[-1]))
+
+
+def field_block(vertices, names, dtype=np.float32):
+    """
+    Return the properties `names` of a structured vertex array as an (N, len(names)) array.
+
+    Adjacent properties that already have the requested dtype come back as a strided
+    view into `vertices`, anything else is gathered into a new array.
+    """
+    if len(names) == 0:
+        return np.empty((vertices.shape[0], 0), dtype=dtype)
+    return recfunctions.structured_to_unstructured(
+        vertices[list(names)], dtype=dtype, copy=False
+    )
+
+
+def model_bytes(num_points, sh_degree):
+    # xyz, features dc + rest, opacity, scaling, rotation
+    return 4 * num_points * (3 + 3 * (sh_degree + 1) ** 2 + 1 + 3 + 4)
+
+
+def sh_degree_from_rest(num_rest):
+    # None if num_rest is not a valid f_rest_* count
+    sh_degree = int(((num_rest + 3) / 3) ** 0.5) - 1
+    if num_rest != 3 * (sh_degree + 1) ** 2 - 3:
+        return None
+    return sh_degree
+
+
+def gaussian_arrays(vertices):
+    """
+    Split a structured PLY vertex array into float32 blocks laid out like the
+    GaussianModel tensors: xyz (N, 3), features_dc (N, 1, 3), features_rest (N, SH, 3),
+    opacity (N, 1), scaling (N, 3) and rotation (N, 4).
+
+    No data is copied when the file stores the attributes as adjacent float32 columns,
+    which is the case for every PLY written by GaussianModel.save_ply.
+    """
+    names = vertices.dtype.names
+    num_points = vertices.shape[0]
+
+    extra_f_names = sorted_property_names(names, "f_rest_")
+    sh_degree = sh_degree_from_rest(len(extra_f_names))
+    assert sh_degree is not None
+    num_rest = (sh_degree + 1) ** 2 - 1
+
+    # PLY stores features channel-major as (P, F, SH_coeffs), the model keeps (P, SH_coeffs, F)
+    features_dc = field_block(vertices, ["f_dc_0", "f_dc_1", "f_dc_2"])
+    features_rest = field_block(vertices, extra_f_names)
+
+    return {
+        "xyz": field_block(vertices, ["x", "y", "z"]),
+        "features_dc": features_dc.reshape(num_points, 3, 1).transpose(0, 2, 1),
+        "features_rest": features_rest.reshape(num_points, 3, num_rest).transpose(
+            0, 2, 1
+        ),
+        "opacity": field_block(vertices, ["opacity"]),
+        "scaling": field_block(vertices, sorted_property_names(names, "scale_")),
+        "rotation": field_block(vertices, sorted_property_names(names, "rot")),
+    }
+
+
+def structured_from_columns(attributes, dtype):
+    """
+    Pack the columns of an (N, F) array into a structured array with F fields.
+
+    An all-float32 dtype is a reinterpretation of the contiguous float32 block, other
+    dtypes are filled one field at a time with the usual numpy casting rules.
+    """
+    dtype = np.dtype(dtype)
+    names = dtype.names
+    packed = dtype.itemsize == 4 * len(names)
+    if packed and all(dtype.fields[n][0] == np.float32 for n in names):
+        return np.ascontiguousarray(attributes, dtype=np.float32).view(dtype)[:, 0]
+
+    elements = np.empty(attributes.shape[0], dtype=dtype)
+    for idx, name in enumerate(names):
+        elements[name] = attributes[:, idx]
+    return elements
+
+
+def read_ply_header(path):
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            raise ValueError(f"{path} is not a PLY file")
+
+        ply_format = None
+        elements = []
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{path}: unexpected end of PLY header")
+            tokens = line.decode("ascii").split()
+            if not tokens:
+                continue
+            if tokens[0] == "format":
+                ply_format = tokens[1]
+            elif tokens[0] == "element":
+                elements.append(PlyElementHeader(tokens[1], int(tokens[2]), []))
+            elif tokens[0] == "property":
+                if tokens[1] == "list":
+                    elements[-1].properties.append((tokens[-1], None))
+                else:
+                    elements[-1].properties.append((tokens[2], PLY_TYPES[tokens[1]]))
+            elif tokens[0] == "end_header":
+                return PlyHeader(ply_format, elements, f.tell())
+
+
+def memmap_vertices(path, header=None):
+    """
+    Map the vertex element of a binary PLY file as a copy-on-write structured memmap.
+
+    Only the header is parsed, attribute data is paged in from the file as it is
+    touched and the pages are shared by every process mapping the same file.
+    Returns None when the layout cannot be mapped (ascii files, list properties).
+    """
+    if header is None:
+        header = read_ply_header(path)
+    byte_order = PLY_BYTE_ORDERS.get(header.format)
+    if byte_order is None:
+        return None
+
+    offset = header.size
+    for element in header.elements:
+        if any(t is None for _, t in element.properties):
+            return None
+        dtype = np.dtype([(name, byte_order + t) for name, t in element.properties])
+        if element.name == "vertex":
+            if element.count == 0:
+                return None
+            return np.memmap(
+                path, dtype=dtype, mode="c", offset=offset, shape=(element.count,)
+            )
+        offset += dtype.itemsize * element.count
+    return None
+
+
+def read_vertices(path, mmap=True):
+    if mmap:
+        vertices = memmap_vertices(path)
+        if vertices is not None:
+            return vertices
+    return PlyData.read(path)["vertex"].data
+
+
+def write_vertices(path, elements):
+    PlyData([PlyElement.describe(elements, "vertex")]).write(path)
+
+
+def inspect_ply(path, bbox_samples=0):
+    """
+    Describe a PLY file from its header alone, in milliseconds for any file size.
+
+    With bbox_samples > 0 the bounding box is estimated from about that many evenly
+    strided positions read through the file mapping (binary files only).
+    """
+    header = read_ply_header(path)
+    vertex = next((e for e in header.elements if e.name == "vertex"), None)
+    if vertex is None:
+        raise ValueError(f"{path} has no vertex element")
+    names = [name for name, _ in vertex.properties]
+
+    sh_degree = None
+    if "f_dc_0" in names:
+        sh_degree = sh_degree_from_rest(len(sorted_property_names(names, "f_rest_")))
+
+    bbox = None
+    if bbox_samples > 0 and vertex.count > 0:
+        vertices = memmap_vertices(path, header)
+        if vertices is not None:
+            step = max(1, vertex.count // bbox_samples)
+            xyz = field_block(vertices[::step], ["x", "y", "z"])
+            bbox = (xyz.min(axis=0), xyz.max(axis=0))
+
+    return PlyInfo(
+        path=path,
+        format=header.format,
+        file_size=os.path.getsize(path),
+        num_points=vertex.count,
+        attributes=names,
+        sh_degree=sh_degree,
+        model_bytes=0 if sh_degree is None else model_bytes(vertex.count, sh_degree),
+        bbox=bbox,
+    )
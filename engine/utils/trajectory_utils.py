@@ -0,0 +1,82 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+# Camera trajectories as a single structured .npy array, one record per view with
+# its pose and intrinsics. `pose` is the 4x4 matrix of the per-pose .npy files (and of
+# OrbitCamera.opt_pose): R = pose[:3, :3] and T = pose[:3, 3] as passed to Camera.
+# Files are read memory-mapped, so long trajectories cost nothing until used.
+
+import os
+from glob import glob
+
+import numpy as np
+
+TRAJECTORY_SUFFIX = ".traj.npy"
+TRAJECTORY_DTYPE = np.dtype(
+    [
+        ("pose", "<f8", (4, 4)),
+        ("fovx", "<f8"),
+        ("fovy", "<f8"),
+        ("width", "<i4"),
+        ("height", "<i4"),
+    ]
+)
+
+
+def make_trajectory(poses, width, height, fovy, fovx=None):
+    """
+    Trajectory of (N, 4, 4) poses, the intrinsics are scalars or (N,) arrays and fovs
+    are in radians. fovx defaults to the one of square pixels.
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 4, 4)
+    trajectory = np.empty(poses.shape[0], dtype=TRAJECTORY_DTYPE)
+    trajectory["pose"] = poses
+    trajectory["width"] = width
+    trajectory["height"] = height
+    trajectory["fovy"] = fovy
+    if fovx is None:
+        # focal2fov(fov2focal(fovy, height), width)
+        aspect = trajectory["width"] / trajectory["height"]
+        fovx = 2 * np.arctan(aspect * np.tan(trajectory["fovy"] / 2))
+    trajectory["fovx"] = fovx
+    return trajectory
+
+
+def write_trajectory(path, trajectory):
+    # a file object keeps numpy from appending .npy to the name
+    with open(path, "wb") as f:
+        np.save(f, np.asarray(trajectory, dtype=TRAJECTORY_DTYPE))
+
+
+def read_trajectory(path, mmap=True):
+    trajectory = np.load(path, mmap_mode="r" if mmap else None)
+    if trajectory.dtype != TRAJECTORY_DTYPE or trajectory.ndim != 1:
+        raise ValueError(f"{path}: not a trajectory file")
+    return trajectory
+
+
+def read_pose_dir(view_dir):
+    """(N, 4, 4) poses of a directory of per-pose .npy files, in file name order."""
+    files = sorted(glob(os.path.join(view_dir, "*.npy")))
+    if not files:
+        raise ValueError(f"no .npy poses in {view_dir}")
+    return np.stack([np.load(f) for f in files])
+
+
+def load_trajectory(path, width=1920, height=1080, fovy=np.radians(60)):
+    """
+    Trajectory of a trajectory file, of a directory of per-pose .npy files or of one
+    (N, 4, 4) .npy array; the intrinsics are only used by the last two.
+    """
+    if path.endswith(TRAJECTORY_SUFFIX):
+        return read_trajectory(path)
+    poses = read_pose_dir(path) if os.path.isdir(path) else np.load(path)
+    return make_trajectory(poses, width, height, fovy)
@@ -0,0 +1,40 @@
+import json
+import time
+from argparse import ArgumentParser
+
+from engine.utils.ply_utils import inspect_ply
+
+parser = ArgumentParser(description="Print ply metadata without loading the file")
+parser.add_argument("ply_files", nargs="+")
+parser.add_argument(
+    "--bbox_samples",
+    type=int,
+    default=100_000,
+    help="positions sampled for the bounding box, 0 to skip",
+)
+parser.add_argument("--json", action="store_true", help="one json object per file")
+args = parser.parse_args()
+
+for ply_file in args.ply_files:
+    start = time.perf_counter()
+    info = inspect_ply(ply_file, bbox_samples=args.bbox_samples)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        record = info._asdict()
+        if info.bbox is not None:
+            record["bbox"] = [info.bbox[0].tolist(), info.bbox[1].tolist()]
+        print(json.dumps(record))
+        continue
+
+    print(info.path)
+    print(f"  format      : {info.format}")
+    print(f"  file size   : {info.file_size / 2**20:.1f} MB")
+    print(f"  splats      : {info.num_points}")
+    print(f"  sh degree   : {info.sh_degree}")
+    print(f"  model size  : {info.model_bytes / 2**20:.1f} MB")
+    if info.bbox is not None:
+        print(f"  bbox min    : {info.bbox[0]}")
+        print(f"  bbox max    : {info.bbox[1]}")
+    print(f"  attributes  : {' '.join(info.attributes)}")
+    print(f"  inspected in {elapsed * 1000:.1f} ms")
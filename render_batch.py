@@ -0,0 +1,79 @@
+import math
+import os
+import time
+from argparse import ArgumentParser
+
+import torch
+from tqdm import tqdm
+
+from configs import CONFIG
+from engine.gaussian_renderer import render_batch, render_device
+from engine.scene.cameras import trajectory_cameras
+from engine.scene.gaussian_model import GaussianModel
+from engine.utils.image_utils import ImageWriter
+from engine.utils.trajectory_utils import load_trajectory
+
+opt = CONFIG()
+parser = ArgumentParser(description="Render gaussian models from a set of poses")
+parser.add_argument(
+    "model_files", nargs="+", help="model file, or the frames of a sequence"
+)
+parser.add_argument(
+    "--poses",
+    required=True,
+    help="trajectory file (.traj.npy, has its own intrinsics), pose .npy file or "
+    "directory of per-pose .npy files",
+)
+parser.add_argument("--output", "-o", required=True, help="output directory")
+parser.add_argument(
+    "--pattern",
+    default=None,
+    help="output name without extension, from {index}, {name} (model file stem) "
+    "and {view}; default {view:06d}, {index:03d}/{view:06d} for sequences",
+)
+parser.add_argument("--format", choices=("png", "exr"), default="png")
+parser.add_argument("--width", type=int, default=1920)
+parser.add_argument("--height", type=int, default=1080)
+parser.add_argument("--fovy", type=float, default=60.0, help="vertical fov, degrees")
+parser.add_argument("--rasterizer", choices=("cuda", "cpu"), default=opt.rasterizer)
+parser.add_argument("--white_background", action="store_true")
+parser.add_argument("--writers", type=int, default=4, help="image writer threads")
+args = parser.parse_args()
+
+if args.pattern is None:
+    sequence = len(args.model_files) > 1
+    args.pattern = "{index:03d}/{view:06d}" if sequence else "{view:06d}"
+opt.rasterizer = args.rasterizer
+device = render_device(opt)
+bg_color = [1, 1, 1] if args.white_background else [0, 0, 0]
+background = torch.tensor(bg_color, dtype=torch.float32, device=device)
+trajectory = load_trajectory(
+    args.poses, args.width, args.height, math.radians(args.fovy)
+)
+
+start = time.perf_counter()
+with ImageWriter(num_workers=args.writers) as writer:
+    for index, model_file in enumerate(args.model_files):
+        model = GaussianModel(opt.sh_degree, frozen=True, device=device)
+        model.load_file(model_file, use_cache=opt.ply_cache)
+        name = os.path.splitext(os.path.basename(model_file))[0]
+
+        render_start = time.perf_counter()
+        cameras = trajectory_cameras(trajectory, device=device)
+        outputs = render_batch(cameras, model, opt, background, channels_last=True)
+        for view, output in tqdm(enumerate(outputs), total=len(trajectory), desc=name):
+            out_name = args.pattern.format(index=index, name=name, view=view)
+            writer.write(
+                os.path.join(args.output, f"{out_name}.{args.format}"),
+                output["render"].numpy(),
+            )
+        elapsed = time.perf_counter() - render_start
+        print(f"{model_file}: {len(trajectory) / elapsed:.1f} views/s")
+        del model
+
+elapsed = time.perf_counter() - start
+print(
+    f"{writer.written} images, {writer.bytes_written / 2**20:.1f} MB in "
+    f"{elapsed:.1f} s ({writer.written / elapsed:.1f} images/s), "
+    f"{writer.wait_seconds:.1f} s waiting for the writers"
+)
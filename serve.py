@@ -0,0 +1,62 @@
+import asyncio
+import json
+from argparse import ArgumentParser
+
+import torch
+
+from configs import CONFIG
+from engine.gaussian_renderer import render_device
+from engine.gaussian_renderer.render_server import RenderServer, make_render_fn
+from engine.scene.gaussian_model import GaussianModel
+
+opt = CONFIG()
+parser = ArgumentParser(description="Serve a gaussian model to remote viewers")
+parser.add_argument("model_file", help="ply, splat cache, compressed or LOD file")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=6009)
+parser.add_argument("--rasterizer", choices=("cuda", "cpu"), default=opt.rasterizer)
+parser.add_argument("--verify", default="", help="string sent after every frame")
+parser.add_argument(
+    "--coalesce",
+    action="store_true",
+    help="render only the newest queued camera of each client (streaming clients)",
+)
+parser.add_argument(
+    "--stats", type=float, default=0, help="print client stats every N seconds"
+)
+args = parser.parse_args()
+
+opt.rasterizer = args.rasterizer
+device = render_device(opt)
+model = GaussianModel(opt.sh_degree, frozen=True, device=device)
+model.load_file(args.model_file, use_cache=opt.ply_cache)
+
+bg_color = [1, 1, 1] if opt.white_background else [0, 0, 0]
+background = torch.tensor(bg_color, dtype=torch.float32, device=device)
+
+server = RenderServer(
+    make_render_fn(model, opt, background),
+    host=args.host,
+    port=args.port,
+    verify=args.verify,
+    coalesce=args.coalesce,
+)
+
+
+async def print_stats(interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(server.stats()))
+
+
+async def main():
+    if args.stats > 0:
+        asyncio.create_task(print_stats(args.stats))
+    await server.serve_forever()
+
+
+print(f"serving {model.get_xyz.shape[0]} splats on {args.host}:{args.port}")
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    pass
@@ -0,0 +1,142 @@
+from argparse import ArgumentParser
+
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+from engine.arguments import OptimizationParams
+from engine.scene.gaussian_model import GaussianModel
+
+
+def random_arrays(num_points=32, sh_degree=1, seed=0):
+    rng = np.random.default_rng(seed)
+    num_rest = (sh_degree + 1) ** 2 - 1
+
+    def normal(*shape):
+        return rng.standard_normal(shape).astype(np.float32)
+
+    return {
+        "xyz": normal(num_points, 3),
+        "features_dc": normal(num_points, 1, 3),
+        "features_rest": normal(num_points, num_rest, 3),
+        "opacity": normal(num_points, 1),
+        "scaling": normal(num_points, 3) - 3.0,
+        "rotation": normal(num_points, 4),
+    }
+
+
+def training_model(num_points=32):
+    model = GaussianModel(1, device="cpu")
+    model.create_from_arrays(random_arrays(num_points))
+    parser = ArgumentParser()
+    opt = OptimizationParams(parser).extract(parser.parse_args([]))
+    model.training_setup(opt)
+
+    # one step, so the optimizer holds the state pruning and resets rewrite
+    params = [p for group in model.optimizer.param_groups for p in group["params"]]
+    sum(p.sum() for p in params).backward()
+    model.optimizer.step()
+    model.optimizer.zero_grad()
+    return model
+
+
+def activations(model):
+    with torch.no_grad():
+        return {
+            "scaling": model.get_scaling,
+            "rotation": model.get_rotation,
+            "opacity": model.get_opacity,
+            "features": model.get_features,
+            "covariance": model.get_covariance(),
+        }
+
+
+def test_repeated_access_is_cached():
+    model = training_model()
+    first = activations(model)
+    second = activations(model)
+    for name, value in first.items():
+        assert second[name] is value, name
+
+
+def test_in_place_update_invalidates():
+    model = training_model()
+    before = activations(model)
+    with torch.no_grad():
+        model._scaling.add_(0.5)
+        model._opacity.mul_(2.0)
+        model._features_rest.add_(1.0)
+
+    after = activations(model)
+    assert torch.allclose(after["scaling"], torch.exp(model._scaling))
+    assert torch.allclose(after["opacity"], torch.sigmoid(model._opacity))
+    assert not torch.allclose(after["scaling"], before["scaling"])
+    assert not torch.allclose(after["opacity"], before["opacity"])
+    assert not torch.allclose(after["features"], before["features"])
+    assert not torch.allclose(after["covariance"], before["covariance"])
+    # untouched attributes keep their cached value
+    assert after["rotation"] is before["rotation"]
+
+
+def test_optimizer_step_invalidates():
+    model = training_model()
+    before = activations(model)
+    model._scaling.sum().backward()
+    model.optimizer.step()
+
+    after = activations(model)
+    assert torch.allclose(after["scaling"], torch.exp(model._scaling))
+    assert not torch.allclose(after["scaling"], before["scaling"])
+
+
+def test_prune_points_invalidates():
+    model = training_model(num_points=32)
+    activations(model)
+    mask = torch.zeros(32, dtype=torch.bool)
+    mask[::2] = True
+    model.prune_points(mask)
+
+    after = activations(model)
+    for name, value in after.items():
+        assert value.shape[0] == 16, name
+    assert torch.allclose(after["scaling"], torch.exp(model._scaling))
+    assert torch.allclose(after["opacity"], torch.sigmoid(model._opacity))
+
+
+def test_reset_opacity_invalidates():
+    model = training_model()
+    activations(model)
+    model.reset_opacity()
+
+    opacity = activations(model)["opacity"]
+    assert torch.allclose(opacity, torch.sigmoid(model._opacity))
+    assert opacity.max() <= 0.01 + 1e-6
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_reload_invalidates(frozen):
+    model = GaussianModel(1, frozen=frozen, device="cpu")
+    model.create_from_arrays(random_arrays(seed=0))
+    before = activations(model)
+    # same shapes, fresh tensors whose _version counters start over
+    model.create_from_arrays(random_arrays(seed=1))
+
+    after = activations(model)
+    for name, value in after.items():
+        assert not torch.allclose(value, before[name]), name
+    assert torch.allclose(after["scaling"], torch.exp(model._scaling))
+
+
+def test_grad_enabled_access_is_not_cached():
+    model = training_model()
+    with torch.no_grad():
+        model.get_scaling
+
+    first = model.get_scaling
+    second = model.get_scaling
+    assert first.requires_grad
+    assert first is not second
+    # both graphs stay usable, neither was freed by the other's backward
+    first.sum().backward()
+    second.sum().backward()
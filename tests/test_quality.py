@@ -0,0 +1,87 @@
+from viewer.quality import QUALITY_LEVELS, QualityController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(clock, window=4, retry_after=5.0):
+    # 10 fps: a 100 ms budget, frames under 60 ms leave enough headroom
+    return QualityController(
+        target_fps=10, window=window, headroom=0.6, retry_after=retry_after, clock=clock
+    )
+
+
+def record_window(controller, seconds):
+    return [controller.record(seconds) for _ in range(controller.frame_times.maxlen)]
+
+
+def test_steps_down_over_budget():
+    controller = make_controller(FakeClock())
+    # nothing changes until the window is full
+    assert record_window(controller, 0.2) == [False, False, False, True]
+    assert controller.index == 1
+    assert controller.level == QUALITY_LEVELS[1]
+    # the window restarts at the new level
+    assert len(controller.frame_times) == 0
+
+
+def test_stays_within_budget():
+    controller = make_controller(FakeClock())
+    controller.index = 2
+    # between headroom * budget and budget
+    assert not any(record_window(controller, 0.08))
+    assert controller.index == 2
+
+
+def test_steps_up_under_headroom():
+    controller = make_controller(FakeClock())
+    controller.index = 2
+    assert record_window(controller, 0.01)[-1]
+    assert controller.index == 1
+    assert record_window(controller, 0.01)[-1]
+    assert controller.index == 0
+    # already at full quality
+    assert not any(record_window(controller, 0.01))
+    assert controller.index == 0
+
+
+def test_stops_at_cheapest_level():
+    controller = make_controller(FakeClock())
+    for _ in range(2 * len(QUALITY_LEVELS)):
+        record_window(controller, 1.0)
+    assert controller.index == len(QUALITY_LEVELS) - 1
+
+
+def test_no_retry_within_retry_after():
+    clock = FakeClock()
+    controller = make_controller(clock, retry_after=5.0)
+    record_window(controller, 0.2)
+    assert controller.index == 1
+
+    # fast enough to go back up, but level 0 just missed the budget
+    clock.now = 4.0
+    assert not any(record_window(controller, 0.01))
+    assert controller.index == 1
+
+    # the window is still full of fast frames, the next one steps up
+    clock.now = 5.5
+    assert controller.record(0.01)
+    assert controller.index == 0
+
+
+def test_reset_forgets_failed_levels():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    record_window(controller, 0.2)
+    controller.reset()
+    assert controller.index == 0
+    assert len(controller.frame_times) == 0
+
+    controller.index = 1
+    assert record_window(controller, 0.01)[-1]
+    assert controller.index == 0
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from engine.gaussian_renderer.render_server import (
+    RenderClient,
+    RenderServer,
+    encode_message,
+)
+
+WIDTH = 8
+HEIGHT = 4
+MESSAGE = {
+    "resolution_x": WIDTH,
+    "resolution_y": HEIGHT,
+    "fov_x": 1.0,
+    "fov_y": 0.8,
+    "z_near": 0.01,
+    "z_far": 100.0,
+    "view_matrix": [float(i == j) for i in range(4) for j in range(4)],
+    "view_projection_matrix": [float(i == j) for i in range(4) for j in range(4)],
+    "train": False,
+    "shs_python": False,
+    "rot_scale_python": False,
+    "keep_alive": True,
+    "scaling_modifier": 1.0,
+}
+
+
+def camera(tag):
+    """A camera message whose stub render is filled with the byte `tag`."""
+    return dict(MESSAGE, fov_x=float(tag))
+
+
+def stub_render(request):
+    return bytes([int(request.fovx)]) * (request.width * request.height * 3)
+
+
+def run(coro, timeout=10.0):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+async def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not reached")
+        await asyncio.sleep(0.005)
+
+
+def client_stats(server, client):
+    host, port = client.writer.get_extra_info("sockname")[:2]
+    return server.client_stats.get(f"{host}:{port}")
+
+
+class BlockingRender:
+    """Stub render_fn that holds every render until release() is called."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, request):
+        self.calls.append(int(request.fovx))
+        self.started.set()
+        self.released.wait(5.0)
+        return stub_render(request)
+
+    def release(self):
+        self.released.set()
+
+
+def test_concurrent_clients():
+    async def main():
+        async with RenderServer(stub_render, port=0, verify="ok") as server:
+            clients = [await RenderClient.connect(*server.address) for _ in range(4)]
+
+            async def session(tag, client):
+                replies = []
+                for i in range(3):
+                    replies.append(await client.render(camera(10 * tag + i)))
+                return replies
+
+            results = await asyncio.gather(
+                *(session(tag, client) for tag, client in enumerate(clients))
+            )
+            for tag, replies in enumerate(results):
+                for i, (image, verify) in enumerate(replies):
+                    assert image == bytes([10 * tag + i]) * (WIDTH * HEIGHT * 3)
+                    assert verify == "ok"
+
+            # no image requested, only the verify string comes back
+            assert await clients[0].render(dict(MESSAGE, resolution_x=0)) == (
+                None,
+                "ok",
+            )
+            for client in clients:
+                await client.close()
+
+    run(main())
+
+
+def test_message_split_across_writes():
+    async def main():
+        async with RenderServer(stub_render, port=0, verify="ok") as server:
+            client = await RenderClient.connect(*server.address)
+            data = encode_message(camera(7))
+            for i in range(len(data)):
+                client.writer.write(data[i : i + 1])
+                await client.writer.drain()
+                await asyncio.sleep(0.001)
+            image, verify = await client.receive(camera(7))
+            assert image == bytes([7]) * (WIDTH * HEIGHT * 3)
+            assert verify == "ok"
+            await client.close()
+
+    run(main())
+
+
+def test_failing_render_drops_only_that_client():
+    def render_fn(request):
+        if int(request.fovx) == 13:
+            raise RuntimeError("render failed")
+        return stub_render(request)
+
+    async def main():
+        async with RenderServer(render_fn, port=0, verify="ok") as server:
+            good = await RenderClient.connect(*server.address)
+            bad = await RenderClient.connect(*server.address)
+
+            await bad.send(camera(13))
+            with pytest.raises((asyncio.IncompleteReadError, ConnectionError)):
+                await bad.receive(camera(13))
+
+            image, verify = await good.render(camera(5))
+            assert image == bytes([5]) * (WIDTH * HEIGHT * 3)
+            assert verify == "ok"
+            await wait_until(lambda: len(server.client_stats) == 1)
+            await good.close()
+
+    run(main())
+
+
+def test_coalescing_drops_stale_cameras():
+    render_fn = BlockingRender()
+
+    async def main():
+        async with RenderServer(render_fn, port=0, coalesce=True) as server:
+            client = await RenderClient.connect(*server.address)
+            # the first camera is rendering, the next ones queue up behind it
+            await client.send(camera(1))
+            await wait_until(render_fn.started.is_set)
+            for tag in range(2, 7):
+                await client.send(camera(tag))
+            stats = client_stats(server, client)
+            await wait_until(lambda: stats.received == 6)
+            render_fn.release()
+
+            # only the camera in flight and the newest one are answered
+            first, _ = await client.receive(camera(1))
+            last, _ = await client.receive(camera(6))
+            assert first[0] == 1 and last[0] == 6
+            assert render_fn.calls == [1, 6]
+            await wait_until(lambda: stats.served == 2)
+            assert stats.dropped == 4
+            assert stats.max_queue_depth == 1
+            await client.close()
+
+    run(main())
+
+
+def test_without_coalescing_every_camera_is_answered():
+    render_fn = BlockingRender()
+
+    async def main():
+        async with RenderServer(render_fn, port=0) as server:
+            client = await RenderClient.connect(*server.address)
+            for tag in range(1, 5):
+                await client.send(camera(tag))
+            stats = client_stats(server, client)
+            await wait_until(lambda: stats.received == 4)
+            render_fn.release()
+
+            for tag in range(1, 5):
+                image, _ = await client.receive(camera(tag))
+                assert image[0] == tag
+            assert stats.dropped == 0
+            await client.close()
+
+    run(main())
+
+
+def test_identical_concurrent_requests_render_once():
+    render_fn = BlockingRender()
+
+    async def main():
+        async with RenderServer(render_fn, port=0) as server:
+            a = await RenderClient.connect(*server.address)
+            b = await RenderClient.connect(*server.address)
+            await a.send(camera(9))
+            await wait_until(render_fn.started.is_set)
+            await b.send(camera(9))
+            await wait_until(lambda: client_stats(server, b).shared == 1)
+            render_fn.release()
+
+            (image_a, _), (image_b, _) = await asyncio.gather(
+                a.receive(camera(9)), b.receive(camera(9))
+            )
+            assert image_a == image_b == bytes([9]) * (WIDTH * HEIGHT * 3)
+            assert render_fn.calls == [9]
+
+            # once done, the same camera is rendered again
+            await a.render(camera(9))
+            assert render_fn.calls == [9, 9]
+            await a.close()
+            await b.close()
+
+    run(main())
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+import torch
+
+FRAME_FORMATS = ("float32", "uint8")
+
+
+class FrameBuffer:
+    """
+    Host side of the rendered frames, written in place and read directly by a
+    dearpygui raw texture.
+
+    Two preallocated (pinned, on CUDA) host buffers alternate: `texture` is the one
+    on screen, the other receives the next frame. On CUDA the device to host copy
+    runs on a side stream and is only waited for when the following frame is
+    submitted, so it overlaps that render. With fmt="uint8" frames are quantized on
+    the device, a quarter of the float32 readback, and expanded into a float32
+    texture on the host since raw textures only take float data.
+    """
+
+    def __init__(self, width, height, fmt="float32"):
+        if fmt not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format '{fmt}', expected {FRAME_FORMATS}")
+        self.width = width
+        self.height = height
+        self.fmt = fmt
+
+        cuda = torch.cuda.is_available()
+        dtype = torch.uint8 if fmt == "uint8" else torch.float32
+        self._host = [
+            torch.zeros((height, width, 3), dtype=dtype, pin_memory=cuda)
+            for _ in range(2)
+        ]
+        self._stream = torch.cuda.Stream() if cuda else None
+        # index of the host buffer on screen and the copy in flight to the other one
+        self._shown = 0
+        self._pending = None
+
+        if fmt == "uint8":
+            self.texture = np.zeros((height, width, 3), dtype=np.float32)
+        else:
+            self.texture = self._host[self._shown].numpy()
+
+        # moving averages of the host time spent per frame, in milliseconds
+        self.readback_ms = 0.0
+        self.convert_ms = 0.0
+
+    @property
+    def busy(self):
+        """A submitted frame is still waiting to be shown."""
+        return self._pending is not None
+
+    def submit(self, image):
+        """
+        Queue a (3, H, W) image in [0, 1] for display. Shows the previously submitted
+        frame if it has not been shown yet. Returns True when `texture` changed.
+        """
+        if self.fmt == "uint8":
+            image = (image.clamp(0.0, 1.0) * 255.0 + 0.5).to(torch.uint8)
+        frame = image.permute(1, 2, 0).contiguous()
+
+        changed = False
+        if self._pending is not None:
+            self._show(block=True)
+            changed = True
+
+        target = 1 - self._shown
+        if not frame.is_cuda:
+            start = time.perf_counter()
+            self._host[target].copy_(frame)
+            self._record("readback_ms", start)
+            self._pending = None
+            self._shown = target
+            self._update_texture()
+            return True
+
+        self._stream.wait_stream(torch.cuda.current_stream())
+        copied = torch.cuda.Event()
+        with torch.cuda.stream(self._stream):
+            self._host[target].copy_(frame, non_blocking=True)
+            copied.record()
+        frame.record_stream(self._stream)
+        self._pending = copied
+        return changed
+
+    def poll(self):
+        """Show the submitted frame if its copy is done. Returns True when shown."""
+        if self._pending is None or not self._pending.query():
+            return False
+        self._show(block=False)
+        return True
+
+    def _show(self, block):
+        start = time.perf_counter()
+        if block:
+            self._pending.synchronize()
+        self._record("readback_ms", start)
+        self._pending = None
+        self._shown = 1 - self._shown
+        self._update_texture()
+
+    def _update_texture(self):
+        shown = self._host[self._shown].numpy()
+        if self.fmt == "uint8":
+            start = time.perf_counter()
+            np.multiply(shown, np.float32(1.0 / 255.0), out=self.texture)
+            self._record("convert_ms", start)
+        else:
+            self.texture = shown
+
+    def _record(self, name, start, smoothing=0.9):
+        elapsed = (time.perf_counter() - start) * 1000.0
+        setattr(self, name, smoothing * getattr(self, name) + (1 - smoothing) * elapsed)
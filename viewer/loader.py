@@ -0,0 +1,79 @@
+import threading
+import traceback
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class BackgroundLoader:
+    """
+    Loads models on a worker thread so the render loop keeps drawing the current one.
+
+    Starting a new load cancels the one in flight instead of queueing behind it. The
+    load stops at its next progress report: between reading the file, writing the
+    splat cache and uploading to the device, and after every chunk of the last two.
+    Finished models are picked up with poll().
+    """
+
+    def __init__(self, create_model, load_fn):
+        # create_model() -> empty model, load_fn(model, path, progress) fills it
+        self.create_model = create_model
+        self.load_fn = load_fn
+
+        self.path = None
+        self.progress = 0.0
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._cancel = None
+        self._result = None
+
+    @property
+    def busy(self):
+        return self._cancel is not None
+
+    def start(self, path):
+        cancel = threading.Event()
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cancel = cancel
+            self._result = None
+            self.path = path
+            self.progress = 0.0
+            self.error = None
+
+        worker = threading.Thread(target=self._run, args=(path, cancel), daemon=True)
+        worker.start()
+
+    def _run(self, path, cancel):
+        def progress(loaded, total):
+            if cancel.is_set():
+                raise LoadCancelled()
+            self.progress = loaded / max(total, 1)
+
+        try:
+            progress(0, 1)
+            model = self.create_model()
+            self.load_fn(model, path, progress)
+        except LoadCancelled:
+            return
+        except Exception as e:
+            traceback.print_exc()
+            with self._lock:
+                if self._cancel is cancel:
+                    self._cancel = None
+                    self.error = e
+            return
+
+        with self._lock:
+            if self._cancel is cancel:
+                self._cancel = None
+                self._result = model
+
+    def poll(self):
+        """Return the newly loaded model once, None while nothing new is ready."""
+        with self._lock:
+            model, self._result = self._result, None
+        return model
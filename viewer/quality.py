@@ -0,0 +1,118 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+
+class QualityLevel(NamedTuple):
+    # internal resolution scale
+    resolution: float
+    # highest SH band evaluated, capped by the model's max_sh_degree
+    sh_degree: int
+    # splats fainter than this opacity are skipped
+    min_opacity: float
+    # splats whose 3 sigma radius projects to fewer pixels are skipped
+    min_splat_size: float
+    # only every n-th splat is drawn
+    subsample: int
+
+
+# from full quality to cheapest, every step trades a little more image quality
+QUALITY_LEVELS = (
+    QualityLevel(1.0, 3, 0.0, 0.0, 1),
+    QualityLevel(1.0, 2, 0.0, 0.0, 1),
+    QualityLevel(1.0, 1, 0.01, 0.0, 1),
+    QualityLevel(0.75, 1, 0.02, 0.5, 1),
+    QualityLevel(0.75, 0, 0.05, 1.0, 1),
+    QualityLevel(0.5, 0, 0.05, 1.0, 2),
+    QualityLevel(0.5, 0, 0.1, 1.5, 4),
+)
+FULL_QUALITY = QUALITY_LEVELS[0]
+
+
+class QualityController:
+    """
+    Picks a QualityLevel from a rolling window of measured frame times so frames fit
+    in 1 / target_fps.
+
+    When the window average is over budget the next cheaper level is used, when it is
+    under headroom * budget the next better one. A level that was too slow is not
+    retried for retry_after seconds, which keeps the controller from bouncing between
+    two levels. Frame times are passed to record(), and the clock is only used for
+    that back-off, so both can be faked to drive it without a GPU or a window.
+    """
+
+    def __init__(
+        self,
+        target_fps=30,
+        levels=QUALITY_LEVELS,
+        window=20,
+        headroom=0.6,
+        retry_after=5.0,
+        clock=time.perf_counter,
+    ):
+        self.target_fps = target_fps
+        self.levels = levels
+        self.headroom = headroom
+        self.retry_after = retry_after
+        self.clock = clock
+
+        self.enabled = True
+        self.index = 0
+        self.frame_times = deque(maxlen=window)
+        # level index -> clock() when it last missed the budget
+        self._too_slow = {}
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    @property
+    def budget(self):
+        return 1.0 / self.target_fps
+
+    @property
+    def average(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def reset(self):
+        self.index = 0
+        self.frame_times.clear()
+        self._too_slow.clear()
+
+    def record(self, seconds):
+        """Add the time of a frame rendered at the current level, True if it changed."""
+        self.frame_times.append(seconds)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+
+        average = self.average
+        if average > self.budget and self.index + 1 < len(self.levels):
+            self._too_slow[self.index] = self.clock()
+            self._set_index(self.index + 1)
+            return True
+        if average < self.headroom * self.budget and self.index > 0:
+            failed = self._too_slow.get(self.index - 1)
+            if failed is None or self.clock() - failed > self.retry_after:
+                self._set_index(self.index - 1)
+                return True
+        return False
+
+    def _set_index(self, index):
+        self.index = index
+        # the window measured another level
+        self.frame_times.clear()
+
+    def describe(self):
+        level = self.level
+        text = f"level {self.index}/{len(self.levels) - 1}: "
+        text += f"{level.resolution:.0%} res, SH {level.sh_degree}"
+        if level.min_opacity > 0:
+            text += f", opacity >= {level.min_opacity:g}"
+        if level.min_splat_size > 0:
+            text += f", size >= {level.min_splat_size:g} px"
+        if level.subsample > 1:
+            text += f", 1/{level.subsample} splats"
+        text += f"\n{1000 * self.average:.1f} ms (budget {1000 * self.budget:.1f} ms)"
+        return text
@@ -0,0 +1,62 @@
+import math
+import time
+
+
+class ProgressiveResolution:
+    """
+    Internal render scale of the viewer: reduced while the user drags the camera,
+    back to full resolution once the input stops.
+
+    During interaction the scale is chosen from the measured frame time so a frame
+    fits in 1 / target_fps, the rendering cost being roughly proportional to the
+    pixel count. After settle_time seconds without input the scale doubles every
+    frame until it is back to 1.
+    """
+
+    def __init__(
+        self,
+        target_fps=30,
+        min_scale=0.25,
+        settle_time=0.15,
+        step=0.125,
+        clock=time.perf_counter,
+    ):
+        self.target_fps = target_fps
+        self.min_scale = min_scale
+        self.settle_time = settle_time
+        self.step = step
+        self.clock = clock
+
+        # scale used while interacting, and the scale of the last rendered frame
+        self.interactive_scale = 1.0
+        self.current = 1.0
+        self._last_input = None
+
+    def interact(self):
+        self._last_input = self.clock()
+
+    @property
+    def interacting(self):
+        if self._last_input is None:
+            return False
+        return self.clock() - self._last_input < self.settle_time
+
+    def needs_refine(self):
+        return self.current < 1.0 and not self.interacting
+
+    def next_scale(self):
+        if self.interacting:
+            return self.interactive_scale
+        return min(1.0, 2.0 * self.current)
+
+    def record(self, scale, seconds):
+        """Update the interactive scale from the time a frame at `scale` took."""
+        self.current = scale
+        if seconds <= 0:
+            return
+        ideal = scale * math.sqrt(1.0 / (self.target_fps * seconds))
+        # halfway to the ideal, snapped down to a step, so it settles instead of
+        # resizing the framebuffer on every bit of timing noise
+        blended = 0.5 * (self.interactive_scale + ideal)
+        snapped = math.floor(blended / self.step) * self.step
+        self.interactive_scale = min(1.0, max(self.min_scale, snapped))
@@ -0,0 +1,51 @@
+import time
+
+
+class RenderScheduler:
+    """
+    Decides when the viewer has to render a new frame.
+
+    Callbacks call invalidate() with what they changed (camera, background, fov,
+    model, mode, options ...) and the render loop only renders while something is
+    dirty, the texture keeps the last frame otherwise. When idle_fps is set, idle
+    iterations of the UI loop are also throttled to that rate.
+    """
+
+    def __init__(self, idle_fps=0, clock=time.perf_counter, sleep=time.sleep):
+        self.idle_fps = idle_fps
+        self.clock = clock
+        self.sleep = sleep
+
+        self._dirty = set()
+        self._last_tick = None
+
+        self.rendered_frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def dirty(self):
+        return frozenset(self._dirty)
+
+    def invalidate(self, reason="camera"):
+        self._dirty.add(reason)
+
+    def should_render(self):
+        if self._dirty:
+            return True
+        self.skipped_frames += 1
+        return False
+
+    def rendered(self):
+        """Mark everything invalidated so far as drawn."""
+        self._dirty.clear()
+        self.rendered_frames += 1
+
+    def throttle(self):
+        """Called once per UI loop iteration, sleeps away the rest of an idle tick."""
+        now = self.clock()
+        if self.idle_fps > 0 and not self._dirty and self._last_tick is not None:
+            remaining = 1.0 / self.idle_fps - (now - self._last_tick)
+            if remaining > 0:
+                self.sleep(remaining)
+                now = self.clock()
+        self._last_tick = now
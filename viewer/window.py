@@ -4,13 +4,23 @@ import math
 
 
 from .camera import OrbitCamera
+from .frame_buffer import FrameBuffer
+from .loader import BackgroundLoader
+from .quality import FULL_QUALITY, QualityController
+from .resolution import ProgressiveResolution
+from .scheduler import RenderScheduler
 import torch
+import torch.nn.functional as F
 import os
+import copy
+import time
 
 
-from engine.scene.cameras import Camera
+from engine.scene.cameras import ViewCamera
 
-from engine.gaussian_renderer import render
+from engine.gaussian_renderer import render, render_device
+from engine.utils.lod_utils import lod_is_fresh, lod_path_for
+from engine.utils.ply_utils import inspect_ply
 
 import cv2
 import sys
@@ -29,17 +39,28 @@ class GaussianSplattingGUI:
         self.window_height = opt.window_height
 
         self.camera = OrbitCamera(opt.width, opt.height, r=opt.radius)
+        self.device = render_device(opt)
 
         bg_color = [1, 1, 1] if opt.white_background else [0, 0, 0]
-        background = torch.tensor(bg_color, dtype=torch.float32, device="cuda")
+        background = torch.tensor(bg_color, dtype=torch.float32, device=self.device)
 
         self.bg_color = background
 
-        self.render_buffer = np.zeros((self.width, self.height, 3), dtype=np.float32)
+        self.frames = FrameBuffer(
+            self.width, self.height, getattr(opt, "frame_format", "float32")
+        )
 
-        self.update_camera = True
+        self.scheduler = RenderScheduler(getattr(opt, "idle_fps", 0))
+        self.internal_resolution = (self.width, self.height)
 
         self.dynamic_resolution = True
+        self.resolution = ProgressiveResolution(
+            target_fps=getattr(opt, "interactive_fps", 30),
+            min_scale=getattr(opt, "min_resolution_scale", 0.25),
+        )
+        self.quality = QualityController(target_fps=getattr(opt, "target_fps", 30))
+        self.quality.enabled = getattr(opt, "adaptive_quality", False)
+        self.rendered_level = FULL_QUALITY
 
         self.debug = opt.debug
 
@@ -47,6 +68,13 @@ class GaussianSplattingGUI:
 
         self.load_model = False
 
+        self.loader = BackgroundLoader(
+            lambda: type(self.engine)(
+                self.opt.sh_degree, frozen=True, device=self.device
+            ),
+            self.load_file,
+        )
+
         # print("loading model file...")
 
         # self.engine.load_ply(self.opt.ply_path)
@@ -79,7 +107,7 @@ class GaussianSplattingGUI:
             dpg.add_raw_texture(
                 self.width,
                 self.height,
-                self.render_buffer,
+                self.frames.texture,
                 format=dpg.mvFormat_Float_rgb,
                 tag="_texture",
             )
@@ -115,7 +143,7 @@ class GaussianSplattingGUI:
                             self.dynamic_resolution = False
                         else:
                             self.dynamic_resolution = True
-                        self.need_update = True
+                        self.scheduler.invalidate("resolution")
 
                     dpg.add_checkbox(
                         label="dynamic resolution",
@@ -124,10 +152,48 @@ class GaussianSplattingGUI:
                     )
                     dpg.add_text(f"{self.width}x{self.height}", tag="_log_resolution")
 
+                # adaptive quality, only while the camera is being dragged. Its levels
+                # then own the resolution and dynamic resolution stays out of the way
+                with dpg.group(horizontal=True):
+
+                    def callback_set_adaptive_quality(sender, app_data):
+                        self.quality.enabled = app_data
+                        self.quality.reset()
+                        self.scheduler.invalidate("quality")
+
+                    dpg.add_checkbox(
+                        label="adaptive quality",
+                        default_value=self.quality.enabled,
+                        callback=callback_set_adaptive_quality,
+                    )
+
+                    def callback_set_target_fps(sender, app_data):
+                        self.quality.target_fps = app_data
+                        self.quality.reset()
+
+                    dpg.add_slider_int(
+                        label="target fps",
+                        min_value=5,
+                        max_value=120,
+                        width=100,
+                        default_value=self.quality.target_fps,
+                        callback=callback_set_target_fps,
+                    )
+                dpg.add_text(self.quality.describe(), tag="_log_quality")
+
+                def callback_set_frustum_culling(sender, app_data):
+                    self.opt.frustum_culling = app_data
+                    self.scheduler.invalidate("options")
+
+                dpg.add_checkbox(
+                    label="frustum culling",
+                    default_value=self.opt.frustum_culling,
+                    callback=callback_set_frustum_culling,
+                )
+
                 def callback(sender, app_data, user_data):
                     # print("Sender: ", sender)
                     # print("App Data: ", app_data)
-                    self.load_model = False
                     file_data = app_data["selections"]
 
                     file_names = []
@@ -137,11 +203,14 @@ class GaussianSplattingGUI:
 
                     self.ply_file = file_data[file_names[0]]
 
-                    # if not self.load_model:
+                    self.check_model_size(self.ply_file)
+
+                    # keeps rendering the current model until the new one is ready
                     print("loading model file...")
-                    self.engine.load_ply(self.ply_file)
-                    print("loading model file done.")
-                    self.load_model = True
+                    self.loader.start(self.ply_file)
+                    dpg.configure_item(
+                        "_load_progress", overlay=os.path.basename(self.ply_file)
+                    )
 
                 with dpg.file_dialog(
                     directory_selector=False,
@@ -156,15 +225,28 @@ class GaussianSplattingGUI:
                     dpg.add_file_extension(
                         "Ply (*.ply){.ply}", color=(0, 255, 255, 255)
                     )
+                    dpg.add_file_extension(
+                        "Splat cache (*.gsc){.gsc}", color=(255, 255, 0, 255)
+                    )
+                    dpg.add_file_extension(
+                        "Compressed splats (*.gsz){.gsz}", color=(255, 0, 255, 255)
+                    )
+                    dpg.add_file_extension(
+                        "LOD hierarchy (*.lod.npz){.npz}", color=(255, 128, 0, 255)
+                    )
                 dpg.add_button(
                     label="File Selector",
                     callback=lambda: dpg.show_item("file_dialog_id"),
                 )
+                dpg.add_progress_bar(
+                    default_value=0.0, width=200, tag="_load_progress"
+                )
+                dpg.add_text("", tag="_load_info")
 
                 # mode combo
                 def callback_change_mode(sender, app_data):
                     self.mode = app_data
-                    self.update_camera = True
+                    self.scheduler.invalidate("mode")
 
                 dpg.add_combo(
                     ("image", "depth"),
@@ -176,9 +258,9 @@ class GaussianSplattingGUI:
                 # bg_color picker
                 def callback_change_bg(sender, app_data):
                     self.bg_color = torch.tensor(
-                        app_data[:3], dtype=torch.float32
+                        app_data[:3], dtype=torch.float32, device=self.bg_color.device
                     )  # only need RGB in [0, 1]
-                    self.update_camera = True
+                    self.scheduler.invalidate("background")
 
                 dpg.add_color_edit(
                     (255, 255, 255),
@@ -193,7 +275,7 @@ class GaussianSplattingGUI:
 
                 def callback_set_fovy(sender, app_data):
                     self.camera.fovy = app_data
-                    self.update_camera = True
+                    self.scheduler.invalidate("fov")
 
                 dpg.add_slider_int(
                     label="FoV (vertical)",
@@ -204,11 +286,26 @@ class GaussianSplattingGUI:
                     callback=callback_set_fovy,
                 )
 
+                # LOD threshold slider, only used by LOD models
+
+                def callback_set_lod_threshold(sender, app_data):
+                    self.opt.lod_threshold = app_data
+                    self.scheduler.invalidate("options")
+
+                dpg.add_slider_float(
+                    label="LOD splat size",
+                    min_value=0,
+                    max_value=16,
+                    format="%.1f px",
+                    default_value=self.opt.lod_threshold,
+                    callback=callback_set_lod_threshold,
+                )
+
                 # dt_gamma slider
 
                 def callback_set_dt_gamma(sender, app_data):
                     self.opt.dt_gamma = app_data
-                    self.update_camera = True
+                    self.scheduler.invalidate("options")
 
                 dpg.add_slider_float(
                     label="dt_gamma",
@@ -228,6 +325,7 @@ class GaussianSplattingGUI:
                 dpg.add_separator()
                 dpg.add_text("Camera Pose:")
                 dpg.add_text(str(self.camera.pose), tag="_log_pose")
+                dpg.add_text("", tag="_log_frame")
 
         ### register camera handler
 
@@ -239,7 +337,8 @@ class GaussianSplattingGUI:
             dy = app_data[2]
 
             self.camera.orbit(dx, dy)
-            self.update_camera = True
+            self.resolution.interact()
+            self.scheduler.invalidate("camera")
 
             if self.debug:
                 dpg.set_value("_log_pose", str(self.camera.pose))
@@ -251,7 +350,8 @@ class GaussianSplattingGUI:
             delta = app_data
 
             self.camera.scale(delta)
-            self.update_camera = True
+            self.resolution.interact()
+            self.scheduler.invalidate("camera")
 
             if self.debug:
                 dpg.set_value("_log_pose", str(self.camera.pose))
@@ -264,7 +364,8 @@ class GaussianSplattingGUI:
             dy = app_data[2]
 
             self.camera.pan(dx, dy)
-            self.update_camera = True
+            self.resolution.interact()
+            self.scheduler.invalidate("camera")
 
             if self.debug:
                 dpg.set_value("_log_pose", str(self.camera.pose))
@@ -304,19 +405,114 @@ class GaussianSplattingGUI:
 
     def render(self):
         while dpg.is_dearpygui_running():
-            # update texture every frame
+            self.update_loading()
             # TODO : fetch rgb and depth
-            if self.load_model:
-                cam = self.construct_camera()
-                self.fetch_data(cam)
+            if self.progressive_resolution and self.resolution.needs_refine():
+                self.scheduler.invalidate("resolution")
+            # the frame shown once the camera stops is always at full quality
+            interacting = self.resolution.interacting
+            if self.rendered_level != FULL_QUALITY and not interacting:
+                self.scheduler.invalidate("quality")
+            if self.load_model and self.scheduler.should_render():
+                self.render_frame()
+            if self.frames.poll():
+                self.show_frame()
+            # a frame still being copied is shown on the next iteration, no delay
+            if not self.frames.busy:
+                self.scheduler.throttle()
             dpg.render_dearpygui_frame()
 
-    def construct_camera(
-        self,
-    ) -> Camera:
+    def load_file(self, model, path, progress=None):
+        chunk_size = self.opt.load_chunk_size
+        # a hierarchy built from this ply with build_lod.py takes precedence
+        if path.endswith(".ply") and lod_is_fresh(lod_path_for(path), path):
+            path = lod_path_for(path)
+
+        model.load_file(
+            path,
+            use_cache=self.opt.ply_cache,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+
+    def check_model_size(self, path):
+        if not path.endswith(".ply"):
+            dpg.set_value("_load_info", "")
+            return
+
+        try:
+            info = inspect_ply(path)
+        except (OSError, ValueError) as e:
+            dpg.set_value("_load_info", f"could not read header: {e}")
+            return
+
+        text = f"{info.num_points} splats, SH {info.sh_degree}, "
+        text += f"{info.model_bytes / 2**20:.0f} MB"
+        # the previous model stays resident until the new one is swapped in
+        if self.device == "cuda":
+            free_bytes, _ = torch.cuda.mem_get_info()
+            if info.model_bytes > free_bytes:
+                free_mb = free_bytes / 2**20
+                text += f"\nwarning: only {free_mb:.0f} MB of GPU memory free"
+        dpg.set_value("_load_info", text)
+
+    def update_loading(self):
+        if self.loader.busy:
+            dpg.set_value("_load_progress", self.loader.progress)
+            return
+
+        model = self.loader.poll()
+        if model is not None:
+            # single reference swap, the previous model is released afterwards
+            self.engine = model
+            self.load_model = True
+            self.scheduler.invalidate("model")
+            dpg.set_value("_load_progress", 1.0)
+            print("loading model file done.")
+        elif self.loader.error is not None:
+            dpg.configure_item("_load_progress", overlay="load failed")
+            self.loader.error = None
+
+    def render_frame(self):
+        interacting = self.resolution.interacting
+        adaptive = self.quality.enabled and interacting
+        level = self.quality.level if adaptive else FULL_QUALITY
+
+        progressive = self.progressive_resolution
+        scale = self.resolution.next_scale() if progressive else 1.0
+        cam = self.construct_camera(scale * level.resolution)
+
+        render_time = self.fetch_data(cam, self.quality_pipe(level))
+        if progressive:
+            self.resolution.record(scale, render_time)
+        if adaptive:
+            self.quality.record(render_time)
+        self.rendered_level = level
+        self.scheduler.rendered()
+
+        if self.quality.enabled:
+            dpg.set_value("_log_quality", self.quality.describe())
+
+        if (cam.image_width, cam.image_height) != self.internal_resolution:
+            self.internal_resolution = (cam.image_width, cam.image_height)
+            dpg.set_value(
+                "_log_resolution", f"{cam.image_width}x{cam.image_height}"
+            )
+
+    @property
+    def progressive_resolution(self):
+        """
+        ProgressiveResolution picks the render scale. Not with adaptive quality on:
+        its levels lower the resolution too, both fed the same frame times would
+        count every reduction twice and work against each other.
+        """
+        return self.dynamic_resolution and not self.quality.enabled
+
+    def construct_camera(self, scale=1.0) -> ViewCamera:
         # out_dir = "/home/swh/dataset/3d_gaussian/dataset/auro_6_8/sucai6.8/new_views"
-        R = self.camera.opt_pose[:3, :3]
-        t = self.camera.opt_pose[:3, 3]
+        pose = self.camera.opt_pose
+        R = pose[:3, :3]
+        t = pose[:3, 3]
 
         # save_pth = os.path.join(out_dir, f"{self.frame_id:06d}.npy")
 
@@ -333,29 +529,74 @@ class GaussianSplattingGUI:
         fy = fov2focal(fovy, self.height)
         fovx = focal2fov(fy, self.width)
 
-        cam = Camera(
-            colmap_id=0,
+        # same field of view at a reduced internal resolution
+        width = max(1, round(self.width * scale))
+        height = max(1, round(self.height * scale))
+
+        cam = ViewCamera(
             R=R,
             T=t,
             FoVx=fovx,
             FoVy=fovy,
-            image=torch.zeros([3, self.height, self.width]),
-            gt_alpha_mask=None,
-            image_name=None,
-            uid=0,
+            width=width,
+            height=height,
+            device=self.device,
         )
         return cam
 
-    def fetch_data(self, view_camera):
-        outputs = render(view_camera, self.engine, self.opt, self.bg_color)
-
-        img = outputs["render"].permute(1, 2, 0)  #
-
-        img = img.detach().cpu().numpy()
-
-        # img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        img = img.reshape(-1)
-
-        self.render_buffer = img
+    def quality_pipe(self, level):
+        """The render options with the cutoffs of a quality level on top."""
+        self.engine.active_sh_degree = min(self.engine.max_sh_degree, level.sh_degree)
+        if level == FULL_QUALITY:
+            return self.opt
+
+        pipe = copy.copy(self.opt)
+        pipe.min_opacity = max(self.opt.min_opacity, level.min_opacity)
+        pipe.min_splat_size = max(self.opt.min_splat_size, level.min_splat_size)
+        pipe.subsample = max(self.opt.subsample, level.subsample)
+        return pipe
+
+    def fetch_data(self, view_camera, pipe=None):
+        """
+        Renders a frame and queues it for display. Returns the time the render
+        itself took in seconds, measured with cuda events on the gpu: the launch
+        returns long before the kernels finish.
+        """
+        pipe = self.opt if pipe is None else pipe
+        if self.device == "cuda":
+            start = torch.cuda.Event(enable_timing=True)
+            end = torch.cuda.Event(enable_timing=True)
+            start.record()
+            outputs = render(view_camera, self.engine, pipe, self.bg_color)
+            end.record()
+        else:
+            start = time.perf_counter()
+            outputs = render(view_camera, self.engine, pipe, self.bg_color)
+            elapsed = time.perf_counter() - start
+        image = outputs["render"].detach()
+        if image.shape[1:] != (self.height, self.width):
+            image = F.interpolate(
+                image[None], size=(self.height, self.width), mode="bilinear"
+            )[0]
+
+        # the readback overlaps the next frame, the previous one is shown meanwhile
+        if self.frames.submit(image):
+            self.show_frame()
+
+        if self.device == "cuda":
+            # waits for the render only, the readback queued behind it keeps going
+            end.synchronize()
+            elapsed = start.elapsed_time(end) / 1000
+        return elapsed
+
+    def show_frame(self):
+        dpg.set_value("_texture", self.frames.texture)
 
-        dpg.set_value("_texture", self.render_buffer)
+        if self.debug:
+            dpg.set_value(
+                "_log_frame",
+                f"readback {self.frames.readback_ms:.2f} ms, "
+                f"convert {self.frames.convert_ms:.2f} ms ({self.frames.fmt}), "
+                f"{self.scheduler.rendered_frames} rendered, "
+                f"{self.scheduler.skipped_frames} skipped",
+            )